@@ -1,3 +1,18 @@
 from django.contrib import admin
+from adminapi.models import AdminAuditEvent
+from config.admin import LargeTableAdminMixin
 
-# Register your models here.
+
+@admin.register(AdminAuditEvent)
+class AdminAuditEventAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("occurred_at", "actor_email", "action", "target")
+    list_select_related = ("target",)
+    list_filter = ("action",)
+    date_hierarchy = "occurred_at"
+    raw_id_fields = ("actor", "target")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,6 +1,14 @@
+import atexit
 from django.apps import AppConfig
 
 
 class AdminapiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "adminapi"
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from adminapi.audit import flush_audit_log, flush_audit_log_if_due
+
+        request_finished.connect(flush_audit_log_if_due, dispatch_uid="adminapi.audit.flush_if_due")
+        atexit.register(flush_audit_log)
@@ -0,0 +1,138 @@
+"""In-process buffer for admin audit events.
+
+Admin actions append an unsaved `AdminAuditEvent` and return; the buffer is
+written with one `bulk_create` once it holds `ADMIN_AUDIT_BUFFER_SIZE` events
+or its oldest event is `ADMIN_AUDIT_FLUSH_SECONDS` old. Age is checked on every
+record and after every request, and the buffer is flushed at interpreter exit
+and from gunicorn's `worker_exit` hook, so a clean shutdown loses nothing.
+
+A batch that fails on a constraint (usually a user deleted between the action
+and the flush) is written again with those users detached: the foreign key is
+nulled and the old id kept in `detail`. Rows that still fail are written one at
+a time and the ones that cannot be written are logged and dropped. Only errors
+that may pass, such as a lost connection, keep the batch buffered.
+"""
+import logging
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, IntegrityError, transaction
+from adminapi.models import AdminAuditEvent
+
+logger = logging.getLogger(__name__)
+
+USER_FIELDS = ("actor", "target")
+
+
+def detach_deleted_users(events: list[AdminAuditEvent]) -> None:
+    user_ids = {getattr(event, f"{name}_id") for event in events for name in USER_FIELDS} - {None}
+    existing = set(get_user_model().objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+    for event in events:
+        for name in USER_FIELDS:
+            user_id = getattr(event, f"{name}_id")
+            if user_id is not None and user_id not in existing:
+                setattr(event, name, None)
+                event.detail.setdefault(f"{name}_id", user_id)
+
+
+def write_events(events: list[AdminAuditEvent]) -> int:
+    """Insert the events, dropping only those that can never be written; transient errors propagate.
+
+    A failed commit can leave pks on unsaved events, so they are cleared on every
+    failure: a pk marks an event as written.
+    """
+    try:
+        with transaction.atomic():
+            AdminAuditEvent.objects.bulk_create(events, batch_size=500)
+        return len(events)
+    except (IntegrityError, ValueError):
+        logger.warning("Writing %d admin audit events failed; detaching deleted users and retrying", len(events))
+    except DatabaseError:
+        for event in events:
+            event.pk = None
+        raise
+    for event in events:
+        event.pk = None
+    detach_deleted_users(events)
+    written = 0
+    for event in events:
+        try:
+            with transaction.atomic():
+                event.save(force_insert=True)
+        except (IntegrityError, ValueError):
+            event.pk = None
+            logger.exception("Dropping admin audit event that cannot be written: %s", event)
+            continue
+        except DatabaseError:
+            event.pk = None
+            raise
+        written += 1
+    return written
+
+
+class AuditBuffer:
+    def __init__(self):
+        self._events: list[AdminAuditEvent] = []
+        self._oldest: float | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def record(self, actor, action: str, target=None, **detail) -> None:
+        event = AdminAuditEvent(
+            actor=actor, actor_email=actor.email, target=target, action=action, detail=detail
+        )
+        with self._lock:
+            self._events.append(event)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+        self.flush_if_due()
+
+    def is_due(self) -> bool:
+        if not self._events:
+            return False
+        return (
+            len(self._events) >= settings.ADMIN_AUDIT_BUFFER_SIZE
+            or time.monotonic() - self._oldest >= settings.ADMIN_AUDIT_FLUSH_SECONDS
+        )
+
+    def flush_if_due(self) -> int:
+        return self.flush() if self.is_due() else 0
+
+    def flush(self) -> int:
+        with self._lock:
+            events, self._events, self._oldest = self._events, [], None
+        if not events:
+            return 0
+        try:
+            return write_events(events)
+        except DatabaseError:
+            # Rows already written one at a time have a pk; only the rest go back.
+            pending = [event for event in events if event.pk is None]
+            logger.exception("Failed to write %d admin audit events; keeping them buffered", len(pending))
+            with self._lock:
+                self._events[:0] = pending
+                self._oldest = time.monotonic()
+            return 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events, self._oldest = [], None
+
+
+audit_buffer = AuditBuffer()
+
+
+def record_admin_action(actor, action: str, target=None, **detail) -> None:
+    audit_buffer.record(actor, action, target=target, **detail)
+
+
+def flush_audit_log(**kwargs) -> int:
+    """Write every buffered event; safe to call from signals, atexit and server hooks."""
+    return audit_buffer.flush()
+
+
+def flush_audit_log_if_due(**kwargs) -> int:
+    return audit_buffer.flush_if_due()
@@ -0,0 +1,108 @@
+"""Platform counts for the admin dashboard, cached with stale-while-revalidate.
+
+Everything comes from three GROUP BY queries. A cached snapshot is served as is
+while fresh; once stale it is still served, and the first request to claim the
+refresh lock recomputes it in a background thread. Only a cold cache makes a
+request wait, and then only one of them computes while the rest poll for it.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, Q
+from django.utils import timezone
+from apps.models import App
+from billing.models import Subscription
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+METRICS_CACHE_KEY = "adminapi:metrics"
+METRICS_LOCK_KEY = "adminapi:metrics:refresh"
+COLD_POLL_SECONDS = 0.05
+
+
+def compute_metrics() -> dict:
+    users = {"total": 0, "active": 0, "disabled": 0, "by_user_type": {}}
+    for row in User.objects.order_by().values("user_type").annotate(
+        total=Count("id"),
+        active=Count("id", filter=Q(is_active=True, is_disabled_by_admin=False)),
+        disabled=Count("id", filter=Q(is_disabled_by_admin=True)),
+    ):
+        users["by_user_type"][row["user_type"]] = row["total"]
+        users["total"] += row["total"]
+        users["active"] += row["active"]
+        users["disabled"] += row["disabled"]
+
+    by_status, by_plan = defaultdict(int), defaultdict(int)
+    for row in Subscription.objects.order_by().values("status", "plan_id").annotate(total=Count("id")):
+        by_status[row["status"]] += row["total"]
+        by_plan[row["plan_id"] or "none"] += row["total"]
+
+    apps_by_plan = {
+        row["owner__user_type"]: row["total"]
+        for row in App.objects.order_by().values("owner__user_type").annotate(total=Count("id"))
+    }
+    return {
+        "users": users,
+        "subscriptions": {"by_status": dict(by_status), "by_plan": dict(by_plan)},
+        "apps": {"total": sum(apps_by_plan.values()), "by_plan": apps_by_plan},
+        "generated_at": timezone.now(),
+    }
+
+
+def refresh_metrics(locked: bool = False) -> dict:
+    """Recompute and cache the metrics; pass `locked=True` when this caller holds the refresh lock."""
+    try:
+        metrics = compute_metrics()
+        entry = {"metrics": metrics, "computed_at": time.time()}
+        cache.set(METRICS_CACHE_KEY, entry, settings.ADMIN_METRICS_STALE_SECONDS)
+        return metrics
+    finally:
+        # Never release a lock another worker's refresh still holds.
+        if locked:
+            cache.delete(METRICS_LOCK_KEY)
+
+
+def _refresh_in_background():
+    try:
+        refresh_metrics(locked=True)
+    except Exception:
+        logger.exception("Admin metrics refresh failed")
+    finally:
+        close_old_connections()
+
+
+def start_background_refresh():
+    threading.Thread(target=_refresh_in_background, name="admin-metrics-refresh", daemon=True).start()
+
+
+def claim_refresh() -> bool:
+    return cache.add(METRICS_LOCK_KEY, 1, settings.ADMIN_METRICS_LOCK_SECONDS)
+
+
+def get_metrics() -> tuple[dict, bool]:
+    """Return (metrics, is_stale)."""
+    entry = cache.get(METRICS_CACHE_KEY)
+    if entry is not None:
+        stale = time.time() - entry["computed_at"] >= settings.ADMIN_METRICS_FRESH_SECONDS
+        if stale and claim_refresh():
+            start_background_refresh()
+        return entry["metrics"], stale
+
+    deadline = time.monotonic() + settings.ADMIN_METRICS_LOCK_SECONDS
+    locked = claim_refresh()
+    while not locked:
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(COLD_POLL_SECONDS)
+        entry = cache.get(METRICS_CACHE_KEY)
+        if entry is not None:
+            return entry["metrics"], False
+        locked = claim_refresh()
+    return refresh_metrics(locked=locked), False
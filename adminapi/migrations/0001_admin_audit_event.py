@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminAuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor_email', models.EmailField(max_length=255)),
+                ('action', models.CharField(choices=[('disable', 'Disable user'), ('enable', 'Enable user'), ('bulk_disable', 'Bulk disable users'), ('bulk_enable', 'Bulk enable users')], max_length=32)),
+                ('detail', models.JSONField(blank=True, default=dict)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('target', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-occurred_at', '-id'],
+                'indexes': [models.Index(fields=['occurred_at'], name='adminapi_audit_time_idx'), models.Index(fields=['actor', 'occurred_at'], name='adminapi_audit_actor_idx'), models.Index(fields=['target', 'occurred_at'], name='adminapi_audit_target_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class AdminAuditEvent(models.Model):
+    class Action(models.TextChoices):
+        DISABLE = "disable", "Disable user"
+        ENABLE = "enable", "Enable user"
+        BULK_DISABLE = "bulk_disable", "Bulk disable users"
+        BULK_ENABLE = "bulk_enable", "Bulk enable users"
+
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL, related_name="+")
+    actor_email = models.EmailField(max_length=255)
+    target = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    action = models.CharField(max_length=32, choices=Action.choices)
+    detail = models.JSONField(default=dict, blank=True)
+    occurred_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-occurred_at", "-id"]
+        indexes = [
+            models.Index(fields=["occurred_at"], name="adminapi_audit_time_idx"),
+            models.Index(fields=["actor", "occurred_at"], name="adminapi_audit_actor_idx"),
+            models.Index(fields=["target", "occurred_at"], name="adminapi_audit_target_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_email} {self.action} {self.target_id or '-'}"
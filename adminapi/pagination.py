@@ -0,0 +1,127 @@
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from config.db import estimated_row_count
+
+
+class UserKeysetPagination(BasePagination):
+    """Newest-first keyset pagination over (date_joined, id)."""
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    page_size = 50
+    max_page_size = 200
+    ordering = ("-date_joined", "-id")
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, user, ranked: bool = False) -> str:
+        key = [user.date_joined.isoformat(), user.pk]
+        if ranked:
+            key.insert(0, user.search_rank)
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    def decode_cursor(self, value, ranked: bool = False) -> tuple:
+        """(date_joined, pk), preceded by the search rank for ranked cursors."""
+        try:
+            key = json.loads(base64.urlsafe_b64decode(value.encode()))
+            rank = key.pop(0) if ranked else None
+            date_joined, pk = key
+            date_joined = parse_datetime(date_joined)
+            if date_joined is None or (ranked and (isinstance(rank, bool) or not isinstance(rank, (int, float)))):
+                raise ValueError
+            return (rank, date_joined, int(pk)) if ranked else (date_joined, int(pk))
+        except (AttributeError, TypeError, ValueError):
+            raise NotFound("Invalid cursor.")
+
+    @staticmethod
+    def after(date_joined, pk) -> Q:
+        return Q(date_joined__lt=date_joined) | Q(date_joined=date_joined, pk__lt=pk)
+
+    def get_count(self, queryset, request) -> tuple[int, bool]:
+        exact = request.query_params.get(self.count_query_param) == "exact"
+        if not exact and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_THRESHOLD:
+                return estimate, True
+        return queryset.order_by().count(), False
+
+    def paginate_queryset(self, queryset, request, view=None, count_queryset=None):
+        """`count_queryset` lets callers count without the page's joins and annotations."""
+        self.request = request
+        self.count, self.count_is_estimate = self.get_count(
+            queryset if count_queryset is None else count_queryset, request
+        )
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(*self.decode_cursor(cursor)))
+        return self.page(queryset.order_by(*self.ordering), request)
+
+    def paginate_ranked(self, queryset, request, count_queryset=None):
+        """Keyset pagination over (search_rank, date_joined, id), as ordered by `users.search.search_users`."""
+        self.request = request
+        self.count = (queryset if count_queryset is None else count_queryset).order_by().count()
+        self.count_is_estimate = False
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            rank, date_joined, pk = self.decode_cursor(cursor, ranked=True)
+            queryset = queryset.filter(Q(search_rank__lt=rank) | Q(search_rank=rank) & self.after(date_joined, pk))
+        return self.page(queryset, request, ranked=True)
+
+    def page(self, queryset, request, ranked: bool = False) -> list:
+        page_size = self.get_page_size(request)
+        rows = list(queryset[: page_size + 1])
+        self.next_cursor = self.encode_cursor(rows[page_size - 1], ranked) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_next_link(self) -> str | None:
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self) -> str:
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_is_estimate": self.count_is_estimate,
+                "next": self.get_next_link(),
+                "first": self.get_first_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["count", "count_is_estimate", "results"],
+            "properties": {
+                "count": {"type": "integer"},
+                "count_is_estimate": {"type": "boolean"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class AuditEventCursorPagination(CursorPagination):
+    ordering = ("-occurred_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
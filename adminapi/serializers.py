@@ -1,14 +1,16 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from billing.models import Subscription
+from config.serializers import ModelSerializer, Serializer
+from adminapi.models import AdminAuditEvent
 
 User = get_user_model()
 
 
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(ModelSerializer):
     subscription_status = serializers.SerializerMethodField()
     subscription_plan = serializers.SerializerMethodField()
-    owned_app_count = serializers.IntegerField(source="owned_apps.count", read_only=True)
+    owned_app_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
@@ -34,7 +36,71 @@ class AdminUserSerializer(serializers.ModelSerializer):
         return sub.plan_id if sub else None
 
 
-class AdminUserToggleSerializer(serializers.ModelSerializer):
+class AdminUserToggleSerializer(ModelSerializer):
     class Meta:
         model = User
         fields = ("is_disabled_by_admin",)
+
+
+class AdminUserFilterSerializer(Serializer):
+    email = serializers.CharField(required=False)
+    user_type = serializers.ChoiceField(choices=User.UserType.choices, required=False)
+    is_disabled_by_admin = serializers.BooleanField(required=False)
+    subscription_status = serializers.ChoiceField(choices=Subscription.Status.choices, required=False)
+
+
+class AdminUserBulkToggleSerializer(Serializer):
+    is_disabled_by_admin = serializers.BooleanField()
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000)
+    filter = AdminUserFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide exactly one of ids or filter.")
+        if "filter" in attrs and not attrs["filter"]:
+            raise serializers.ValidationError({"filter": "At least one filter is required."})
+        return attrs
+
+
+class AdminUserBulkToggleResultSerializer(Serializer):
+    updated = serializers.IntegerField()
+    tokens_revoked = serializers.IntegerField()
+
+
+class AdminUserMetricsSerializer(Serializer):
+    total = serializers.IntegerField()
+    active = serializers.IntegerField()
+    disabled = serializers.IntegerField()
+    by_user_type = serializers.DictField(child=serializers.IntegerField())
+
+
+class AdminSubscriptionMetricsSerializer(Serializer):
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    by_plan = serializers.DictField(child=serializers.IntegerField())
+
+
+class AdminAppMetricsSerializer(Serializer):
+    total = serializers.IntegerField()
+    by_plan = serializers.DictField(child=serializers.IntegerField())
+
+
+class AdminMetricsSerializer(Serializer):
+    users = AdminUserMetricsSerializer()
+    subscriptions = AdminSubscriptionMetricsSerializer()
+    apps = AdminAppMetricsSerializer()
+    generated_at = serializers.DateTimeField()
+    stale = serializers.BooleanField()
+
+
+class AdminAuditEventSerializer(ModelSerializer):
+    class Meta:
+        model = AdminAuditEvent
+        fields = ("id", "actor", "actor_email", "target", "action", "detail", "occurred_at")
+
+
+class AdminAuditEventQuerySerializer(Serializer):
+    actor = serializers.IntegerField(required=False)
+    target = serializers.IntegerField(required=False)
+    action = serializers.ChoiceField(choices=AdminAuditEvent.Action.choices, required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
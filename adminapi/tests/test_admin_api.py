@@ -1,9 +1,28 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
-from billing.models import Subscription
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from django.utils import timezone
+from billing.models import Subscription, SubscriptionRollup
 from apps.models import App, AppUser
+from config.cache import clear_caches
+from adminapi.audit import audit_buffer, flush_audit_log
+from adminapi.metrics import METRICS_LOCK_KEY, get_metrics, refresh_metrics
+from adminapi.models import AdminAuditEvent
+from adminapi.views import admin_user_queryset, filter_admin_users
 
 User = get_user_model()
 
@@ -20,17 +39,20 @@ class AdminApiTests(APITestCase):
         app = App.objects.create(name="User App", owner=self.user)
         AppUser.objects.create(app=app, user=self.user, role=AppUser.Role.OWNER)
         self.client = APIClient()
+        audit_buffer.clear()
 
     def test_admin_list_and_filter(self):
         self.client.force_authenticate(user=self.admin)
         resp = self.client.get(reverse("admin-users-list"))
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(resp.data), 2)
+        self.assertGreaterEqual(len(resp.data["results"]), 2)
 
         resp = self.client.get(reverse("admin-users-list"), {"email": "user@example.com"})
-        self.assertEqual(len(resp.data), 1)
-        self.assertEqual(resp.data[0]["subscription_status"], "active")
-        self.assertEqual(resp.data[0]["owned_app_count"], 1)
+        self.assertEqual(resp.data["count"], 1)
+        self.assertEqual(resp.data["results"][0]["subscription_status"], "active")
+        self.assertEqual(resp.data["results"][0]["owned_app_count"], 1)
+        resp = self.client.get(reverse("admin-users-list"), {"email": "admin@example.com"})
+        self.assertEqual(resp.data["results"][0]["owned_app_count"], 0)
 
     def test_admin_detail_and_disable(self):
         self.client.force_authenticate(user=self.admin)
@@ -44,7 +66,487 @@ class AdminApiTests(APITestCase):
         self.user.refresh_from_db()
         self.assertTrue(self.user.is_disabled_by_admin)
 
+    def test_list_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.admin)
+        # Planner estimate lookup, count, page.
+        with self.assertNumQueries(3):
+            resp = self.client.get(reverse("admin-users-list"))
+        self.assertEqual(len(resp.data["results"]), 2)
+
+        for index in range(10):
+            user = User.objects.create_user(email=f"bulk{index}@example.com", user_type=User.UserType.PRO)
+            Subscription.objects.create(user=user, status="active", plan_id="pro")
+            App.objects.create(name=f"App {index}", owner=user)
+        with self.assertNumQueries(3):
+            resp = self.client.get(reverse("admin-users-list"))
+        self.assertEqual(len(resp.data["results"]), 12)
+        by_email = {row["email"]: row for row in resp.data["results"]}
+        self.assertEqual(by_email["bulk3@example.com"]["owned_app_count"], 1)
+        self.assertEqual(by_email["bulk3@example.com"]["subscription_plan"], "pro")
+        self.assertIsNone(by_email["admin@example.com"]["subscription_status"])
+
+    def test_list_keyset_pagination(self):
+        self.client.force_authenticate(user=self.admin)
+        joined = timezone.now()
+        for index in range(5):
+            User.objects.create_user(email=f"page{index}@example.com", date_joined=joined)
+        url = reverse("admin-users-list")
+
+        seen = []
+        resp = self.client.get(url, {"page_size": 3})
+        while True:
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertEqual(resp.data["count"], 7)
+            self.assertFalse(resp.data["count_is_estimate"])
+            seen.extend(row["id"] for row in resp.data["results"])
+            if not resp.data["next"]:
+                break
+            resp = self.client.get(resp.data["next"])
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+        newest = list(User.objects.order_by("-date_joined", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, newest)
+
+        resp = self.client.get(url, {"page_size": 2, "email": "page"})
+        self.assertEqual(resp.data["count"], 5)
+        resp = self.client.get(resp.data["next"])
+        self.assertTrue(all(row["email"].startswith("page") for row in resp.data["results"]))
+
+        resp = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_uses_estimated_count_when_unfiltered(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin-users-list")
+        with mock.patch("adminapi.pagination.estimated_row_count", return_value=250000):
+            with self.settings(ADMIN_EXACT_COUNT_THRESHOLD=1000):
+                resp = self.client.get(url)
+                self.assertEqual(resp.data["count"], 250000)
+                self.assertTrue(resp.data["count_is_estimate"])
+
+                resp = self.client.get(url, {"count": "exact"})
+                self.assertEqual(resp.data["count"], 2)
+                self.assertFalse(resp.data["count_is_estimate"])
+
+                resp = self.client.get(url, {"user_type": "pro"})
+                self.assertEqual(resp.data["count"], 1)
+                self.assertFalse(resp.data["count_is_estimate"])
+
+    def test_search_ranks_and_requires_minimum_length(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin-users-list")
+        User.objects.create_user(email="zed@example.com", first_name="Maria", last_name="Lopez")
+        User.objects.create_user(email="maria.lopez@example.com")
+        User.objects.create_user(email="other@example.com", last_name="Marian")
+
+        resp = self.client.get(url, {"search": "ma"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        resp = self.client.get(url, {"search": "MARIA"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        emails = [row["email"] for row in resp.data["results"]]
+        self.assertEqual(set(emails), {"zed@example.com", "maria.lopez@example.com", "other@example.com"})
+        self.assertEqual(resp.data["count"], 3)
+        self.assertIsNone(resp.data["next"])
+
+        pages, next_url = [], url + "?search=maria&page_size=1"
+        while next_url:
+            resp = self.client.get(next_url)
+            self.assertEqual(resp.data["count"], 3)
+            pages += [row["email"] for row in resp.data["results"]]
+            next_url = resp.data["next"]
+        self.assertEqual(pages, emails)
+
+        resp = self.client.get(url, {"search": "lopez", "page_size": 1})
+        self.assertEqual(resp.data["count"], 2)
+        self.assertEqual(len(resp.data["results"]), 1)
+        self.assertEqual(self.client.get(url, {"search": "lopez", "cursor": "bad"}).status_code, 404)
+
+        User.objects.filter(email="zed@example.com").update(last_name="Nguyen")
+        User.objects.filter(email="maria.lopez@example.com").delete()
+        resp = self.client.get(url, {"search": "lopez"})
+        self.assertEqual(resp.data["count"], 0)
+
+        resp = self.client.get(url, {"search": "maria", "user_type": "pro"})
+        self.assertEqual(resp.data["count"], 0)
+
+    def test_search_pages_cross_rank_boundaries(self):
+        self.client.force_authenticate(user=self.admin)
+        for index in range(3):
+            User.objects.create_user(email=f"ana{index}@example.com")
+            User.objects.create_user(email=f"x-ana{index}@example.com")
+        url = reverse("admin-users-list")
+        best = [row["email"] for row in self.client.get(url, {"search": "ana"}).data["results"]]
+        self.assertEqual(len(best), 6)
+        self.assertTrue(all(email.startswith("ana") for email in best[:3]))
+
+        pages, next_url = [], f"{url}?search=ana&page_size=2"
+        while next_url:
+            resp = self.client.get(next_url)
+            pages.append([row["email"] for row in resp.data["results"]])
+            next_url = resp.data["next"]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(sum(pages, []), best)
+
+    def test_export_streams_ndjson_csv_and_gzip(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin-users-export")
+
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+        by_email = {row["email"]: row for row in rows}
+        self.assertEqual(set(by_email), {"admin@example.com", "user@example.com"})
+        self.assertEqual(by_email["user@example.com"]["subscription_plan"], "pro")
+        self.assertEqual(by_email["user@example.com"]["owned_app_count"], 1)
+
+        resp = self.client.get(url, {"output": "csv", "subscription_status": "active"})
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        lines = list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode())))
+        self.assertEqual(lines[0][:2], ["id", "email"])
+        self.assertEqual([line[1] for line in lines[1:]], ["user@example.com"])
+
+        User.objects.filter(pk=self.user.pk).update(first_name="=HYPERLINK(\"http://x\")", last_name="-1+2")
+        resp = self.client.get(url, {"output": "csv", "subscription_status": "active"})
+        row = list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode())))[1]
+        self.assertEqual(row[2:4], ["'=HYPERLINK(\"http://x\")", "'-1+2"])
+        resp = self.client.get(url, {"subscription_status": "active"})
+        self.assertEqual(json.loads(b"".join(resp.streaming_content))["last_name"], "-1+2")
+
+        resp = self.client.get(url, {"gzip": "true"})
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        self.assertIn('filename="users.ndjson.gz"', resp["Content-Disposition"])
+        body = gzip.decompress(b"".join(resp.streaming_content))
+        self.assertEqual(len(body.splitlines()), 2)
+
+        resp = self.client.get(url, {"output": "xml"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ASYNC_VIEWS=True, ADMIN_EXPORT_CHUNK_SIZE=1, ADMIN_EXPORT_BUFFER_BYTES=1)
+    async def test_export_streams_asynchronously_under_asgi(self):
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.admin)))()
+        resp = await AsyncClient().get(reverse("admin-users-export"), headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.is_async)
+        chunks = [chunk async for chunk in resp.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual({json.loads(chunk)["email"] for chunk in chunks}, {"admin@example.com", "user@example.com"})
+
+    def test_detail_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.admin)
+        detail_url = reverse("admin-users-detail", args=[self.user.id])
+        with self.assertNumQueries(1):
+            resp = self.client.get(detail_url)
+        self.assertEqual(resp.data["owned_app_count"], 1)
+        self.assertEqual(resp.data["subscription_status"], "active")
+        # Lookup, savepoint, UPDATE, token revocation, release.
+        with self.assertNumQueries(5):
+            self.client.patch(detail_url, {"is_disabled_by_admin": True}, format="json")
+
+    def test_disable_revokes_refresh_tokens(self):
+        self.client.force_authenticate(user=self.admin)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.patch(reverse("admin-users-detail", args=[self.user.id]), {"is_disabled_by_admin": True}, format="json")
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=refresh["jti"]).exists())
+
+    def test_bulk_toggle_by_ids_and_filter(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin-users-bulk")
+        cohort = [User.objects.create_user(email=f"abuse{i}@example.com", is_active=True) for i in range(4)]
+        tokens = [RefreshToken.for_user(user) for user in cohort for _ in range(2)]
+        RefreshToken.for_user(cohort[0]).blacklist()
+        keep = RefreshToken.for_user(self.user)
+
+        # Savepoint, revocation INSERT ... SELECT, UPDATE, release.
+        with self.assertNumQueries(4):
+            resp = self.client.post(
+                url, {"ids": [user.id for user in cohort], "is_disabled_by_admin": True}, format="json"
+            )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data, {"updated": 4, "tokens_revoked": 8})
+        self.assertEqual(User.objects.filter(is_disabled_by_admin=True).count(), 4)
+        self.assertEqual(
+            BlacklistedToken.objects.filter(token__jti__in=[token["jti"] for token in tokens]).count(), len(tokens)
+        )
+        self.assertFalse(BlacklistedToken.objects.filter(token__jti=keep["jti"]).exists())
+
+        resp = self.client.post(reverse("auth-refresh"), {"refresh": str(tokens[0])}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        resp = self.client.post(url, {"ids": [user.id for user in cohort], "is_disabled_by_admin": True}, format="json")
+        self.assertEqual(resp.data, {"updated": 0, "tokens_revoked": 0})
+
+        resp = self.client.post(
+            url, {"filter": {"is_disabled_by_admin": True}, "is_disabled_by_admin": False}, format="json"
+        )
+        self.assertEqual(resp.data, {"updated": 4, "tokens_revoked": 0})
+
+        resp = self.client.post(url, {"filter": {"user_type": "basic"}, "is_disabled_by_admin": True}, format="json")
+        self.assertEqual(resp.data["updated"], 4)
+        self.admin.refresh_from_db()
+        self.assertFalse(self.admin.is_disabled_by_admin)
+
+    def test_bulk_toggle_requires_ids_or_filter(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin-users-bulk")
+        for body in (
+            {"is_disabled_by_admin": True},
+            {"is_disabled_by_admin": True, "filter": {}},
+            {"is_disabled_by_admin": True, "ids": [self.user.id], "filter": {"user_type": "pro"}},
+        ):
+            resp = self.client.post(url, body, format="json")
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.user)
+        resp = self.client.post(url, {"is_disabled_by_admin": True, "ids": [self.admin.id]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_grouped_and_cached(self):
+        clear_caches()
+        self.client.force_authenticate(user=self.admin)
+        User.objects.create_user(email="off@example.com", is_disabled_by_admin=True)
+        Subscription.objects.create(user=self.admin, status="canceled", plan_id="")
+        url = reverse("admin-metrics")
+
+        with self.assertNumQueries(3):
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            resp.data["users"], {"total": 3, "active": 2, "disabled": 1, "by_user_type": {"basic": 2, "pro": 1}}
+        )
+        self.assertEqual(resp.data["subscriptions"]["by_status"], {"active": 1, "canceled": 1})
+        self.assertEqual(resp.data["subscriptions"]["by_plan"], {"pro": 1, "none": 1})
+        self.assertEqual(resp.data["apps"], {"total": 1, "by_plan": {"pro": 1}})
+        self.assertFalse(resp.data["stale"])
+
+        User.objects.create_user(email="late@example.com")
+        with self.assertNumQueries(0):
+            resp = self.client.get(url)
+        self.assertEqual(resp.data["users"]["total"], 3)
+
+    def test_cold_metrics_keep_another_workers_refresh_lock(self):
+        clear_caches()
+        cache.add(METRICS_LOCK_KEY, "other-worker", 30)
+        with self.settings(ADMIN_METRICS_LOCK_SECONDS=0):
+            metrics, stale = get_metrics()
+        self.assertFalse(stale)
+        self.assertEqual(metrics["users"]["total"], 2)
+        self.assertEqual(cache.get(METRICS_LOCK_KEY), "other-worker")
+
+    def test_metrics_serve_stale_and_refresh_once(self):
+        clear_caches()
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin-metrics")
+        self.client.get(url)
+        User.objects.create_user(email="late@example.com")
+
+        with self.settings(ADMIN_METRICS_FRESH_SECONDS=0), mock.patch(
+            "adminapi.metrics.start_background_refresh"
+        ) as start:
+            with self.assertNumQueries(0):
+                first = self.client.get(url)
+                second = self.client.get(url)
+        self.assertTrue(first.data["stale"])
+        self.assertEqual(first.data["users"]["total"], 2)
+        self.assertEqual(second.data["users"]["total"], 2)
+        start.assert_called_once_with()
+
+        refresh_metrics()
+        resp = self.client.get(url)
+        self.assertFalse(resp.data["stale"])
+        self.assertEqual(resp.data["users"]["total"], 3)
+
+    def test_audit_events_are_buffered_and_batched(self):
+        self.client.force_authenticate(user=self.admin)
+        detail_url = reverse("admin-users-detail", args=[self.user.id])
+        with self.settings(ADMIN_AUDIT_BUFFER_SIZE=3, ADMIN_AUDIT_FLUSH_SECONDS=3600):
+            self.client.patch(detail_url, {"is_disabled_by_admin": True}, format="json")
+            self.client.patch(detail_url, {"is_disabled_by_admin": True}, format="json")
+            self.client.patch(detail_url, {"is_disabled_by_admin": False}, format="json")
+            self.assertEqual(len(audit_buffer), 2)
+            self.assertFalse(AdminAuditEvent.objects.exists())
+
+            # The third event fills the buffer: all three go out in one INSERT (inside a savepoint).
+            with CaptureQueriesContext(connection) as queries:
+                audit_buffer.record(self.admin, AdminAuditEvent.Action.BULK_ENABLE, updated=0)
+            statements = [query["sql"] for query in queries if "SAVEPOINT" not in query["sql"]]
+            self.assertEqual(len(statements), 1)
+            self.assertTrue(statements[0].startswith("INSERT"))
+        self.assertEqual(len(audit_buffer), 0)
+        actions = list(AdminAuditEvent.objects.order_by("id").values_list("action", "target_id", "actor_email"))
+        self.assertEqual(
+            actions,
+            [
+                ("disable", self.user.id, "admin@example.com"),
+                ("enable", self.user.id, "admin@example.com"),
+                ("bulk_enable", None, "admin@example.com"),
+            ],
+        )
+
+        with self.settings(ADMIN_AUDIT_FLUSH_SECONDS=0):
+            self.client.patch(detail_url, {"is_disabled_by_admin": True}, format="json")
+        self.assertEqual(AdminAuditEvent.objects.count(), 4)
+
+        with self.settings(ADMIN_AUDIT_FLUSH_SECONDS=3600):
+            self.client.patch(detail_url, {"is_disabled_by_admin": False}, format="json")
+            self.assertEqual(len(audit_buffer), 1)
+            self.assertEqual(flush_audit_log(), 1)
+        self.assertEqual(AdminAuditEvent.objects.count(), 5)
+
+    def test_audit_event_query(self):
+        self.client.force_authenticate(user=self.admin)
+        other = User.objects.create_user(email="other@example.com")
+        with self.settings(ADMIN_AUDIT_FLUSH_SECONDS=3600):
+            self.client.patch(
+                reverse("admin-users-detail", args=[self.user.id]), {"is_disabled_by_admin": True}, format="json"
+            )
+            self.client.patch(
+                reverse("admin-users-detail", args=[other.id]), {"is_disabled_by_admin": True}, format="json"
+            )
+            self.client.post(
+                reverse("admin-users-bulk"), {"filter": {"user_type": "pro"}, "is_disabled_by_admin": False}, format="json"
+            )
+            url = reverse("admin-audit-events")
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["action"] for row in resp.data["results"]], ["bulk_enable", "disable", "disable"])
+        self.assertEqual(resp.data["results"][0]["detail"], {"updated": 1, "tokens_revoked": 0, "filter": {"user_type": "pro"}})
+
+        resp = self.client.get(url, {"target": other.id})
+        self.assertEqual([row["target"] for row in resp.data["results"]], [other.id])
+        resp = self.client.get(url, {"actor": self.admin.id, "action": "disable", "page_size": 1})
+        self.assertEqual(len(resp.data["results"]), 1)
+        self.assertIsNotNone(resp.data["next"])
+        resp = self.client.get(url, {"since": (timezone.now() + timedelta(minutes=1)).isoformat()})
+        self.assertEqual(resp.data["results"], [])
+
+    def test_database_stats(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(reverse("admin-db-stats"))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        default = resp.data["databases"]["default"]
+        self.assertEqual(default["vendor"], connection.vendor)
+        self.assertEqual(default["conn_max_age"], connection.settings_dict["CONN_MAX_AGE"])
+        self.assertEqual(default["pooled"], "pool" in default)
+
     def test_non_admin_blocked(self):
         self.client.force_authenticate(user=self.user)
         resp = self.client.get(reverse("admin-users-list"))
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        resp = self.client.get(reverse("admin-users-export"))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        resp = self.client.get(reverse("admin-metrics"))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_subscription_rollups_query(self):
+        today = timezone.localdate()
+        for plan_id in ("basic", "pro"):
+            SubscriptionRollup.objects.create(
+                period=SubscriptionRollup.Period.DAY, period_start=today, plan_id=plan_id, active_count=4, upgrades=2
+            )
+        SubscriptionRollup.objects.create(
+            period=SubscriptionRollup.Period.MONTH, period_start=today.replace(day=1), plan_id="pro", active_count=4
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        with self.assertNumQueries(1):
+            resp = self.client.get(reverse("admin-subscription-rollups"), {"plan_id": "pro"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]["upgrades"], 2)
+
+        resp = self.client.get(reverse("admin-subscription-rollups"), {"period": "month"})
+        self.assertEqual([row["period"] for row in resp.data], ["month"])
+
+        self.client.force_authenticate(user=self.user)
+        resp = self.client.get(reverse("admin-subscription-rollups"))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@skipUnless(connection.vendor in ("sqlite", "postgresql"), "planner assertions cover SQLite and PostgreSQL")
+class AdminUserQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f"plan{i}@example.com",
+                    user_type=User.UserType.PRO if i % 10 == 0 else User.UserType.BASIC,
+                    is_disabled_by_admin=i % 50 == 0,
+                )
+                for i in range(3000)
+            ]
+        )
+        Subscription.objects.bulk_create(
+            [Subscription(user=user, status="active" if i % 20 == 0 else "canceled") for i, user in enumerate(users)]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def plan(self, **params) -> str:
+        qs = filter_admin_users(User.objects.all(), params)
+        return qs.order_by("-date_joined", "-id")[:51].explain()
+
+    def test_page_query_reads_in_index_order_without_grouping(self):
+        # Owned apps are counted per row, so the scan stops at LIMIT rather than sorting every user.
+        plan = admin_user_queryset().order_by("-date_joined", "-id")[:51].explain()
+        self.assertIn("users_user_joined_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_user_type_filter_uses_composite_index(self):
+        self.assertIn("users_user_type_joined_idx", self.plan(user_type="pro"))
+        self.assertIn("users_user_type_joined_idx", self.plan(user_type="pro", is_disabled_by_admin="false"))
+
+    def test_disabled_filter_uses_partial_index(self):
+        self.assertIn("users_user_disabled_joined_idx", self.plan(is_disabled_by_admin="true"))
+
+    def test_subscription_status_filter_uses_status_index(self):
+        self.assertIn("billing_sub_status_user_idx", self.plan(subscription_status="active"))
+
+
+class AuditBufferFailureTests(TransactionTestCase):
+    # Foreign keys are checked at commit, so this needs real transactions.
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email="admin@example.com", is_active=True, is_staff=True)
+        audit_buffer.clear()
+
+    def test_events_for_deleted_users_are_written_detached(self):
+        gone = User.objects.create_user(email="gone@example.com")
+        deleted = User.objects.create_user(email="deleted@example.com")
+        kept = User.objects.create_user(email="kept@example.com")
+        with self.settings(ADMIN_AUDIT_FLUSH_SECONDS=3600):
+            audit_buffer.record(self.admin, AdminAuditEvent.Action.DISABLE, target=gone)
+            audit_buffer.record(self.admin, AdminAuditEvent.Action.DISABLE, target=deleted)
+            audit_buffer.record(self.admin, AdminAuditEvent.Action.DISABLE, target=kept)
+        gone_id, deleted_id = gone.id, deleted.id
+        # One user is deleted by another request, the other through the instance the event holds.
+        User.objects.filter(pk=gone_id).delete()
+        deleted.delete()
+
+        with self.assertLogs("adminapi.audit", "WARNING"):
+            self.assertEqual(flush_audit_log(), 3)
+        self.assertEqual(len(audit_buffer), 0)
+        rows = list(AdminAuditEvent.objects.order_by("id").values_list("target_id", "actor_id", "detail"))
+        self.assertEqual(
+            rows,
+            [
+                (None, self.admin.id, {"target_id": gone_id}),
+                (None, self.admin.id, {"target_id": deleted_id}),
+                (kept.id, self.admin.id, {}),
+            ],
+        )
+        self.assertEqual(flush_audit_log(), 0)
+
+    def test_transient_errors_keep_the_batch(self):
+        with self.settings(ADMIN_AUDIT_FLUSH_SECONDS=3600):
+            audit_buffer.record(self.admin, AdminAuditEvent.Action.ENABLE, target=self.admin)
+        with (
+            mock.patch.object(AdminAuditEvent.objects, "bulk_create", side_effect=OperationalError("gone")),
+            self.assertLogs("adminapi.audit", "ERROR"),
+        ):
+            self.assertEqual(flush_audit_log(), 0)
+        self.assertEqual(len(audit_buffer), 1)
+        self.assertEqual(flush_audit_log(), 1)
+        self.assertEqual(AdminAuditEvent.objects.count(), 1)
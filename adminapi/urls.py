@@ -1,8 +1,23 @@
 from django.urls import path
-from adminapi.views import AdminUserListView, AdminUserDetailView
+from adminapi.views import (
+    AdminAuditEventListView,
+    AdminDatabaseStatsView,
+    AdminMetricsView,
+    AdminSubscriptionRollupView,
+    AdminUserBulkToggleView,
+    AdminUserDetailView,
+    AdminUserExportView,
+    AdminUserListView,
+)
 
 
 urlpatterns = [
     path("admin/users/", AdminUserListView.as_view(), name="admin-users-list"),
+    path("admin/users/bulk/", AdminUserBulkToggleView.as_view(), name="admin-users-bulk"),
+    path("admin/users/export/", AdminUserExportView.as_view(), name="admin-users-export"),
     path("admin/users/<int:user_id>/", AdminUserDetailView.as_view(), name="admin-users-detail"),
+    path("admin/audit/", AdminAuditEventListView.as_view(), name="admin-audit-events"),
+    path("admin/db/", AdminDatabaseStatsView.as_view(), name="admin-db-stats"),
+    path("admin/metrics/", AdminMetricsView.as_view(), name="admin-metrics"),
+    path("admin/subscriptions/rollups/", AdminSubscriptionRollupView.as_view(), name="admin-subscription-rollups"),
 ]
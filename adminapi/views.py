@@ -1,43 +1,186 @@
+from datetime import timedelta
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.views import APIView
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from apps.models import App
+from billing.models import SubscriptionRollup
+from billing.serializers import SubscriptionRollupQuerySerializer, SubscriptionRollupSerializer
+from config.db import connection_stats
+from config.views import APIView, ListAPIView
+from users.search import search_users
+from users.tokens import revoke_refresh_tokens
 
+from adminapi.audit import flush_audit_log, record_admin_action
+from adminapi.exports import EXPORT_FORMATS, astream_users, stream_users
+from adminapi.metrics import get_metrics
+from adminapi.models import AdminAuditEvent
+from adminapi.pagination import AuditEventCursorPagination, UserKeysetPagination
 from adminapi.permissions import IsAdminUserType
-from adminapi.serializers import AdminUserSerializer, AdminUserToggleSerializer
+from adminapi.serializers import (
+    AdminAuditEventQuerySerializer,
+    AdminAuditEventSerializer,
+    AdminMetricsSerializer,
+    AdminUserBulkToggleResultSerializer,
+    AdminUserBulkToggleSerializer,
+    AdminUserSerializer,
+    AdminUserToggleSerializer,
+)
 
 User = get_user_model()
 
 
+def admin_user_queryset(qs=None):
+    # A correlated count keeps the query ungrouped, so an index scan in page
+    # order can stop at LIMIT instead of aggregating and sorting every user.
+    qs = User.objects.all() if qs is None else qs
+    owned_apps = App.objects.filter(owner=OuterRef("pk")).values("owner").annotate(count=Count("id")).values("count")
+    return qs.select_related("subscription").annotate(owned_app_count=Coalesce(Subquery(owned_apps), 0))
+
+
+def filter_admin_users(qs, params):
+    email = params.get("email")
+    user_type = params.get("user_type")
+    is_disabled = params.get("is_disabled_by_admin")
+    subscription_status = params.get("subscription_status")
+
+    if email:
+        qs = qs.filter(email__icontains=email)
+    if user_type:
+        qs = qs.filter(user_type=user_type)
+    if isinstance(is_disabled, str):
+        is_disabled = {"true": True, "false": False}.get(is_disabled.lower())
+    if is_disabled is not None:
+        qs = qs.filter(is_disabled_by_admin=is_disabled)
+    if subscription_status:
+        qs = qs.filter(subscription__status=subscription_status)
+    return qs
+
+
+ADMIN_USER_FILTER_PARAMETERS = [
+    OpenApiParameter("email", str, description="Case-insensitive substring match."),
+    OpenApiParameter("user_type", str),
+    OpenApiParameter("is_disabled_by_admin", bool),
+    OpenApiParameter("subscription_status", str),
+]
+
+
 class AdminUserListView(APIView):
     permission_classes = [IsAdminUserType]
     serializer_class = AdminUserSerializer
+    pagination_class = UserKeysetPagination
 
-    @extend_schema(operation_id="admin_users_list", responses=AdminUserSerializer(many=True))
+    @extend_schema(
+        operation_id="admin_users_list",
+        parameters=[
+            *ADMIN_USER_FILTER_PARAMETERS,
+            OpenApiParameter(
+                "search",
+                str,
+                description="Ranked substring search over email, first and last name; at least "
+                "`ADMIN_SEARCH_MIN_LENGTH` characters. Best matches first; follow `next` for more.",
+            ),
+            OpenApiParameter("cursor", str, description="Opaque cursor from `next`."),
+            OpenApiParameter("page_size", int, description="Default 50, max 200."),
+            OpenApiParameter("count", str, enum=["exact"], description="Force an exact COUNT(*)."),
+        ],
+        responses=AdminUserSerializer(many=True),
+    )
     def get(self, request):
-        qs = User.objects.all().annotate(owned_app_count=Count("owned_apps"))
-
-        email = request.query_params.get("email")
-        user_type = request.query_params.get("user_type")
-        is_disabled = request.query_params.get("is_disabled_by_admin")
-        subscription_status = request.query_params.get("subscription_status")
-
-        if email:
-            qs = qs.filter(email__icontains=email)
-        if user_type:
-            qs = qs.filter(user_type=user_type)
-        if is_disabled is not None:
-            if is_disabled.lower() == "true":
-                qs = qs.filter(is_disabled_by_admin=True)
-            elif is_disabled.lower() == "false":
-                qs = qs.filter(is_disabled_by_admin=False)
-        if subscription_status:
-            qs = qs.filter(subscription__status=subscription_status)
-
-        serializer = AdminUserSerializer(qs, many=True)
-        return Response(serializer.data)
+        qs = filter_admin_users(User.objects.all(), request.query_params)
+        paginator = self.pagination_class()
+        term = request.query_params.get("search", "").strip()
+        if term:
+            if len(term) < settings.ADMIN_SEARCH_MIN_LENGTH:
+                return Response(
+                    {"detail": f"Search needs at least {settings.ADMIN_SEARCH_MIN_LENGTH} characters."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = search_users(qs, term)
+            page = paginator.paginate_ranked(admin_user_queryset(qs), request, count_queryset=qs)
+        else:
+            page = paginator.paginate_queryset(admin_user_queryset(qs), request, view=self, count_queryset=qs)
+        return paginator.get_paginated_response(AdminUserSerializer(page, many=True).data)
+
+
+class AdminUserExportView(APIView):
+    permission_classes = [IsAdminUserType]
+
+    @extend_schema(
+        operation_id="admin_users_export",
+        parameters=[
+            *ADMIN_USER_FILTER_PARAMETERS,
+            OpenApiParameter("output", str, enum=list(EXPORT_FORMATS), description="Default `ndjson`."),
+            OpenApiParameter("gzip", bool, description="Gzip the body and add `.gz` to the filename."),
+        ],
+        responses={(200, media_type): OpenApiTypes.BINARY for media_type in (*EXPORT_FORMATS.values(), "application/gzip")},
+    )
+    def get(self, request):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response({"detail": "Unsupported output format."}, status=status.HTTP_400_BAD_REQUEST)
+        use_gzip = request.query_params.get("gzip", "").lower() in ("1", "true")
+        qs = admin_user_queryset(filter_admin_users(User.objects.all(), request.query_params)).order_by("id")
+
+        filename = f"users.{output}" + (".gz" if use_gzip else "")
+        stream = astream_users if settings.ASYNC_VIEWS else stream_users
+        response = StreamingHttpResponse(
+            stream(qs, output=output, gzip=use_gzip),
+            content_type="application/gzip" if use_gzip else EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+def set_users_disabled(users, disabled: bool) -> tuple[int, int]:
+    """Flip `is_disabled_by_admin` for `users` with one UPDATE, revoking tokens first when disabling.
+
+    Revocation runs before the UPDATE because `users` may itself filter on
+    `is_disabled_by_admin`. Returns (users updated, tokens revoked).
+    """
+    with transaction.atomic():
+        revoked = revoke_refresh_tokens(users) if disabled else 0
+        updated = users.exclude(is_disabled_by_admin=disabled).update(is_disabled_by_admin=disabled)
+    return updated, revoked
+
+
+class AdminUserBulkToggleView(APIView):
+    permission_classes = [IsAdminUserType]
+
+    @extend_schema(
+        operation_id="admin_users_bulk_toggle",
+        request=AdminUserBulkToggleSerializer,
+        responses=AdminUserBulkToggleResultSerializer,
+    )
+    def post(self, request):
+        serializer = AdminUserBulkToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if "ids" in data:
+            users = User.objects.filter(pk__in=data["ids"])
+        else:
+            users = filter_admin_users(User.objects.all(), data["filter"])
+        # Never lock the acting admin out with a broad filter.
+        users = users.exclude(pk=request.user.pk)
+        disabled = data["is_disabled_by_admin"]
+        updated, revoked = set_users_disabled(users, disabled)
+        selector = {"ids": data["ids"]} if "ids" in data else {"filter": dict(data["filter"])}
+        record_admin_action(
+            request.user,
+            AdminAuditEvent.Action.BULK_DISABLE if disabled else AdminAuditEvent.Action.BULK_ENABLE,
+            updated=updated,
+            tokens_revoked=revoked,
+            **selector,
+        )
+        return Response({"updated": updated, "tokens_revoked": revoked})
 
 
 class AdminUserDetailView(APIView):
@@ -45,7 +188,7 @@ class AdminUserDetailView(APIView):
     serializer_class = AdminUserSerializer
 
     def get_object(self, pk):
-        return User.objects.annotate(owned_app_count=Count("owned_apps")).filter(pk=pk).first()
+        return admin_user_queryset().filter(pk=pk).first()
 
     @extend_schema(responses=AdminUserSerializer)
     def get(self, request, user_id):
@@ -62,5 +205,79 @@ class AdminUserDetailView(APIView):
             return Response(status=status.HTTP_404_NOT_FOUND)
         serializer = AdminUserToggleSerializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        was_disabled = user.is_disabled_by_admin
+        with transaction.atomic():
+            serializer.save()
+            if user.is_disabled_by_admin:
+                revoke_refresh_tokens(User.objects.filter(pk=user.pk))
+        if user.is_disabled_by_admin != was_disabled:
+            action = AdminAuditEvent.Action.DISABLE if user.is_disabled_by_admin else AdminAuditEvent.Action.ENABLE
+            record_admin_action(request.user, action, target=user)
         return Response(AdminUserSerializer(user).data)
+
+
+class AdminMetricsView(APIView):
+    permission_classes = [IsAdminUserType]
+    serializer_class = AdminMetricsSerializer
+
+    @extend_schema(operation_id="admin_metrics", responses=AdminMetricsSerializer)
+    def get(self, request):
+        metrics, stale = get_metrics()
+        return Response(AdminMetricsSerializer({**metrics, "stale": stale}).data)
+
+
+class AdminAuditEventListView(ListAPIView):
+    permission_classes = [IsAdminUserType]
+    serializer_class = AdminAuditEventSerializer
+    pagination_class = AuditEventCursorPagination
+
+    @extend_schema(parameters=[AdminAuditEventQuerySerializer])
+    def get(self, request, *args, **kwargs):
+        # Make this process's own pending events visible before reading.
+        flush_audit_log()
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        query = AdminAuditEventQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        filters = query.validated_data
+        qs = AdminAuditEvent.objects.all()
+        if "actor" in filters:
+            qs = qs.filter(actor_id=filters["actor"])
+        if "target" in filters:
+            qs = qs.filter(target_id=filters["target"])
+        if "action" in filters:
+            qs = qs.filter(action=filters["action"])
+        if "since" in filters:
+            qs = qs.filter(occurred_at__gte=filters["since"])
+        if "until" in filters:
+            qs = qs.filter(occurred_at__lt=filters["until"])
+        return qs
+
+
+class AdminDatabaseStatsView(APIView):
+    permission_classes = [IsAdminUserType]
+
+    @extend_schema(operation_id="admin_database_stats", responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response({"databases": connection_stats()})
+
+
+class AdminSubscriptionRollupView(APIView):
+    permission_classes = [IsAdminUserType]
+    serializer_class = SubscriptionRollupSerializer
+
+    @extend_schema(parameters=[SubscriptionRollupQuerySerializer], responses=SubscriptionRollupSerializer(many=True))
+    def get(self, request):
+        query = SubscriptionRollupQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        period = query.validated_data["period"]
+        end = query.validated_data.get("end") or timezone.localdate()
+        default_span = timedelta(days=30) if period == SubscriptionRollup.Period.DAY else timedelta(days=365)
+        start = query.validated_data.get("start") or end - default_span
+
+        qs = SubscriptionRollup.objects.filter(period=period, period_start__gte=start, period_start__lte=end)
+        plan_id = query.validated_data.get("plan_id")
+        if plan_id:
+            qs = qs.filter(plan_id=plan_id)
+        return Response(SubscriptionRollupSerializer(qs, many=True).data)
@@ -1,22 +1,31 @@
 from django.contrib import admin
 from apps.models import App, AppUser
+from config.admin import LargeTableAdminMixin, PaginatedInlineMixin
 
 
-class AppUserInline(admin.TabularInline):
+class AppUserInline(PaginatedInlineMixin, admin.TabularInline):
     model = AppUser
     extra = 0
     readonly_fields = ("invited_at",)
+    autocomplete_fields = ("user",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user", "app")
 
 
 @admin.register(App)
-class AppAdmin(admin.ModelAdmin):
+class AppAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("name", "owner", "created_at")
+    list_select_related = ("owner",)
     search_fields = ("name", "owner__email")
+    autocomplete_fields = ("owner",)
     inlines = [AppUserInline]
 
 
 @admin.register(AppUser)
-class AppUserAdmin(admin.ModelAdmin):
+class AppUserAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("app", "user", "role", "invited_at")
+    list_select_related = ("app", "user")
     list_filter = ("role",)
     search_fields = ("app__name", "user__email")
+    autocomplete_fields = ("app", "user")
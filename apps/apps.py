@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AppsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from apps.cache import forget_membership
+        from apps.models import AppUser
+
+        post_save.connect(forget_membership, sender=AppUser, dispatch_uid="apps.cache.forget_membership.save")
+        post_delete.connect(forget_membership, sender=AppUser, dispatch_uid="apps.cache.forget_membership.delete")
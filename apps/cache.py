@@ -0,0 +1,31 @@
+from django.conf import settings
+from apps.models import AppUser
+from config.cache import tiered_cache
+
+MEMBERSHIP_NAMESPACE = "apps.membership"
+
+
+def load_role(app_id, user_id) -> str | None:
+    return AppUser.objects.filter(app_id=app_id, user_id=user_id).values_list("role", flat=True).first()
+
+
+def membership_role(app_id, user_id) -> str | None:
+    """The user's role in the app, or None.
+
+    Cached only when the shared tier is one store for all workers (not
+    `locmem`), and then in that tier only, so a revocation applies on every
+    worker at once. Otherwise each permission check reads the database.
+    """
+    if not tiered_cache.is_shared:
+        return load_role(app_id, user_id)
+    return tiered_cache.get_or_compute(
+        MEMBERSHIP_NAMESPACE,
+        f"{app_id}:{user_id}",
+        lambda: load_role(app_id, user_id),
+        settings.APP_MEMBERSHIP_CACHE_TIMEOUT,
+        local=False,
+    )
+
+
+def forget_membership(sender, instance, **kwargs):
+    tiered_cache.delete(MEMBERSHIP_NAMESPACE, f"{instance.app_id}:{instance.user_id}")
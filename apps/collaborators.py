@@ -1,15 +1,16 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers, status
 from rest_framework.response import Response
-from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 from apps.models import App, AppUser
 from apps.permissions import IsAppOwner
+from config.serializers import ModelSerializer, Serializer
+from config.views import APIView
 
 User = get_user_model()
 
 
-class CollaboratorSerializer(serializers.ModelSerializer):
+class CollaboratorSerializer(ModelSerializer):
     email = serializers.EmailField(source="user.email", read_only=True)
 
     class Meta:
@@ -18,7 +19,7 @@ class CollaboratorSerializer(serializers.ModelSerializer):
         read_only_fields = ("user", "email", "invited_at")
 
 
-class CollaboratorAddSerializer(serializers.Serializer):
+class CollaboratorAddSerializer(Serializer):
     email = serializers.EmailField()
     role = serializers.ChoiceField(choices=AppUser.Role.choices, default=AppUser.Role.VIEWER)
 
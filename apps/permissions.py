@@ -1,18 +1,19 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from apps.cache import membership_role
 from apps.models import AppUser, App
 
 
 class IsAppMember(BasePermission):
     def has_object_permission(self, request, view, obj):
-        membership = obj.app_users.filter(user=request.user).first()
-        if not membership:
+        role = membership_role(obj.pk, request.user.pk)
+        if not role:
             return False
         if request.method in SAFE_METHODS:
             return True
         if request.method in ("PUT", "PATCH"):
-            return membership.role in (AppUser.Role.OWNER, AppUser.Role.EDITOR)
+            return role in (AppUser.Role.OWNER, AppUser.Role.EDITOR)
         if request.method == "DELETE":
-            return membership.role == AppUser.Role.OWNER
+            return role == AppUser.Role.OWNER
         return False
 
 
@@ -20,5 +21,5 @@ class IsAppOwner(BasePermission):
     def has_permission(self, request, view):
         app = getattr(view, "app", None)
         if isinstance(app, App):
-            return app.app_users.filter(user=request.user, role=AppUser.Role.OWNER).exists()
+            return membership_role(app.pk, request.user.pk) == AppUser.Role.OWNER
         return False
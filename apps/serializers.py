@@ -1,9 +1,11 @@
 from django.conf import settings
 from rest_framework import serializers
+from apps.cache import membership_role
 from apps.models import App, AppUser
+from config.serializers import ModelSerializer
 
 
-class AppSerializer(serializers.ModelSerializer):
+class AppSerializer(ModelSerializer):
     role = serializers.SerializerMethodField()
 
     class Meta:
@@ -12,9 +14,7 @@ class AppSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at", "updated_at", "role")
 
     def get_role(self, obj) -> str | None:
-        user = self.context["request"].user
-        membership = obj.app_users.filter(user=user).first()
-        return membership.role if membership else None
+        return membership_role(obj.pk, self.context["request"].user.pk)
 
     def create(self, validated_data):
         user = self.context["request"].user
@@ -1,8 +1,16 @@
+import tempfile
+from unittest import mock
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
 from apps.models import App, AppUser
+from config.cache import clear_caches
+from config.idempotency import IdempotencyRecord
 
 
 User = get_user_model()
@@ -20,6 +28,7 @@ class AppTests(APITestCase):
             email="viewer@example.com", password="Pass1234", is_active=True, user_type=User.UserType.BASIC
         )
         self.client = APIClient()
+        clear_caches()
 
     def test_create_app_respects_limit(self):
         self.client.force_authenticate(user=self.owner)
@@ -108,3 +117,137 @@ class AppTests(APITestCase):
             reverse("app-collaborators-delete", args=[app.id, self.editor.id])
         )
         self.assertEqual(delete_collab_resp.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_membership_is_not_cached_in_a_per_process_cache(self):
+        app = App.objects.create(name="Owner App", owner=self.owner)
+        AppUser.objects.create(app=app, user=self.editor, role=AppUser.Role.EDITOR)
+        self.client.force_authenticate(user=self.editor)
+        url = reverse("app-detail", args=[app.id])
+        self.client.patch(url, {"name": "One"}, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.patch(url, {"name": "Two"}, format="json").status_code, status.HTTP_200_OK)
+        self.assertTrue(any('"apps_appuser"."role"' in q["sql"] for q in queries.captured_queries))
+
+    def test_cached_membership_is_dropped_when_collaborator_changes(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        shared_cache = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir.name}}
+        )
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        app = App.objects.create(name="Owner App", owner=self.owner)
+        AppUser.objects.create(app=app, user=self.owner, role=AppUser.Role.OWNER)
+        membership = AppUser.objects.create(app=app, user=self.editor, role=AppUser.Role.EDITOR)
+        url = reverse("app-detail", args=[app.id])
+
+        self.client.force_authenticate(user=self.editor)
+        self.assertEqual(self.client.patch(url, {"name": "One"}, format="json").status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as cached:
+            self.client.patch(url, {"name": "Two"}, format="json")
+        self.assertFalse(any('"apps_appuser"."role"' in q["sql"] for q in cached.captured_queries))
+
+        membership.role = AppUser.Role.VIEWER
+        membership.save()
+        self.assertEqual(self.client.patch(url, {"name": "Three"}, format="json").status_code, status.HTTP_403_FORBIDDEN)
+        membership.delete()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_app_replays_idempotent_retry(self):
+        self.client.force_authenticate(user=self.owner)
+        first = self.client.post(
+            reverse("app-list"), {"name": "Retried App"}, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+        )
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            retry = self.client.post(
+                reverse("app-list"), {"name": "Retried App"}, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+            )
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(App.objects.filter(owner=self.owner).count(), 1)
+
+        reused = self.client.post(
+            reverse("app-list"), {"name": "Other App"}, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+        )
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_idempotency_key_is_scoped_per_user(self):
+        self.client.force_authenticate(user=self.owner)
+        self.client.post(reverse("app-list"), {"name": "Mine"}, format="json", HTTP_IDEMPOTENCY_KEY="shared")
+        self.client.force_authenticate(user=self.editor)
+        resp = self.client.post(reverse("app-list"), {"name": "Mine"}, format="json", HTTP_IDEMPOTENCY_KEY="shared")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", resp)
+        self.assertEqual(App.objects.filter(name="Mine").count(), 2)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.1)
+    def test_in_flight_duplicate_waits_then_conflicts(self):
+        request = APIRequestFactory().post(
+            reverse("app-list"), {"name": "Slow App"}, format="json", HTTP_IDEMPOTENCY_KEY="slow"
+        )
+        drf_request = Request(request)
+        drf_request.user = self.owner
+        IdempotencyRecord(drf_request, "slow").acquire()
+
+        self.client.force_authenticate(user=self.owner)
+        resp = self.client.post(reverse("app-list"), {"name": "Slow App"}, format="json", HTTP_IDEMPOTENCY_KEY="slow")
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(App.objects.filter(name="Slow App").exists())
+
+
+class AppAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="root@example.com", password="Pass1234")
+        self.client.force_login(self.admin)
+
+    def add_apps(self, count, start=0):
+        for index in range(start, start + count):
+            owner = User.objects.create_user(email=f"admin-owner{index}@example.com")
+            app = App.objects.create(name=f"App {index}", owner=owner)
+            AppUser.objects.create(app=app, user=owner, role=AppUser.Role.OWNER)
+
+    def changelist_queries(self, url) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_counts_do_not_grow_with_rows(self):
+        for name in ("admin:apps_app_changelist", "admin:apps_appuser_changelist"):
+            with self.subTest(name):
+                self.add_apps(2, start=0 if name.endswith("app_changelist") else 100)
+                small = self.changelist_queries(reverse(name))
+                self.add_apps(15, start=200 if name.endswith("app_changelist") else 300)
+                self.assertEqual(self.changelist_queries(reverse(name)), small)
+
+    def test_changelist_uses_estimated_count_when_unfiltered(self):
+        self.add_apps(3)
+        url = reverse("admin:apps_app_changelist")
+        with self.settings(ADMIN_EXACT_COUNT_THRESHOLD=1000), mock.patch(
+            "config.admin.estimated_row_count", return_value=250000
+        ):
+            resp = self.client.get(url)
+            self.assertEqual(resp.context["cl"].result_count, 250000)
+            resp = self.client.get(url, {"q": "App 1"})
+            self.assertEqual(resp.context["cl"].result_count, 1)
+
+    def test_collaborator_inline_is_paginated(self):
+        owner = User.objects.create_user(email="big-owner@example.com")
+        app = App.objects.create(name="Crowded", owner=owner)
+        collaborators = User.objects.bulk_create([User(email=f"collab{i}@example.com") for i in range(45)])
+        AppUser.objects.bulk_create([AppUser(app=app, user=user) for user in collaborators])
+        url = reverse("admin:apps_app_change", args=[app.pk])
+
+        resp = self.client.get(url)
+        formset = resp.context["inline_admin_formsets"][0].formset
+        self.assertEqual(len(formset.initial_forms), 20)
+        self.assertEqual(formset.page.paginator.count, 45)
+        self.assertContains(resp, f"?{formset.prefix}-page=2")
+
+        resp = self.client.get(url, {f"{formset.prefix}-page": 3})
+        self.assertEqual(len(resp.context["inline_admin_formsets"][0].formset.initial_forms), 5)
+        template = next(t for t in resp.templates if t.name == "admin/edit_inline/paginated_tabular.html")
+        self.assertIn("config/templates", template.origin.name)
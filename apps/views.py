@@ -1,13 +1,15 @@
-from rest_framework import viewsets, status
+from rest_framework import status
 from rest_framework.response import Response
 from apps.models import App
 from apps.permissions import IsAppMember
 from apps.serializers import AppSerializer
-from django.conf import settings
+from billing.plans import get_catalog
+from config.idempotency import IdempotencyMixin
+from config.views import ModelViewSet
 from drf_spectacular.utils import extend_schema
 
 
-class AppViewSet(viewsets.ModelViewSet):
+class AppViewSet(IdempotencyMixin, ModelViewSet):
     queryset = App.objects.all()
     serializer_class = AppSerializer
     permission_classes = [IsAppMember]
@@ -19,7 +21,7 @@ class AppViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         user = request.user
         owned_count = App.objects.filter(owner=user).count()
-        limit = settings.PLAN_LIMITS.get(user.user_type, 0)
+        limit = get_catalog().app_limit(user.user_type)
         if owned_count >= limit:
             return Response(
                 {"detail": f"App limit reached for plan {user.user_type}.", "code": "APP_LIMIT_REACHED"},
@@ -0,0 +1,85 @@
+"""Measure peak Python memory of the admin user export as the user table grows.
+
+Users (half with a subscription, a third owning an app) are inserted in steps
+and the full NDJSON and CSV exports are drained at each size. With the export
+streaming over a chunked iterator, peak memory should stay flat as the row
+count grows. `--asgi` drains `astream_users`, the async iterator used under
+`DJANGO_SERVER_MODE=asgi`, instead.
+
+    python benchmarks/admin_export_memory.py --sizes 1000 10000 100000 [--asgi]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from adminapi.exports import astream_users, stream_users  # noqa: E402
+from adminapi.views import admin_user_queryset  # noqa: E402
+from apps.models import App  # noqa: E402
+from billing.models import Subscription  # noqa: E402
+
+User = get_user_model()
+
+
+def grow_to(total: int, batch: int = 5000):
+    start = User.objects.count()
+    for offset in range(start, total, batch):
+        users = User.objects.bulk_create(
+            [User(email=f"export{i}@example.com", password="!") for i in range(offset, min(offset + batch, total))]
+        )
+        Subscription.objects.bulk_create(
+            [Subscription(user=user, status="active", plan_id="pro") for user in users[::2]]
+        )
+        App.objects.bulk_create([App(name=f"App {user.pk}", owner=user) for user in users[::3]])
+
+
+async def drain(chunks) -> int:
+    return sum([len(chunk) async for chunk in chunks])
+
+
+def measure(output: str, use_gzip: bool, use_asgi: bool = False) -> tuple[float, int, int]:
+    qs = admin_user_queryset().order_by("id")
+    tracemalloc.start()
+    started = time.perf_counter()
+    if use_asgi:
+        size = asyncio.run(drain(astream_users(qs, output=output, gzip=use_gzip)))
+    else:
+        size = sum(len(chunk) for chunk in stream_users(qs, output=output, gzip=use_gzip))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--asgi", action="store_true", help="Drain the async iterator used under ASGI.")
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    for total in sorted(args.sizes):
+        grow_to(total)
+        for output in ("ndjson", "csv"):
+            elapsed, peak, size = measure(output, args.gzip, args.asgi)
+            print(
+                f"{total:>9} users {output:<6} body={size / 1024 / 1024:8.1f}MiB "
+                f"peak_python={peak / 1024 / 1024:6.2f}MiB rows/s={total / elapsed:10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare unindexed `icontains` scans with the indexed admin user search.
+
+Seeds a users table with synthetic names and emails, then times the top 50
+rows for each term against whichever database the settings point at (pg_trgm
+on PostgreSQL, FTS5 trigram on SQLite). `scan` is the old newest-first
+`icontains` filter, which can stop after 50 hits; `scan_ranked` is the
+unindexed ranked fallback; `indexed` is `search_users`. Ranking has to score
+every match, so very common terms cost more than rare ones on every path.
+
+    python benchmarks/admin_user_search.py --users 200000 --repeat 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from users.search import rank_by_prefix, search_users, substring_filter  # noqa: E402
+
+User = get_user_model()
+
+FIRST = ["maria", "james", "wei", "fatima", "olga", "kenji", "amara", "lucas", "priya", "noah"]
+LAST = ["lopez", "smith", "chen", "okafor", "ivanova", "tanaka", "silva", "patel", "brown", "khan"]
+TERMS = ["maria", "okafor", "z9q", "example.com", "chen4"]
+
+
+def seed(total: int, batch: int = 10000):
+    rng = random.Random(7)
+    for offset in range(0, total, batch):
+        users = []
+        for i in range(offset, min(offset + batch, total)):
+            first, last = rng.choice(FIRST), rng.choice(LAST)
+            users.append(
+                User(email=f"{first}.{last}{i}@example.com", first_name=first.title(), last_name=last.title(), password="!")
+            )
+        User.objects.bulk_create(users)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE users_user")
+
+
+def timed(build, repeat: int) -> tuple[float, int]:
+    samples, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(build()[:50])
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    started = time.perf_counter()
+    seed(args.users)
+    print(f"seeded {args.users} users on {connection.vendor} in {time.perf_counter() - started:.1f}s")
+    for term in TERMS:
+        scan, scan_rows = timed(lambda: User.objects.filter(substring_filter(term)).order_by("-date_joined"), args.repeat)
+        ranked, _ = timed(lambda: rank_by_prefix(User.objects.all(), term), args.repeat)
+        indexed, rows = timed(lambda: search_users(User.objects.all(), term), args.repeat)
+        print(
+            f"{term!r:>15} scan={scan * 1000:8.1f}ms scan_ranked={ranked * 1000:8.1f}ms "
+            f"indexed={indexed * 1000:8.1f}ms ranked_speedup={ranked / indexed:6.1f}x rows={rows}/{scan_rows}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Throughput and tail latency of the WSGI and ASGI serving modes under load.
+
+Each mode runs the real `gunicorn` entry point (gunicorn.conf.py) with the same
+number of worker processes against one temporary SQLite database, so resident
+memory is comparable; the summed RSS of the master and its workers is printed
+next to each result so that can be checked. An httpx client keeps
+`--concurrency` requests in flight for `--duration` seconds against each of:
+
+- the health check (no I/O),
+- the authenticated subscription endpoint (cache or one read),
+- the billing portal endpoint, whose Stripe call goes to a local stand-in
+  that answers after `--stripe-latency` seconds (I/O-bound).
+
+Sync workers hold a process for the whole Stripe wait; uvicorn workers keep
+serving other requests on the event loop meanwhile.
+
+    python benchmarks/asgi_load.py --workers 2 --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+PATHS = (
+    ("GET", "/api/v1/health/"),
+    ("GET", "/api/v1/subscriptions/me/"),
+    ("POST", "/api/v1/subscriptions/stripe/portal/"),
+)
+
+
+class SlowStripeHandler(BaseHTTPRequestHandler):
+    latency = 0.1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.latency)
+        body = b'{"id": "bps_load", "object": "billing_portal.session", "url": "https://portal.test"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowStripeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_stripe_stand_in(latency: float) -> SlowStripeServer:
+    SlowStripeHandler.latency = latency
+    server = SlowStripeServer(("127.0.0.1", 0), SlowStripeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def prepare_database(sqlite_path: str) -> str:
+    """Migrate the temporary database and return an access token for a subscribed user."""
+    os.environ["SQLITE_PATH"] = sqlite_path
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from billing.models import Subscription
+
+    call_command("migrate", verbosity=0)
+    user = get_user_model().objects.create_user(email="load@example.com", password="Pass1234", is_active=True)
+    Subscription.objects.create(
+        user=user, status=Subscription.Status.ACTIVE, plan_id="pro", stripe_customer_id="cus_load"
+    )
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(pid: int) -> int:
+    """Summed VmRSS in bytes of `pid` and its direct children (Linux /proc)."""
+    pids = [pid]
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            if int(stat.read_text().rsplit(")", 1)[1].split()[1]) == pid:
+                pids.append(int(stat.parent.name))
+        except (OSError, ValueError, IndexError):
+            continue
+    total = 0
+    for child in pids:
+        try:
+            for line in Path(f"/proc/{child}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def start_server(mode: str, workers: int, port: int, sqlite_path: str, stripe_base: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DJANGO_SERVER_MODE": mode,
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "SQLITE_PATH": sqlite_path,
+        "STRIPE_API_BASE": stripe_base,
+        "STRIPE_SECRET_KEY": "sk_test_load",
+        "DRF_THROTTLE_USER": "100000000/day",
+        "DRF_THROTTLE_ANON": "100000000/day",
+    }
+    server = subprocess.Popen(["gunicorn"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/health/").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn ({mode}) did not start")
+
+
+async def load(base_url: str, method: str, path: str, token: str, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def user():
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.request(method, path, headers=headers)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - started
+
+
+def summarize(mode: str, path: str, latencies: list[float], errors: int, elapsed: float, rss: int):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else float("nan")
+    median = statistics.median(latencies) if latencies else float("nan")
+    print(
+        f"{mode:<5} {path:<38} throughput={len(latencies) / elapsed:8.1f} req/s "
+        f"p50={median * 1000:7.1f}ms p99={p99 * 1000:7.1f}ms errors={errors:<4} rss={rss / 2**20:6.1f}MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2, help="worker processes in both modes")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per path")
+    parser.add_argument("--stripe-latency", type=float, default=0.1, help="Stripe stand-in delay in seconds")
+    parser.add_argument("--modes", nargs="+", default=["wsgi", "asgi"], choices=["wsgi", "asgi"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = str(Path(tmp) / "load.sqlite3")
+        token = prepare_database(sqlite_path)
+        stripe_server = start_stripe_stand_in(args.stripe_latency)
+        stripe_base = f"http://127.0.0.1:{stripe_server.server_address[1]}"
+        print(
+            f"{args.workers} workers per mode, {args.concurrency} concurrent clients, {args.duration:.0f}s per path, "
+            f"Stripe stand-in latency {args.stripe_latency * 1000:.0f}ms"
+        )
+        try:
+            for mode in args.modes:
+                port = free_port()
+                server = start_server(mode, args.workers, port, sqlite_path, stripe_base)
+                base_url = f"http://127.0.0.1:{port}"
+                try:
+                    for method, path in PATHS:
+                        asyncio.run(load(base_url, method, path, token, args.concurrency, 1.0))
+                        latencies, errors, elapsed = asyncio.run(
+                            load(base_url, method, path, token, args.concurrency, args.duration)
+                        )
+                        summarize(mode, path, latencies, errors, elapsed, process_tree_rss(server.pid))
+                finally:
+                    server.send_signal(signal.SIGTERM)
+                    server.wait(timeout=30)
+        finally:
+            stripe_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
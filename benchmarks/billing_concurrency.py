@@ -0,0 +1,156 @@
+"""Compare checkout concurrency under sync (WSGI-style) and async (ASGI-style) views.
+
+A local HTTP server stands in for Stripe and answers every call after a fixed
+delay. The sync view is driven by a fixed pool of threads, one request at a
+time each, the way gunicorn sync workers serve it; the async view is driven by
+one event loop, the way a single ASGI worker serves it.
+
+    python benchmarks/billing_concurrency.py --latency 0.2 --requests 200 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+import stripe  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import AsyncRequestFactory  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+from billing.models import Subscription  # noqa: E402
+from billing.views import AsyncSubscriptionCheckoutSessionView, SubscriptionCheckoutSessionView  # noqa: E402
+
+User = get_user_model()
+
+
+class SlowStripeHandler(BaseHTTPRequestHandler):
+    latency = 0.2
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.latency)
+        body = json.dumps({"id": "cs_bench", "object": "checkout.session", "url": "https://checkout.test"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowStripeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_stripe_stand_in(latency: float) -> SlowStripeServer:
+    SlowStripeHandler.latency = latency
+    server = SlowStripeServer(("127.0.0.1", 0), SlowStripeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stripe.api_base = f"http://127.0.0.1:{server.server_address[1]}"
+    stripe.api_key = "sk_test_bench"
+    return server
+
+
+def summarize(label: str, latencies: list[float], elapsed: float, peak: int):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:<28} requests={len(latencies):<5} wall={elapsed:6.2f}s "
+        f"throughput={len(latencies) / elapsed:7.1f} req/s p50={statistics.median(latencies) * 1000:7.1f}ms "
+        f"p99={p99 * 1000:7.1f}ms peak_in_flight={peak}"
+    )
+
+
+def run_sync(user, requests: int, workers: int):
+    view = SubscriptionCheckoutSessionView.as_view(throttle_classes=[])
+    factory = APIRequestFactory()
+    in_flight = peak = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal in_flight, peak
+        request = factory.post("/api/v1/subscriptions/stripe/checkout/", {"plan_id": "pro"}, format="json")
+        force_authenticate(request, user=user)
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        started = time.perf_counter()
+        response = view(request)
+        elapsed = time.perf_counter() - started
+        with lock:
+            in_flight -= 1
+        assert response.status_code == 200, response.data
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    summarize(f"WSGI ({workers} sync workers)", latencies, time.perf_counter() - started, peak)
+
+
+async def run_async(user, requests: int, concurrency: int):
+    view = AsyncSubscriptionCheckoutSessionView.as_view(throttle_classes=[])
+    factory = AsyncRequestFactory()
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = peak = 0
+
+    async def one():
+        nonlocal in_flight, peak
+        async with semaphore:
+            request = factory.post(
+                "/api/v1/subscriptions/stripe/checkout/", data={"plan_id": "pro"}, content_type="application/json"
+            )
+            force_authenticate(request, user=user)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            started = time.perf_counter()
+            response = await view(request)
+            elapsed = time.perf_counter() - started
+            in_flight -= 1
+            assert response.status_code == 200, response.data
+            return elapsed
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    summarize("ASGI (1 event loop)", list(latencies), time.perf_counter() - started, peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Stripe stand-in delay in seconds")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="sync worker count for the WSGI run")
+    parser.add_argument("--concurrency", type=int, default=200, help="in-flight cap for the ASGI run")
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    user = User.objects.create_user(email="bench@example.com", password="Pass1234", is_active=True)
+    Subscription.objects.create(user=user, stripe_customer_id="cus_bench")
+    server = start_stripe_stand_in(args.latency)
+    print(f"Stripe stand-in latency {args.latency * 1000:.0f}ms")
+    try:
+        run_sync(user, args.requests, args.workers)
+        asyncio.run(run_async(user, args.requests, args.concurrency))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Per-request database latency with fresh, persistent and pooled connections.
+
+Each mode runs in a child process configured through the same environment
+variables as production (`DB_POOL`, `DB_CONN_MAX_AGE`). A "request" fires
+Django's request_started/request_finished signals around one query, so
+connections are opened, kept or returned exactly as under gunicorn. Pooling is
+only measured on PostgreSQL (set POSTGRES_DB/USER/PASSWORD); without them the
+run uses a temporary SQLite file.
+
+    python benchmarks/db_connections.py --requests 2000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = {
+    "fresh": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "600"},
+    "pooled": {"DB_POOL": "true"},
+}
+
+
+def child(requests: int, sqlite_path: str):
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    if settings.DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+        settings.DATABASES["default"]["NAME"] = sqlite_path
+
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        request_finished.send(sender=None)
+        latencies.append(time.perf_counter() - started)
+    print(json.dumps({"vendor": connection.vendor, "latencies": latencies}))
+
+
+def run_mode(name: str, requests: int, sqlite_path: str):
+    env = {**os.environ, **MODES[name]}
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", "--requests", str(requests), "--sqlite-path", sqlite_path],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    latencies = sorted(result["latencies"])
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<11} {result['vendor']:<10} p50={statistics.median(latencies) * 1000:7.3f}ms "
+        f"p99={p99 * 1000:7.3f}ms mean={statistics.fmean(latencies) * 1000:7.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--sqlite-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests, args.sqlite_path)
+        return
+
+    postgres = all(os.getenv(name) for name in ("POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"))
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = str(Path(tmp) / "bench.sqlite3")
+        for name in MODES:
+            if name == "pooled" and not postgres:
+                print("pooled      skipped: connection pooling needs PostgreSQL")
+                continue
+            run_mode(name, args.requests, sqlite_path)
+
+
+if __name__ == "__main__":
+    main()
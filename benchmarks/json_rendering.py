@@ -0,0 +1,141 @@
+"""Encode and decode throughput of the stdlib and orjson DRF renderer/parser.
+
+Payloads are real serializer output from a throwaway test database: a
+200-row admin user list page (`AdminUserSerializer`), 200 apps
+(`AppSerializer`), and a Stripe `customer.subscription.updated` event of the
+kind webhooks receive. Each is rendered and parsed repeatedly with DRF's
+JSONRenderer/JSONParser and with config.renderers.ORJSONRenderer /
+config.parsers.ORJSONParser.
+
+    python benchmarks/json_rendering.py --rows 200 --seconds 1
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from adminapi.serializers import AdminUserSerializer  # noqa: E402
+from adminapi.views import admin_user_queryset  # noqa: E402
+from apps.models import App, AppUser  # noqa: E402
+from apps.serializers import AppSerializer  # noqa: E402
+from billing.models import Subscription  # noqa: E402
+from config.parsers import ORJSONParser  # noqa: E402
+from config.renderers import ORJSONRenderer, orjson  # noqa: E402
+
+User = get_user_model()
+
+
+def seed(rows: int):
+    users = User.objects.bulk_create(
+        [
+            User(email=f"bench{i}@example.com", first_name=f"First{i}", last_name=f"Läst{i}", is_active=True)
+            for i in range(rows)
+        ]
+    )
+    Subscription.objects.bulk_create(
+        [Subscription(user=user, status="active", plan_id="pro", price_id="price_pro") for user in users]
+    )
+    apps = App.objects.bulk_create(
+        [App(name=f"App {i}", description="Benchmark app " * 8, owner=users[0]) for i in range(rows)]
+    )
+    AppUser.objects.bulk_create([AppUser(app=app, user=users[0], role=AppUser.Role.OWNER) for app in apps])
+    return users[0]
+
+
+def payloads(owner, rows: int) -> dict:
+    request = APIRequestFactory().get("/api/v1/apps/")
+    force_authenticate(request, user=owner)
+    admin_page = {
+        "count": rows,
+        "count_is_estimate": False,
+        "next": "http://testserver/api/v1/admin/users/?cursor=eyJ2IjpbIjIwMjQiLDFdfQ",
+        "first": None,
+        "results": AdminUserSerializer(admin_user_queryset().order_by("-date_joined", "-id")[:rows], many=True).data,
+    }
+    apps = AppSerializer(App.objects.all()[:rows], many=True, context={"request": Request(request)}).data
+    webhook = {
+        "id": "evt_1Bench",
+        "object": "event",
+        "type": "customer.subscription.updated",
+        "created": 1714560000,
+        "data": {
+            "object": {
+                "id": "sub_bench",
+                "customer": "cus_bench",
+                "status": "active",
+                "cancel_at_period_end": False,
+                "current_period_start": 1714560000,
+                "current_period_end": 1717238400,
+                "items": {
+                    "object": "list",
+                    "data": [{"id": "si_bench", "price": {"id": "price_pro", "unit_amount": 1999, "currency": "usd"}}],
+                },
+                "metadata": {"plan_id": "pro"},
+            },
+            "previous_attributes": {"status": "trialing"},
+        },
+    }
+    return {"admin users page": admin_page, "app list": apps, "webhook event": webhook}
+
+
+def rate(fn, seconds: float) -> float:
+    calls, deadline = 0, time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(20):
+            fn()
+        calls += 20
+    return calls / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=1.0, help="measuring time per case")
+    args = parser.parse_args()
+    if orjson is None:
+        sys.exit("orjson is not installed; ORJSONRenderer would fall back to the stdlib.")
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    data = payloads(seed(args.rows), args.rows)
+    context = {"encoding": "utf-8"}
+    for name, payload in data.items():
+        body = JSONRenderer().render(payload)
+        assert ORJSONRenderer().render(payload) == body
+        results = {}
+        for label, renderer, json_parser in (
+            ("stdlib", JSONRenderer(), JSONParser()),
+            ("orjson", ORJSONRenderer(), ORJSONParser()),
+        ):
+            results[label] = (
+                rate(lambda: renderer.render(payload), args.seconds),
+                rate(lambda: json_parser.parse(io.BytesIO(body), "application/json", context), args.seconds),
+            )
+        print(f"{name} ({len(body) / 1024:.1f} KiB)")
+        for label, (encode, decode) in results.items():
+            print(
+                f"  {label:<7} encode {encode:9.0f}/s {encode * len(body) / 2**20:7.1f} MiB/s"
+                f"   decode {decode:9.0f}/s {decode * len(body) / 2**20:7.1f} MiB/s"
+            )
+        encode_speedup = results["orjson"][0] / results["stdlib"][0]
+        decode_speedup = results["orjson"][1] / results["stdlib"][1]
+        print(f"  speedup encode x{encode_speedup:.1f}, decode x{decode_speedup:.1f}")
+
+
+if __name__ == "__main__":
+    main()
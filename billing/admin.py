@@ -1,9 +1,41 @@
 from django.contrib import admin
-from billing.models import Subscription
+from config.admin import LargeTableAdminMixin
+from billing.models import Invoice, PlanDefinition, Subscription, SubscriptionEvent, SubscriptionRollup
 
 
 @admin.register(Subscription)
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("user", "status", "plan_id", "stripe_subscription_id", "cancel_at_period_end", "current_period_end")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     search_fields = ("user__email", "stripe_subscription_id", "stripe_customer_id")
     list_filter = ("status", "plan_id", "cancel_at_period_end")
+
+
+@admin.register(PlanDefinition)
+class PlanDefinitionAdmin(admin.ModelAdmin):
+    list_display = ("name", "tier", "app_limit", "is_active", "updated_at")
+    list_filter = ("is_active",)
+
+
+@admin.register(SubscriptionEvent)
+class SubscriptionEventAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("occurred_at", "user", "kind", "from_status", "to_status", "from_plan", "to_plan")
+    list_select_related = ("user",)
+    list_filter = ("kind", "to_plan")
+    date_hierarchy = "occurred_at"
+
+
+@admin.register(SubscriptionRollup)
+class SubscriptionRollupAdmin(admin.ModelAdmin):
+    list_display = ("period", "period_start", "plan_id", "active_count", "upgrades", "downgrades", "cancellations")
+    list_filter = ("period", "plan_id")
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("stripe_invoice_id", "user", "status", "total", "currency", "created")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    list_filter = ("status",)
+    search_fields = ("stripe_invoice_id", "number", "user__email", "stripe_customer_id")
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class BillingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "billing"
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+        from billing.cache import forget_subscription
+        from billing.models import Subscription
+        from billing.plans import load_catalog
+
+        # Also fires for subscriptions removed by a cascading user delete.
+        post_delete.connect(forget_subscription, sender=Subscription, dispatch_uid="billing.cache.forget_subscription")
+        load_catalog()
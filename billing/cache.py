@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import transaction
+from billing.models import Subscription
+from billing.serializers import SubscriptionSerializer
+from config.cache import tiered_cache
+
+SUBSCRIPTION_NAMESPACE = "billing.subscription"
+
+
+def subscription_cache_key(user_id) -> str:
+    """Shared-tier key of a user's cached subscription payload."""
+    return tiered_cache.make_key(SUBSCRIPTION_NAMESPACE, user_id)
+
+
+def subscription_payload(subscription: Subscription | None) -> dict:
+    return {"subscription": dict(SubscriptionSerializer(subscription).data) if subscription else None}
+
+
+def store_subscription(subscription: Subscription) -> dict:
+    payload = subscription_payload(subscription)
+    tiered_cache.set(SUBSCRIPTION_NAMESPACE, subscription.user_id, payload, settings.SUBSCRIPTION_CACHE_TIMEOUT)
+    return payload
+
+
+def forget_subscriptions(user_ids) -> None:
+    tiered_cache.delete_many(SUBSCRIPTION_NAMESPACE, user_ids)
+
+
+def forget_subscription(sender, instance, **kwargs):
+    forget_subscriptions([instance.user_id])
+    transaction.on_commit(lambda: forget_subscriptions([instance.user_id]))
+
+
+def get_subscription_payload(user) -> dict:
+    return tiered_cache.get_or_compute(
+        SUBSCRIPTION_NAMESPACE,
+        user.pk,
+        lambda: subscription_payload(Subscription.objects.filter(user=user).first()),
+        settings.SUBSCRIPTION_CACHE_TIMEOUT,
+    )
+
+
+async def aget_subscription_payload(user) -> dict:
+    """Async `get_subscription_payload`; a miss is read with the async ORM (no single flight, the key is per user)."""
+    payload = await tiered_cache.aget(SUBSCRIPTION_NAMESPACE, user.pk)
+    if payload is None:
+        payload = subscription_payload(await Subscription.objects.filter(user=user).afirst())
+        await tiered_cache.aset(SUBSCRIPTION_NAMESPACE, user.pk, payload, settings.SUBSCRIPTION_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BaseRenderer
+from billing.serializers import SubscriptionSerializer
+
+
+class LocalChannel:
+    """Delivers messages to listeners in this process only.
+
+    A cross-worker channel (Redis pub/sub, Postgres LISTEN/NOTIFY, ...) exposes
+    the same two methods and calls every listener for messages published by
+    any worker.
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def publish(self, message: dict):
+        for listener in list(self._listeners):
+            listener(message)
+
+
+class SubscriptionEventHub:
+    def __init__(self, channel):
+        self._lock = threading.Lock()
+        self._queues: dict[int, set] = {}
+        self.channel = channel
+        channel.subscribe(self._deliver)
+
+    def connect(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=settings.SUBSCRIPTION_EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._queues.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def disconnect(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            listeners = self._queues.get(user_id, set())
+            listeners.difference_update({item for item in listeners if item[1] is queue})
+            if not listeners:
+                self._queues.pop(user_id, None)
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return sum(len(listeners) for listeners in self._queues.values())
+
+    def publish(self, user_id: int, event: dict):
+        self.channel.publish({"user_id": user_id, "event": event})
+
+    def _deliver(self, message: dict):
+        with self._lock:
+            listeners = list(self._queues.get(message["user_id"], ()))
+        for loop, queue in listeners:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message["event"])
+            except RuntimeError:
+                self.disconnect(message["user_id"], queue)
+
+
+def _offer(queue: asyncio.Queue, event: dict):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+_hub: SubscriptionEventHub | None = None
+_hub_lock = threading.Lock()
+
+
+def get_hub() -> SubscriptionEventHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = SubscriptionEventHub(import_string(settings.SUBSCRIPTION_EVENTS_CHANNEL)())
+    return _hub
+
+
+def subscription_snapshot(subscription) -> tuple:
+    return tuple(getattr(subscription, field) for field in SubscriptionSerializer.Meta.fields)
+
+
+def subscription_event(subscription, user) -> dict:
+    return {
+        "subscription": dict(SubscriptionSerializer(subscription).data) if subscription else None,
+        "user_type": user.user_type,
+    }
+
+
+def publish_subscription_event(subscription):
+    user = subscription.user
+    event = subscription_event(subscription, user)
+    transaction.on_commit(lambda: get_hub().publish(user.pk, event))
+
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event("error", data).encode() if data is not None else b""
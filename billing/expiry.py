@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from billing.cache import forget_subscriptions
+from billing.history import record_bulk_transitions
+from billing.models import Subscription
+
+
+User = get_user_model()
+
+LAPSABLE_STATUSES = (
+    Subscription.Status.ACTIVE,
+    Subscription.Status.TRIALING,
+    Subscription.Status.PAST_DUE,
+)
+
+
+def lapsed_subscriptions(now):
+    return Subscription.objects.filter(
+        cancel_at_period_end=True,
+        current_period_end__lt=now,
+        status__in=LAPSABLE_STATUSES,
+    )
+
+
+def expire_batch(now, batch_size: int) -> tuple[int, int] | None:
+    with transaction.atomic():
+        candidates = list(
+            lapsed_subscriptions(now)
+            .order_by("current_period_end")
+            .select_for_update(skip_locked=True)
+            .values_list("id", "user_id", "status", "plan_id")[:batch_size]
+        )
+        if not candidates:
+            return None
+        ids = [row[0] for row in candidates]
+        # updated_at doubles as a claim token: only rows this run flipped carry
+        # it, so a concurrent sweeper never double-counts history or users.
+        stamp = timezone.now()
+        lapsed_subscriptions(now).filter(id__in=ids).update(status=Subscription.Status.CANCELED, updated_at=stamp)
+        claimed = set(
+            Subscription.objects.filter(id__in=ids, status=Subscription.Status.CANCELED, updated_at=stamp).values_list(
+                "id", flat=True
+            )
+        )
+        rows = [row for row in candidates if row[0] in claimed]
+        user_ids = [row[1] for row in rows]
+        downgraded = User.objects.filter(id__in=user_ids).exclude(user_type=User.UserType.BASIC).update(
+            user_type=User.UserType.BASIC
+        )
+        record_bulk_transitions(
+            [(sub_id, user_id, status, plan_id, Subscription.Status.CANCELED, plan_id) for sub_id, user_id, status, plan_id in rows],
+            occurred_at=stamp,
+        )
+        transaction.on_commit(lambda: forget_subscriptions(user_ids))
+    return len(rows), downgraded
+
+
+def expire_lapsed_subscriptions(now=None, batch_size: int = 500, max_batches: int | None = None) -> tuple[int, int]:
+    now = now or timezone.now()
+    expired = downgraded = batches = 0
+    while max_batches is None or batches < max_batches:
+        result = expire_batch(now, batch_size)
+        if result is None:
+            break
+        expired += result[0]
+        downgraded += result[1]
+        batches += 1
+    return expired, downgraded
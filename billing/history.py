@@ -0,0 +1,165 @@
+from collections import defaultdict
+from datetime import date
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from billing.models import Subscription, SubscriptionEvent, SubscriptionRollup
+from billing.plans import get_catalog
+
+
+ENTITLED_STATUSES = (
+    Subscription.Status.ACTIVE,
+    Subscription.Status.TRIALING,
+    Subscription.Status.PAST_DUE,
+)
+
+
+def effective_plan(status: str, plan_id: str) -> str:
+    return plan_id if plan_id and status in ENTITLED_STATUSES else ""
+
+
+def _tier(plan_id: str) -> int:
+    if not plan_id:
+        return -1
+    plan = get_catalog().get(plan_id)
+    return plan.tier if plan else 0
+
+
+def classify(from_plan: str, to_plan: str) -> str:
+    if from_plan == to_plan:
+        return SubscriptionEvent.Kind.STATUS
+    if not to_plan:
+        return SubscriptionEvent.Kind.CANCELLATION
+    if _tier(to_plan) > _tier(from_plan):
+        return SubscriptionEvent.Kind.UPGRADE
+    return SubscriptionEvent.Kind.DOWNGRADE
+
+
+def rollup_deltas(kind: str, from_plan: str, to_plan: str) -> dict[str, dict[str, int]]:
+    deltas = defaultdict(lambda: defaultdict(int))
+    if from_plan == to_plan:
+        return deltas
+    if from_plan:
+        deltas[from_plan]["active_count"] -= 1
+    if to_plan:
+        deltas[to_plan]["active_count"] += 1
+    if kind == SubscriptionEvent.Kind.UPGRADE:
+        deltas[to_plan]["upgrades"] += 1
+    elif kind == SubscriptionEvent.Kind.DOWNGRADE:
+        deltas[to_plan]["downgrades"] += 1
+    elif kind == SubscriptionEvent.Kind.CANCELLATION:
+        deltas[from_plan]["cancellations"] += 1
+    return deltas
+
+
+def period_starts(day: date) -> dict[str, date]:
+    return {
+        SubscriptionRollup.Period.DAY: day,
+        SubscriptionRollup.Period.MONTH: day.replace(day=1),
+    }
+
+
+def _ensure_rollup_row(period: str, period_start: date, plan_id: str):
+    lookup = {"period": period, "period_start": period_start, "plan_id": plan_id}
+    if SubscriptionRollup.objects.filter(**lookup).exists():
+        return
+    carried = (
+        SubscriptionRollup.objects.filter(period=period, plan_id=plan_id, period_start__lt=period_start)
+        .order_by("-period_start")
+        .values_list("active_count", flat=True)
+        .first()
+    )
+    try:
+        with transaction.atomic():
+            SubscriptionRollup.objects.create(active_count=carried or 0, **lookup)
+    except IntegrityError:
+        pass
+
+
+def apply_rollup_deltas(deltas: dict[str, dict[str, int]], day: date):
+    for period, period_start in period_starts(day).items():
+        for plan_id, counters in deltas.items():
+            updates = {field: F(field) + value for field, value in counters.items() if value}
+            if not updates:
+                continue
+            _ensure_rollup_row(period, period_start, plan_id)
+            SubscriptionRollup.objects.filter(period=period, period_start=period_start, plan_id=plan_id).update(**updates)
+
+
+def seed_active_counts(day: date | None = None) -> dict[str, int]:
+    """Set `day`'s rollup rows to the current number of entitled subscriptions per plan.
+
+    Rollups only move on transitions, so subscriptions that predate the history
+    need this once; running it again reconciles any drift.
+    """
+    day = day or timezone.localdate()
+    counts = dict(
+        Subscription.objects.filter(status__in=ENTITLED_STATUSES)
+        .exclude(plan_id="")
+        .values_list("plan_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        plan_ids = set(counts) | set(SubscriptionRollup.objects.values_list("plan_id", flat=True).distinct())
+        for period, period_start in period_starts(day).items():
+            for plan_id in plan_ids:
+                SubscriptionRollup.objects.update_or_create(
+                    period=period,
+                    period_start=period_start,
+                    plan_id=plan_id,
+                    defaults={"active_count": counts.get(plan_id, 0)},
+                )
+    return counts
+
+
+def record_transition(subscription: Subscription, from_status: str, from_plan_id: str, occurred_at=None):
+    if (from_status, from_plan_id) == (subscription.status, subscription.plan_id):
+        return None
+    occurred_at = occurred_at or timezone.now()
+    from_plan = effective_plan(from_status, from_plan_id)
+    to_plan = effective_plan(subscription.status, subscription.plan_id)
+    kind = classify(from_plan, to_plan)
+    with transaction.atomic():
+        event = SubscriptionEvent.objects.create(
+            subscription=subscription,
+            user_id=subscription.user_id,
+            kind=kind,
+            from_status=from_status or "",
+            to_status=subscription.status,
+            from_plan=from_plan_id or "",
+            to_plan=subscription.plan_id or "",
+            occurred_at=occurred_at,
+        )
+        apply_rollup_deltas(rollup_deltas(kind, from_plan, to_plan), timezone.localdate(occurred_at))
+    return event
+
+
+def record_bulk_transitions(rows, occurred_at=None) -> int:
+    """Append history for set-based updates; rows are (subscription_id, user_id, from_status, from_plan, to_status, to_plan)."""
+    occurred_at = occurred_at or timezone.now()
+    events = []
+    deltas = defaultdict(lambda: defaultdict(int))
+    for subscription_id, user_id, from_status, from_plan_id, to_status, to_plan_id in rows:
+        from_plan = effective_plan(from_status, from_plan_id)
+        to_plan = effective_plan(to_status, to_plan_id)
+        kind = classify(from_plan, to_plan)
+        events.append(
+            SubscriptionEvent(
+                subscription_id=subscription_id,
+                user_id=user_id,
+                kind=kind,
+                from_status=from_status or "",
+                to_status=to_status,
+                from_plan=from_plan_id or "",
+                to_plan=to_plan_id or "",
+                occurred_at=occurred_at,
+            )
+        )
+        for plan_id, counters in rollup_deltas(kind, from_plan, to_plan).items():
+            for field, value in counters.items():
+                deltas[plan_id][field] += value
+    with transaction.atomic():
+        SubscriptionEvent.objects.bulk_create(events)
+        apply_rollup_deltas(deltas, timezone.localdate(occurred_at))
+    return len(events)
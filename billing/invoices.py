@@ -0,0 +1,126 @@
+from datetime import datetime, timezone as dt_timezone
+from django.db import IntegrityError, transaction
+from billing.models import Invoice, Subscription
+
+
+INVOICE_EVENTS = {
+    "invoice.created",
+    "invoice.finalized",
+    "invoice.paid",
+    "invoice.payment_failed",
+    "invoice.updated",
+    "invoice.voided",
+    "invoice.marked_uncollectible",
+}
+
+STATUS_RANK = {
+    Invoice.Status.DRAFT: 0,
+    Invoice.Status.OPEN: 1,
+    Invoice.Status.UNCOLLECTIBLE: 2,
+    Invoice.Status.PAID: 3,
+    Invoice.Status.VOID: 3,
+}
+
+UPSERT_FIELDS = [
+    "user",
+    "stripe_customer_id",
+    "stripe_subscription_id",
+    "number",
+    "status",
+    "currency",
+    "amount_due",
+    "amount_paid",
+    "total",
+    "attempt_count",
+    "hosted_invoice_url",
+    "invoice_pdf",
+    "period_start",
+    "period_end",
+    "paid_at",
+    "created",
+    "updated_at",
+]
+
+
+def _timestamp(value):
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def invoice_fields(data) -> dict:
+    transitions = data.get("status_transitions") or {}
+    return {
+        "stripe_customer_id": data.get("customer") or "",
+        "stripe_subscription_id": data.get("subscription") or "",
+        "number": data.get("number") or "",
+        "status": data.get("status") or Invoice.Status.DRAFT,
+        "currency": data.get("currency") or "",
+        "amount_due": data.get("amount_due") or 0,
+        "amount_paid": data.get("amount_paid") or 0,
+        "total": data.get("total") or 0,
+        "attempt_count": data.get("attempt_count") or 0,
+        "hosted_invoice_url": data.get("hosted_invoice_url") or "",
+        "invoice_pdf": data.get("invoice_pdf") or "",
+        "period_start": _timestamp(data.get("period_start")),
+        "period_end": _timestamp(data.get("period_end")),
+        "paid_at": _timestamp(transitions.get("paid_at")),
+        "created": _timestamp(data.get("created")),
+    }
+
+
+def users_by_customer(customer_ids) -> dict[str, int]:
+    return dict(
+        Subscription.objects.filter(stripe_customer_id__in=set(customer_ids)).values_list("stripe_customer_id", "user_id")
+    )
+
+
+def upsert_invoice(data) -> Invoice | None:
+    fields = invoice_fields(data)
+    user_id = users_by_customer([fields["stripe_customer_id"]]).get(fields["stripe_customer_id"])
+    if not data.get("id") or not user_id or not fields["created"]:
+        return None
+    with transaction.atomic():
+        invoice = Invoice.objects.select_for_update().filter(stripe_invoice_id=data["id"]).first()
+        if invoice is None:
+            try:
+                with transaction.atomic():
+                    return Invoice.objects.create(stripe_invoice_id=data["id"], user_id=user_id, **fields)
+            except IntegrityError:
+                invoice = Invoice.objects.select_for_update().get(stripe_invoice_id=data["id"])
+        if STATUS_RANK.get(fields["status"], 0) < STATUS_RANK.get(invoice.status, 0):
+            # Stripe does not order deliveries; a late invoice.created must not
+            # roll a paid invoice back to draft.
+            fields.pop("status")
+            fields.pop("paid_at")
+        for field, value in fields.items():
+            setattr(invoice, field, value)
+        invoice.user_id = user_id
+        invoice.save()
+    return invoice
+
+
+def bulk_upsert_invoices(datas) -> int:
+    rows = [(data, invoice_fields(data)) for data in datas if data.get("id")]
+    user_ids = users_by_customer(fields["stripe_customer_id"] for _, fields in rows)
+    invoices = [
+        Invoice(stripe_invoice_id=data["id"], user_id=user_ids[fields["stripe_customer_id"]], **fields)
+        for data, fields in rows
+        if fields["stripe_customer_id"] in user_ids and fields["created"]
+    ]
+    with transaction.atomic():
+        # Same guard as upsert_invoice: a backfill must not roll back what a webhook already advanced.
+        existing = {
+            stripe_invoice_id: (status, paid_at)
+            for stripe_invoice_id, status, paid_at in Invoice.objects.select_for_update()
+            .filter(stripe_invoice_id__in=[invoice.stripe_invoice_id for invoice in invoices])
+            .values_list("stripe_invoice_id", "status", "paid_at")
+        }
+        for invoice in invoices:
+            current = existing.get(invoice.stripe_invoice_id)
+            if current and STATUS_RANK.get(invoice.status, 0) < STATUS_RANK.get(current[0], 0):
+                invoice.status, invoice.paid_at = current
+        Invoice.objects.bulk_create(
+            invoices, update_conflicts=True, unique_fields=["stripe_invoice_id"], update_fields=UPSERT_FIELDS
+        )
+    return len(invoices)
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone as dt_timezone
+import stripe
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from billing.invoices import bulk_upsert_invoices
+
+
+class Command(BaseCommand):
+    help = "Load historical Stripe invoices into the local Invoice mirror."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=datetime.fromisoformat, help="Only invoices created on or after this ISO date.")
+        parser.add_argument("--customer", help="Only invoices for this Stripe customer id.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+        params = {"limit": 100}
+        if options["since"]:
+            since = options["since"]
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=dt_timezone.utc)
+            params["created"] = {"gte": int(since.timestamp())}
+        if options["customer"]:
+            params["customer"] = options["customer"]
+
+        fetched = stored = 0
+        batch = []
+        for invoice in stripe.Invoice.list(**params).auto_paging_iter():
+            batch.append(invoice)
+            if len(batch) >= options["batch_size"]:
+                fetched += len(batch)
+                stored += bulk_upsert_invoices(batch)
+                batch = []
+        if batch:
+            fetched += len(batch)
+            stored += bulk_upsert_invoices(batch)
+        self.stdout.write(self.style.SUCCESS(f"Fetched {fetched} invoices, stored {stored}."))
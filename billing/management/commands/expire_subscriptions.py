@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from billing.expiry import expire_lapsed_subscriptions, lapsed_subscriptions
+
+
+class Command(BaseCommand):
+    help = "Cancel subscriptions whose period ended with cancel_at_period_end set, and downgrade their users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many subscriptions have lapsed.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options["dry_run"]:
+            self.stdout.write(f"{lapsed_subscriptions(now).count()} subscriptions have lapsed.")
+            return
+        expired, downgraded = expire_lapsed_subscriptions(
+            now, batch_size=options["batch_size"], max_batches=options["max_batches"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} subscriptions, downgraded {downgraded} users."))
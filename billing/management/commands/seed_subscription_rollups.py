@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from billing.history import seed_active_counts
+
+
+class Command(BaseCommand):
+    help = "Set today's subscription rollups to the current active subscriptions per plan."
+
+    def handle(self, *args, **options):
+        counts = seed_active_counts()
+        summary = ", ".join(f"{plan_id}={count}" for plan_id, count in sorted(counts.items())) or "none"
+        self.stdout.write(self.style.SUCCESS(f"Seeded active counts: {summary}."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanDefinition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('price_ids', models.JSONField(blank=True, default=list)),
+                ('app_limit', models.PositiveIntegerField(default=0)),
+                ('tier', models.PositiveSmallIntegerField(default=0)),
+                ('entitlements', models.JSONField(blank=True, default=list)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['tier', 'name'],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_plandefinition'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=8)),
+                ('period_start', models.DateField()),
+                ('plan_id', models.CharField(max_length=64)),
+                ('active_count', models.IntegerField(default=0)),
+                ('upgrades', models.PositiveIntegerField(default=0)),
+                ('downgrades', models.PositiveIntegerField(default=0)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['period', 'period_start', 'plan_id'],
+                'constraints': [models.UniqueConstraint(fields=('period', 'period_start', 'plan_id'), name='billing_rollup_unique_period_plan')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubscriptionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('upgrade', 'Upgrade'), ('downgrade', 'Downgrade'), ('cancellation', 'Cancellation'), ('status', 'Status change')], max_length=16)),
+                ('from_status', models.CharField(blank=True, max_length=32)),
+                ('to_status', models.CharField(blank=True, max_length=32)),
+                ('from_plan', models.CharField(blank=True, max_length=64)),
+                ('to_plan', models.CharField(blank=True, max_length=64)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='billing.subscription')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-occurred_at'],
+                'indexes': [models.Index(fields=['occurred_at'], name='billing_subevent_time_idx'), models.Index(fields=['user', 'occurred_at'], name='billing_subevent_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0003_subscription_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stripe_invoice_id', models.CharField(max_length=255, unique=True)),
+                ('stripe_customer_id', models.CharField(blank=True, default='', max_length=255)),
+                ('stripe_subscription_id', models.CharField(blank=True, default='', max_length=255)),
+                ('number', models.CharField(blank=True, default='', max_length=64)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('open', 'Open'), ('paid', 'Paid'), ('uncollectible', 'Uncollectible'), ('void', 'Void')], default='draft', max_length=16)),
+                ('currency', models.CharField(blank=True, default='', max_length=8)),
+                ('amount_due', models.BigIntegerField(default=0)),
+                ('amount_paid', models.BigIntegerField(default=0)),
+                ('total', models.BigIntegerField(default=0)),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('hosted_invoice_url', models.URLField(blank=True, default='', max_length=1024)),
+                ('invoice_pdf', models.URLField(blank=True, default='', max_length=1024)),
+                ('period_start', models.DateTimeField(blank=True, null=True)),
+                ('period_end', models.DateTimeField(blank=True, null=True)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created', '-id'],
+                'indexes': [models.Index(fields=['user', '-created'], name='billing_invoice_user_created')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0004_invoice'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('cancel_at_period_end', True)), fields=['current_period_end'], name='billing_sub_cancel_period_end'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_subscription_expiry_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'user'], name='billing_sub_status_user_idx'),
+        ),
+    ]
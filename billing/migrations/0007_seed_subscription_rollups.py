@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count
+from django.utils import timezone
+
+# Frozen copy of billing.history at the time of this migration.
+ENTITLED_STATUSES = ("active", "trialing", "past_due")
+
+
+def seed_active_counts(apps, schema_editor):
+    Subscription = apps.get_model("billing", "Subscription")
+    SubscriptionRollup = apps.get_model("billing", "SubscriptionRollup")
+    counts = dict(
+        Subscription.objects.filter(status__in=ENTITLED_STATUSES)
+        .exclude(plan_id="")
+        .values_list("plan_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    today = timezone.localdate()
+    for period, period_start in (("day", today), ("month", today.replace(day=1))):
+        for plan_id, count in counts.items():
+            SubscriptionRollup.objects.update_or_create(
+                period=period, period_start=period_start, plan_id=plan_id, defaults={"active_count": count}
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0006_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_active_counts, migrations.RunPython.noop),
+    ]
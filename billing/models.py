@@ -1,7 +1,7 @@
-from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from billing.plans import Plan, get_catalog, invalidate_catalog
 
 
 User = get_user_model()
@@ -30,15 +30,20 @@ class Subscription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["current_period_end"],
+                condition=models.Q(cancel_at_period_end=True),
+                name="billing_sub_cancel_period_end",
+            ),
+            # Admin list filter on subscription__status: resolve matching users from the index alone.
+            models.Index(fields=["status", "user"], name="billing_sub_status_user_idx"),
+        ]
+
     def set_plan_from_price(self, price_id: str | None):
-        if not price_id:
-            self.plan_id = ""
-            return
-        for plan, pid in settings.PLAN_PRICE_MAP.items():
-            if pid == price_id:
-                self.plan_id = plan
-                return
-        self.plan_id = ""
+        plan = get_catalog().for_price(price_id) if price_id else None
+        self.plan_id = plan.name if plan else ""
 
     def mark_status(self, status: str, price_id: str | None = None, cancel_at_period_end: bool | None = None, period_end=None, period_start=None, trial_end=None):
         self.status = status
@@ -55,5 +60,136 @@ class Subscription(models.Model):
             self.trial_end = timezone.make_aware(trial_end) if timezone.is_naive(trial_end) else trial_end
         self.save()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from billing.cache import forget_subscriptions, store_subscription
+
+        # Drop the entry now and write through only once the row is committed, so a
+        # rolled-back transaction never leaves its status/plan in the cache.
+        forget_subscriptions([self.user_id])
+        transaction.on_commit(lambda: store_subscription(self))
+
     def __str__(self):
         return f"{self.user.email} - {self.status}"
+
+
+class PlanDefinition(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+    price_ids = models.JSONField(default=list, blank=True)
+    app_limit = models.PositiveIntegerField(default=0)
+    tier = models.PositiveSmallIntegerField(default=0)
+    entitlements = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["tier", "name"]
+
+    def to_plan(self) -> Plan:
+        return Plan(
+            name=self.name,
+            price_ids=tuple(self.price_ids),
+            app_limit=self.app_limit,
+            tier=self.tier,
+            entitlements=frozenset(self.entitlements),
+        )
+
+    # Bump the catalog version only once the rows are committed; otherwise another
+    # worker could load the old rows under the new version and keep them.
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        transaction.on_commit(invalidate_catalog)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidate_catalog)
+        return result
+
+    def __str__(self):
+        return self.name
+
+
+class SubscriptionEvent(models.Model):
+    class Kind(models.TextChoices):
+        UPGRADE = "upgrade", "Upgrade"
+        DOWNGRADE = "downgrade", "Downgrade"
+        CANCELLATION = "cancellation", "Cancellation"
+        STATUS = "status", "Status change"
+
+    subscription = models.ForeignKey(Subscription, on_delete=models.CASCADE, related_name="events")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    from_status = models.CharField(max_length=32, blank=True)
+    to_status = models.CharField(max_length=32, blank=True)
+    from_plan = models.CharField(max_length=64, blank=True)
+    to_plan = models.CharField(max_length=64, blank=True)
+    occurred_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-occurred_at"]
+        indexes = [
+            models.Index(fields=["occurred_at"], name="billing_subevent_time_idx"),
+            models.Index(fields=["user", "occurred_at"], name="billing_subevent_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.kind} {self.from_plan or '-'} -> {self.to_plan or '-'}"
+
+
+class SubscriptionRollup(models.Model):
+    class Period(models.TextChoices):
+        DAY = "day", "Day"
+        MONTH = "month", "Month"
+
+    period = models.CharField(max_length=8, choices=Period.choices)
+    period_start = models.DateField()
+    plan_id = models.CharField(max_length=64)
+    active_count = models.IntegerField(default=0)
+    upgrades = models.PositiveIntegerField(default=0)
+    downgrades = models.PositiveIntegerField(default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["period", "period_start", "plan_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["period", "period_start", "plan_id"], name="billing_rollup_unique_period_plan"),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.period_start} {self.plan_id}"
+
+
+class Invoice(models.Model):
+    class Status(models.TextChoices):
+        DRAFT = "draft", "Draft"
+        OPEN = "open", "Open"
+        PAID = "paid", "Paid"
+        UNCOLLECTIBLE = "uncollectible", "Uncollectible"
+        VOID = "void", "Void"
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="invoices")
+    stripe_invoice_id = models.CharField(max_length=255, unique=True)
+    stripe_customer_id = models.CharField(max_length=255, blank=True, default="")
+    stripe_subscription_id = models.CharField(max_length=255, blank=True, default="")
+    number = models.CharField(max_length=64, blank=True, default="")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.DRAFT)
+    currency = models.CharField(max_length=8, blank=True, default="")
+    amount_due = models.BigIntegerField(default=0)
+    amount_paid = models.BigIntegerField(default=0)
+    total = models.BigIntegerField(default=0)
+    attempt_count = models.PositiveIntegerField(default=0)
+    hosted_invoice_url = models.URLField(max_length=1024, blank=True, default="")
+    invoice_pdf = models.URLField(max_length=1024, blank=True, default="")
+    period_start = models.DateTimeField(blank=True, null=True)
+    period_end = models.DateTimeField(blank=True, null=True)
+    paid_at = models.DateTimeField(blank=True, null=True)
+    created = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created", "-id"]
+        indexes = [models.Index(fields=["user", "-created"], name="billing_invoice_user_created")]
+
+    def __str__(self):
+        return self.number or self.stripe_invoice_id
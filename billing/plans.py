@@ -0,0 +1,119 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from django.conf import settings
+from django.db import DatabaseError
+from config.cache import tiered_cache
+
+
+CATALOG_NAMESPACE = "billing.plans"
+
+
+@dataclass(frozen=True)
+class Plan:
+    name: str
+    price_ids: tuple[str, ...] = ()
+    app_limit: int = 0
+    tier: int = 0
+    entitlements: frozenset[str] = frozenset()
+
+    @property
+    def price_id(self) -> str | None:
+        return self.price_ids[0] if self.price_ids else None
+
+    def has_entitlement(self, entitlement: str) -> bool:
+        return entitlement in self.entitlements
+
+
+class PlanCatalog:
+    def __init__(self, plans: Iterable[Plan]):
+        self._plans = {plan.name: plan for plan in sorted(plans, key=lambda p: p.tier)}
+        self._plans_by_price = {price_id: plan for plan in self._plans.values() for price_id in plan.price_ids}
+
+    def __iter__(self) -> Iterator[Plan]:
+        return iter(self._plans.values())
+
+    def __contains__(self, name) -> bool:
+        return name in self._plans
+
+    def get(self, name: str | None) -> Plan | None:
+        return self._plans.get(name)
+
+    def for_price(self, price_id: str | None) -> Plan | None:
+        return self._plans_by_price.get(price_id)
+
+    def app_limit(self, name: str | None) -> int:
+        plan = self._plans.get(name)
+        return plan.app_limit if plan else 0
+
+    def choices(self) -> list[tuple[str, str]]:
+        return [(name, name) for name in self._plans]
+
+
+def build_settings_catalog() -> PlanCatalog:
+    entitlements = getattr(settings, "PLAN_ENTITLEMENTS", {})
+    return PlanCatalog(
+        Plan(
+            name=name,
+            price_ids=(price_id,) if price_id else (),
+            app_limit=settings.PLAN_LIMITS.get(name, 0),
+            tier=tier,
+            entitlements=frozenset(entitlements.get(name, ())),
+        )
+        for tier, (name, price_id) in enumerate(settings.PLAN_PRICE_MAP.items())
+    )
+
+
+def build_database_catalog(base: PlanCatalog) -> PlanCatalog:
+    from billing.models import PlanDefinition
+
+    plans = {plan.name: plan for plan in base}
+    for definition in PlanDefinition.objects.all():
+        if not definition.is_active:
+            plans.pop(definition.name, None)
+            continue
+        plans[definition.name] = definition.to_plan()
+    return PlanCatalog(plans.values())
+
+
+_catalog: PlanCatalog | None = None
+_catalog_version = None
+_checked_at = 0.0
+
+
+def load_catalog() -> PlanCatalog:
+    global _catalog, _catalog_version, _checked_at
+    _catalog = build_settings_catalog()
+    _catalog_version = None
+    _checked_at = 0.0
+    return _catalog
+
+
+def get_catalog() -> PlanCatalog:
+    global _catalog, _catalog_version, _checked_at
+    catalog = _catalog or load_catalog()
+    if not settings.PLAN_CATALOG_DB_OVERRIDES:
+        return catalog
+    now = time.monotonic()
+    if _catalog_version is not None and now - _checked_at < settings.PLAN_CATALOG_RELOAD_SECONDS:
+        return catalog
+    _checked_at = now
+    version = tiered_cache.version(CATALOG_NAMESPACE)
+    if version != _catalog_version:
+        try:
+            _catalog = build_database_catalog(build_settings_catalog())
+        except DatabaseError:
+            return catalog
+        _catalog_version = version
+    return _catalog
+
+
+def invalidate_catalog():
+    global _checked_at
+    tiered_cache.invalidate(CATALOG_NAMESPACE)
+    _checked_at = 0.0
+
+
+def user_has_entitlement(user, entitlement: str) -> bool:
+    plan = get_catalog().get(user.user_type)
+    return bool(plan and plan.has_entitlement(entitlement))
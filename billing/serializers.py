@@ -1,17 +1,22 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from billing.models import Subscription
+from billing.models import Invoice, Subscription, SubscriptionRollup
+from billing.plans import get_catalog
+from config.serializers import ModelSerializer, Serializer
 
 
 User = get_user_model()
 
 
-class CheckoutSessionSerializer(serializers.Serializer):
-    plan_id = serializers.ChoiceField(choices=[(k, k) for k in settings.PLAN_PRICE_MAP.keys()])
+class CheckoutSessionSerializer(Serializer):
+    plan_id = serializers.ChoiceField(choices=[])
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["plan_id"].choices = get_catalog().choices()
 
-class SubscriptionSerializer(serializers.ModelSerializer):
+
+class SubscriptionSerializer(ModelSerializer):
     class Meta:
         model = Subscription
         fields = (
@@ -24,3 +29,36 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             "trial_end",
             "stripe_subscription_id",
         )
+
+
+class InvoiceSerializer(ModelSerializer):
+    class Meta:
+        model = Invoice
+        fields = (
+            "stripe_invoice_id",
+            "number",
+            "status",
+            "currency",
+            "amount_due",
+            "amount_paid",
+            "total",
+            "hosted_invoice_url",
+            "invoice_pdf",
+            "period_start",
+            "period_end",
+            "paid_at",
+            "created",
+        )
+
+
+class SubscriptionRollupSerializer(ModelSerializer):
+    class Meta:
+        model = SubscriptionRollup
+        fields = ("period", "period_start", "plan_id", "active_count", "upgrades", "downgrades", "cancellations")
+
+
+class SubscriptionRollupQuerySerializer(Serializer):
+    period = serializers.ChoiceField(choices=SubscriptionRollup.Period.choices, default=SubscriptionRollup.Period.DAY)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    plan_id = serializers.CharField(required=False)
@@ -1,10 +1,33 @@
 import json
+from datetime import timedelta
 from unittest import mock
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
-from billing.models import Subscription
+from rest_framework.test import APIClient, APITestCase, force_authenticate
+from billing.models import Invoice, PlanDefinition, Subscription, SubscriptionEvent, SubscriptionRollup
+from billing.plans import get_catalog, invalidate_catalog, load_catalog, user_has_entitlement
+from billing.cache import get_subscription_payload, subscription_cache_key
+from billing.events import get_hub
+from billing.expiry import expire_lapsed_subscriptions, lapsed_subscriptions
+from billing import urls as billing_urls
+from billing.history import period_starts, record_transition, seed_active_counts
+from billing.invoices import bulk_upsert_invoices
+from config.cache import clear_caches
+from billing.views import (
+    AsyncBillingPortalSessionView,
+    AsyncStripeWebhookView,
+    AsyncSubscriptionCheckoutSessionView,
+    AsyncSubscriptionDetailView,
+    SubscriptionEventStreamView,
+    apply_subscription_data,
+)
 
 
 User = get_user_model()
@@ -12,6 +35,7 @@ User = get_user_model()
 
 class SubscriptionTests(APITestCase):
     def setUp(self):
+        clear_caches()
         self.client = APIClient()
         self.user = User.objects.create_user(
             email="sub@example.com", password="Pass1234", is_active=True, user_type=User.UserType.BASIC
@@ -61,6 +85,44 @@ class SubscriptionTests(APITestCase):
         self.assertEqual(response.data["subscription"]["plan_id"], "pro")
         self.assertEqual(response.data["subscription"]["stripe_subscription_id"], subscription.stripe_subscription_id)
 
+    def test_subscription_me_served_from_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Subscription.objects.create(user=self.user, status=Subscription.Status.ACTIVE, plan_id="pro")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("subscriptions-me"))
+        self.assertEqual(response.data["subscription"]["status"], Subscription.Status.ACTIVE)
+
+    def test_subscription_me_negative_cache_until_write_through(self):
+        response = self.client.get(reverse("subscriptions-me"))
+        self.assertIsNone(response.data["subscription"])
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("subscriptions-me"))
+        self.assertIsNone(response.data["subscription"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription = Subscription.objects.create(user=self.user)
+            subscription.mark_status(Subscription.Status.ACTIVE, price_id="price_pro_placeholder")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("subscriptions-me"))
+        self.assertEqual(response.data["subscription"]["status"], Subscription.Status.ACTIVE)
+        self.assertEqual(response.data["subscription"]["plan_id"], "pro")
+
+    def test_rolled_back_save_does_not_reach_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription = Subscription.objects.create(user=self.user, status=Subscription.Status.ACTIVE, plan_id="pro")
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            subscription.mark_status(Subscription.Status.CANCELED)
+            raise RuntimeError("rollback")
+        self.assertEqual(get_subscription_payload(self.user)["subscription"]["status"], Subscription.Status.ACTIVE)
+
+    def test_cascading_user_delete_forgets_subscription(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Subscription.objects.create(user=self.user, status=Subscription.Status.ACTIVE, plan_id="pro")
+        self.assertIsNotNone(cache.get(subscription_cache_key(self.user.pk)))
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).delete()
+        self.assertIsNone(cache.get(subscription_cache_key(self.user.pk)))
+
     @mock.patch("billing.views.stripe.Webhook.construct_event")
     @mock.patch("billing.views.apply_subscription_data")
     def test_webhook_updates_subscription_on_customer_event(self, mock_apply, mock_construct):
@@ -127,3 +189,491 @@ class SubscriptionTests(APITestCase):
         subscription = Subscription.objects.get(user=self.user)
         self.assertEqual(subscription.stripe_subscription_id, "sub_456")
         self.assertEqual(subscription.stripe_customer_id, "cus_456")
+
+
+class PlanCatalogTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        load_catalog()
+        self.addCleanup(load_catalog)
+
+    def test_catalog_indexes_settings_plans(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.for_price("price_pro_placeholder").name, "pro")
+        self.assertIsNone(catalog.for_price("price_unknown"))
+        self.assertEqual(catalog.app_limit("basic"), 3)
+        self.assertEqual(catalog.app_limit("missing"), 0)
+        self.assertEqual(catalog.choices(), [("basic", "basic"), ("pro", "pro")])
+
+    def test_entitlement_check_costs_no_queries(self):
+        user = User.objects.create_user(email="ent@example.com", user_type=User.UserType.PRO)
+        with self.assertNumQueries(0):
+            self.assertFalse(user_has_entitlement(user, "priority_support"))
+
+    @override_settings(PLAN_CATALOG_DB_OVERRIDES=True, PLAN_CATALOG_RELOAD_SECONDS=60)
+    def test_database_overrides_hot_reload(self):
+        self.assertEqual(get_catalog().app_limit("pro"), 50)
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanDefinition.objects.create(
+                name="pro", price_ids=["price_pro_yearly"], app_limit=100, tier=1, entitlements=["priority_support"]
+            )
+            # Until the edit commits, workers keep the current catalog version.
+            self.assertEqual(get_catalog().app_limit("pro"), 50)
+        catalog = get_catalog()
+        self.assertEqual(catalog.app_limit("pro"), 100)
+        self.assertEqual(catalog.for_price("price_pro_yearly").name, "pro")
+        self.assertTrue(catalog.get("pro").has_entitlement("priority_support"))
+
+        subscription = Subscription.objects.create(user=User.objects.create_user(email="yearly@example.com"))
+        subscription.set_plan_from_price("price_pro_yearly")
+        self.assertEqual(subscription.plan_id, "pro")
+        with self.assertNumQueries(0):
+            get_catalog()
+
+
+class AsyncBillingViewTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(
+            email="async@example.com", password="Pass1234", is_active=True, user_type=User.UserType.BASIC
+        )
+
+    @mock.patch("billing.views.stripe.checkout.Session.create_async", new_callable=mock.AsyncMock)
+    @mock.patch("billing.views.stripe.Customer.create_async", new_callable=mock.AsyncMock)
+    async def test_async_checkout_session(self, mock_customer_create, mock_session_create):
+        mock_customer_create.return_value = {"id": "cus_async"}
+        mock_session_create.return_value = {"id": "cs_async", "url": "https://checkout.test", "subscription": "sub_async"}
+        request = self.factory.post(
+            "/api/v1/subscriptions/stripe/checkout/", data={"plan_id": "pro"}, content_type="application/json"
+        )
+        force_authenticate(request, user=self.user)
+
+        response = await AsyncSubscriptionCheckoutSessionView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["checkout_url"], "https://checkout.test")
+        subscription = await Subscription.objects.aget(user=self.user)
+        self.assertEqual(subscription.stripe_customer_id, "cus_async")
+        self.assertEqual(subscription.plan_id, "pro")
+
+    @override_settings(PLAN_CATALOG_DB_OVERRIDES=True)
+    @mock.patch("billing.views.stripe.checkout.Session.create_async", new_callable=mock.AsyncMock)
+    @mock.patch("billing.views.stripe.Customer.create_async", new_callable=mock.AsyncMock)
+    async def test_async_checkout_with_database_plan_catalog(self, mock_customer_create, mock_session_create):
+        await PlanDefinition.objects.acreate(name="pro", price_ids=["price_pro_yearly"], app_limit=100, tier=1)
+        invalidate_catalog()
+        self.addCleanup(load_catalog)
+        mock_customer_create.return_value = {"id": "cus_async"}
+        mock_session_create.return_value = {"id": "cs_async", "url": "https://checkout.test"}
+        request = self.factory.post(
+            "/api/v1/subscriptions/stripe/checkout/", data={"plan_id": "pro"}, content_type="application/json"
+        )
+        force_authenticate(request, user=self.user)
+
+        response = await AsyncSubscriptionCheckoutSessionView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_session_create.call_args.kwargs["line_items"][0]["price"], "price_pro_yearly")
+
+    async def test_async_checkout_requires_authentication(self):
+        request = self.factory.post(
+            "/api/v1/subscriptions/stripe/checkout/", data={"plan_id": "pro"}, content_type="application/json"
+        )
+        response = await AsyncSubscriptionCheckoutSessionView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch("billing.views.stripe.billing_portal.Session.create_async", new_callable=mock.AsyncMock)
+    async def test_async_billing_portal_session(self, mock_portal_create):
+        await Subscription.objects.acreate(user=self.user, stripe_customer_id="cus_existing")
+        mock_portal_create.return_value = {"id": "bps_async", "url": "https://portal.test"}
+        request = self.factory.post("/api/v1/subscriptions/stripe/portal/")
+        force_authenticate(request, user=self.user)
+
+        response = await AsyncBillingPortalSessionView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_portal_create.assert_awaited_once()
+        self.assertEqual(mock_portal_create.call_args.kwargs["customer"], "cus_existing")
+
+    @mock.patch("billing.views.stripe.Subscription.retrieve_async", new_callable=mock.AsyncMock)
+    @mock.patch("billing.views.stripe.Webhook.construct_event")
+    async def test_async_webhook_checkout_completed(self, mock_construct, mock_retrieve):
+        mock_retrieve.return_value = {
+            "id": "sub_789",
+            "customer": "cus_789",
+            "status": "active",
+            "items": {"data": [{"price": {"id": "price_pro_placeholder"}}]},
+        }
+        mock_construct.return_value = {
+            "type": "checkout.session.completed",
+            "data": {
+                "object": {
+                    "customer": "cus_789",
+                    "subscription": "sub_789",
+                    "metadata": {"user_id": self.user.id},
+                }
+            },
+        }
+        request = self.factory.post(
+            "/api/v1/subscriptions/stripe/webhook/", data={}, content_type="application/json",
+            HTTP_STRIPE_SIGNATURE="test",
+        )
+
+        response = await AsyncStripeWebhookView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_retrieve.assert_awaited_once_with("sub_789")
+        await self.user.arefresh_from_db()
+        self.assertEqual(self.user.user_type, User.UserType.PRO)
+
+    @mock.patch("billing.views.stripe.Webhook.construct_event")
+    async def test_async_webhook_subscription_updated(self, mock_construct):
+        await Subscription.objects.acreate(user=self.user, stripe_customer_id="cus_upd")
+        mock_construct.return_value = {
+            "type": "customer.subscription.updated",
+            "data": {
+                "object": {
+                    "id": "sub_upd",
+                    "customer": "cus_upd",
+                    "status": "active",
+                    "items": {"data": [{"price": {"id": "price_pro_placeholder"}}]},
+                }
+            },
+        }
+        request = self.factory.post(
+            "/api/v1/subscriptions/stripe/webhook/", data={}, content_type="application/json",
+            HTTP_STRIPE_SIGNATURE="test",
+        )
+
+        response = await AsyncStripeWebhookView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        subscription = await Subscription.objects.aget(user=self.user)
+        self.assertEqual((subscription.stripe_subscription_id, subscription.status), ("sub_upd", "active"))
+
+    async def test_async_subscription_detail_is_cached(self):
+        await Subscription.objects.acreate(user=self.user, status=Subscription.Status.ACTIVE, plan_id="pro")
+        request = self.factory.get("/api/v1/subscriptions/me/")
+        force_authenticate(request, user=self.user)
+
+        response = await AsyncSubscriptionDetailView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["subscription"]["plan_id"], "pro")
+        self.assertEqual(get_subscription_payload(self.user), response.data)
+
+        await Subscription.objects.filter(user=self.user).aupdate(plan_id="basic")
+        response = await AsyncSubscriptionDetailView.as_view()(request)
+        self.assertEqual(response.data["subscription"]["plan_id"], "pro")
+
+
+class SubscriptionEventStreamTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(
+            email="stream@example.com", password="Pass1234", is_active=True, user_type=User.UserType.BASIC
+        )
+        self.subscription = Subscription.objects.create(user=self.user, stripe_subscription_id="sub_stream")
+
+    def test_apply_subscription_data_publishes_on_change(self):
+        data = {"id": "sub_stream", "status": "active", "items": {"data": [{"price": {"id": "price_pro_placeholder"}}]}}
+        with mock.patch.object(get_hub(), "publish") as mock_publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                apply_subscription_data(self.subscription, data)
+            mock_publish.assert_called_once()
+            user_id, event = mock_publish.call_args[0]
+            self.assertEqual(user_id, self.user.pk)
+            self.assertEqual(event["user_type"], "pro")
+            self.assertEqual(event["subscription"]["status"], "active")
+
+            with self.captureOnCommitCallbacks(execute=True):
+                apply_subscription_data(self.subscription, data)
+            mock_publish.assert_called_once()
+
+    @override_settings(SUBSCRIPTION_EVENTS_HEARTBEAT_SECONDS=0.05, SUBSCRIPTION_EVENTS_TIMEOUT_SECONDS=0.5)
+    async def test_stream_sends_initial_state_heartbeat_and_updates(self):
+        request = self.factory.get("/api/v1/subscriptions/events/", HTTP_ACCEPT="text/event-stream")
+        force_authenticate(request, user=self.user)
+        response = await SubscriptionEventStreamView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        first = (await anext(stream)).decode()
+        self.assertIn("event: subscription", first)
+        self.assertIn('"status":"incomplete"', first)
+        self.assertEqual((await anext(stream)).decode(), ": heartbeat\n\n")
+
+        get_hub().publish(self.user.pk, {"subscription": None, "user_type": "pro"})
+        update = (await anext(stream)).decode()
+        self.assertIn('"user_type":"pro"', update)
+
+        remaining = [chunk.decode() async for chunk in stream]
+        self.assertIn("event: timeout", remaining[-1])
+        self.assertEqual(get_hub().connection_count(), 0)
+
+    async def test_stream_disconnects_when_initial_state_fails(self):
+        request = self.factory.get("/api/v1/subscriptions/events/", HTTP_ACCEPT="text/event-stream")
+        force_authenticate(request, user=self.user)
+        response = await SubscriptionEventStreamView.as_view()(request)
+        with mock.patch("billing.views.aget_subscription_payload", side_effect=RuntimeError("cache down")):
+            with self.assertRaises(RuntimeError):
+                await anext(aiter(response.streaming_content))
+        self.assertEqual(get_hub().connection_count(), 0)
+
+    def test_stream_is_only_routed_for_asgi(self):
+        self.assertNotIn("subscriptions-events", {pattern.name for pattern in billing_urls.urlpatterns})
+
+    async def test_stream_requires_authentication(self):
+        request = self.factory.get("/api/v1/subscriptions/events/", HTTP_ACCEPT="text/event-stream")
+        response = await SubscriptionEventStreamView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SubscriptionHistoryTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email="history@example.com", is_active=True)
+        self.subscription = Subscription.objects.create(user=self.user, stripe_subscription_id="sub_hist")
+
+    def apply(self, status_value, price_id):
+        apply_subscription_data(
+            self.subscription,
+            {"id": "sub_hist", "status": status_value, "items": {"data": [{"price": {"id": price_id}}]}},
+        )
+
+    def rollup(self, period, plan_id):
+        return SubscriptionRollup.objects.get(period=period, period_start=period_starts(timezone.localdate())[period], plan_id=plan_id)
+
+    def test_transitions_append_history_and_update_rollups(self):
+        self.apply("active", "price_pro_placeholder")
+        self.apply("active", "price_pro_placeholder")
+        self.apply("active", "price_basic_placeholder")
+        self.apply("canceled", "price_basic_placeholder")
+
+        kinds = list(SubscriptionEvent.objects.order_by("id").values_list("kind", flat=True))
+        self.assertEqual(kinds, ["upgrade", "downgrade", "cancellation"])
+        for period in (SubscriptionRollup.Period.DAY, SubscriptionRollup.Period.MONTH):
+            pro = self.rollup(period, "pro")
+            basic = self.rollup(period, "basic")
+            self.assertEqual((pro.active_count, pro.upgrades, pro.downgrades, pro.cancellations), (0, 1, 0, 0))
+            self.assertEqual((basic.active_count, basic.upgrades, basic.downgrades, basic.cancellations), (0, 0, 1, 1))
+
+    def test_concurrent_deliveries_record_one_transition(self):
+        # checkout.session.completed and customer.subscription.updated each loaded the row before either applied.
+        stale = Subscription.objects.get(pk=self.subscription.pk)
+        self.apply("active", "price_pro_placeholder")
+        apply_subscription_data(
+            stale, {"id": "sub_hist", "status": "active", "items": {"data": [{"price": {"id": "price_pro_placeholder"}}]}}
+        )
+        self.assertEqual(SubscriptionEvent.objects.count(), 1)
+        pro = self.rollup(SubscriptionRollup.Period.DAY, "pro")
+        self.assertEqual((pro.active_count, pro.upgrades), (1, 1))
+
+    def test_new_period_carries_active_count_forward(self):
+        today = timezone.localdate()
+        SubscriptionRollup.objects.create(
+            period=SubscriptionRollup.Period.DAY, period_start=today - timedelta(days=3), plan_id="pro", active_count=7
+        )
+        self.apply("active", "price_pro_placeholder")
+        today_row = SubscriptionRollup.objects.get(period=SubscriptionRollup.Period.DAY, period_start=today, plan_id="pro")
+        self.assertEqual(today_row.active_count, 8)
+        self.assertEqual(today_row.upgrades, 1)
+
+    def test_seed_counts_subscriptions_that_predate_the_history(self):
+        # Rows written without transitions, as they were before the history table existed.
+        for index in range(3):
+            Subscription.objects.create(
+                user=User.objects.create_user(email=f"legacy{index}@example.com"), status="active", plan_id="pro"
+            )
+        Subscription.objects.create(
+            user=User.objects.create_user(email="legacy-canceled@example.com"), status="canceled", plan_id="pro"
+        )
+        self.assertEqual(seed_active_counts(), {"pro": 3})
+
+        self.subscription.refresh_from_db()
+        self.apply("active", "price_pro_placeholder")
+        legacy = Subscription.objects.get(user__email="legacy0@example.com")
+        legacy_status, legacy_plan = legacy.status, legacy.plan_id
+        legacy.status = "canceled"
+        legacy.save()
+        record_transition(legacy, legacy_status, legacy_plan)
+        for period in (SubscriptionRollup.Period.DAY, SubscriptionRollup.Period.MONTH):
+            self.assertEqual(self.rollup(period, "pro").active_count, 3)
+
+
+class InvoiceMirrorTests(APITestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(email="invoice@example.com", password="Pass1234", is_active=True)
+        Subscription.objects.create(user=self.user, stripe_customer_id="cus_inv")
+        self.client.force_authenticate(user=self.user)
+
+    def invoice_data(self, invoice_id="in_1", status_value="draft", created=1733097600, **extra):
+        return {
+            "id": invoice_id,
+            "customer": "cus_inv",
+            "subscription": "sub_inv",
+            "status": status_value,
+            "currency": "usd",
+            "total": 1500,
+            "amount_due": 1500,
+            "amount_paid": 1500 if status_value == "paid" else 0,
+            "created": created,
+            **extra,
+        }
+
+    def post_webhook(self, event_type, data):
+        with mock.patch("billing.views.stripe.Webhook.construct_event") as mock_construct:
+            mock_construct.return_value = {"type": event_type, "data": {"object": data}}
+            return self.client.post(
+                reverse("subscriptions-stripe-webhook"),
+                data=json.dumps({}),
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE="test",
+            )
+
+    def test_invoice_webhooks_upsert_without_regressing_status(self):
+        self.post_webhook("invoice.created", self.invoice_data())
+        self.post_webhook("invoice.paid", self.invoice_data(status_value="paid", status_transitions={"paid_at": 1733100000}))
+        response = self.post_webhook("invoice.created", self.invoice_data())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        invoice = Invoice.objects.get(stripe_invoice_id="in_1")
+        self.assertEqual(invoice.user, self.user)
+        self.assertEqual(invoice.status, Invoice.Status.PAID)
+        self.assertIsNotNone(invoice.paid_at)
+
+        self.post_webhook("invoice.payment_failed", self.invoice_data("in_2", "open", attempt_count=2))
+        self.assertEqual(Invoice.objects.get(stripe_invoice_id="in_2").attempt_count, 2)
+
+    def test_invoice_list_is_paginated_and_scoped(self):
+        other = User.objects.create_user(email="other-invoice@example.com")
+        Subscription.objects.create(user=other, stripe_customer_id="cus_other")
+        for index in range(25):
+            self.post_webhook("invoice.created", self.invoice_data(f"in_{index}", created=1733097600 + index))
+        self.post_webhook("invoice.created", {**self.invoice_data("in_other"), "customer": "cus_other"})
+
+        response = self.client.get(reverse("subscriptions-invoices"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertEqual(response.data["results"][0]["stripe_invoice_id"], "in_24")
+        next_page = self.client.get(response.data["next"])
+        self.assertEqual([row["stripe_invoice_id"] for row in next_page.data["results"]][-1], "in_0")
+        self.assertIsNone(next_page.data["next"])
+
+    @mock.patch("billing.management.commands.backfill_invoices.stripe.Invoice.list")
+    def test_backfill_command_bulk_loads_invoices(self, mock_list):
+        invoices = [self.invoice_data(f"in_bf_{index}", "paid", 1733097600 + index) for index in range(5)]
+        invoices.append({**self.invoice_data("in_unknown"), "customer": "cus_missing"})
+        mock_list.return_value.auto_paging_iter.return_value = iter(invoices)
+
+        call_command("backfill_invoices", "--batch-size", "2", "--since", "2024-01-01", stdout=mock.MagicMock())
+
+        self.assertEqual(Invoice.objects.filter(user=self.user, status="paid").count(), 5)
+        self.assertFalse(Invoice.objects.filter(stripe_invoice_id="in_unknown").exists())
+        self.assertEqual(mock_list.call_args.kwargs["created"], {"gte": 1704067200})
+
+    def test_bulk_upsert_does_not_regress_status(self):
+        self.post_webhook("invoice.paid", self.invoice_data(status_value="paid", status_transitions={"paid_at": 1733100000}))
+        bulk_upsert_invoices([self.invoice_data(status_value="open", amount_due=500), self.invoice_data("in_new", "open")])
+
+        invoice = Invoice.objects.get(stripe_invoice_id="in_1")
+        self.assertEqual((invoice.status, invoice.amount_due), (Invoice.Status.PAID, 500))
+        self.assertIsNotNone(invoice.paid_at)
+        self.assertEqual(Invoice.objects.get(stripe_invoice_id="in_new").status, Invoice.Status.OPEN)
+
+
+class SubscriptionExpiryTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.now = timezone.now()
+
+    def make_subscription(self, email, ends_in, cancel_at_period_end=True, status_value="active", plan_id="pro"):
+        user = User.objects.create_user(email=email, is_active=True, user_type=plan_id or User.UserType.BASIC)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Subscription.objects.create(
+                user=user,
+                status=status_value,
+                plan_id=plan_id,
+                cancel_at_period_end=cancel_at_period_end,
+                current_period_end=self.now + ends_in,
+            )
+
+    def test_command_expires_lapsed_subscriptions_in_batches(self):
+        lapsed = [self.make_subscription(f"lapsed{i}@example.com", timedelta(days=-1 - i)) for i in range(5)]
+        renewing = self.make_subscription("renewing@example.com", timedelta(days=-1), cancel_at_period_end=False)
+        future = self.make_subscription("future@example.com", timedelta(days=3))
+        canceled = self.make_subscription("done@example.com", timedelta(days=-1), status_value="canceled", plan_id="")
+
+        call_command("seed_subscription_rollups", stdout=mock.MagicMock())
+        out = mock.MagicMock()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("expire_subscriptions", "--batch-size", "2", stdout=out)
+        out.write.assert_called_with(mock.ANY)
+        self.assertIn("Expired 5 subscriptions, downgraded 5 users.", out.write.call_args[0][0])
+
+        for subscription in lapsed:
+            subscription.refresh_from_db()
+            self.assertEqual(subscription.status, Subscription.Status.CANCELED)
+            self.assertEqual(User.objects.get(pk=subscription.user_id).user_type, User.UserType.BASIC)
+        for subscription, expected in ((renewing, "active"), (future, "active"), (canceled, "canceled")):
+            subscription.refresh_from_db()
+            self.assertEqual(subscription.status, expected)
+        self.assertEqual(SubscriptionEvent.objects.filter(kind=SubscriptionEvent.Kind.CANCELLATION).count(), 5)
+        rollup = SubscriptionRollup.objects.get(period="day", period_start=timezone.localdate(), plan_id="pro")
+        self.assertEqual((rollup.active_count, rollup.cancellations), (2, 5))
+
+    def test_second_run_changes_nothing_and_cache_is_invalidated(self):
+        subscription = self.make_subscription("once@example.com", timedelta(hours=-1))
+        self.assertIsNotNone(cache.get(subscription_cache_key(subscription.user_id)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expire_lapsed_subscriptions(), (1, 1))
+        self.assertEqual(expire_lapsed_subscriptions(), (0, 0))
+        self.assertIsNone(cache.get(subscription_cache_key(subscription.user_id)))
+
+    def test_lapsed_query_uses_partial_index(self):
+        # Seed and ANALYZE so the planner weighs real selectivity, not empty-table heuristics.
+        users = User.objects.bulk_create([User(email=f"plan{i}@example.com") for i in range(2000)])
+        Subscription.objects.bulk_create(
+            [
+                Subscription(
+                    user=user,
+                    status="active" if i % 3 else "canceled",
+                    cancel_at_period_end=i % 40 == 0,
+                    current_period_end=self.now + timedelta(days=i % 30 - 15),
+                )
+                for i, user in enumerate(users)
+            ]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        plan = lapsed_subscriptions(self.now).order_by("current_period_end").explain()
+        self.assertIn("billing_sub_cancel_period_end", plan)
+
+
+class BillingAdminTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        admin = User.objects.create_superuser(email="root@example.com", password="Pass1234")
+        self.client.force_login(admin)
+
+    def add_subscriptions(self, count, start):
+        for index in range(start, start + count):
+            user = User.objects.create_user(email=f"admin-sub{index}@example.com")
+            Subscription.objects.create(user=user, status="active", plan_id="pro")
+            Invoice.objects.create(
+                user=user, stripe_invoice_id=f"in_admin{index}", status="paid", created=timezone.now()
+            )
+
+    def test_changelist_query_counts_do_not_grow_with_rows(self):
+        for name in ("admin:billing_subscription_changelist", "admin:billing_invoice_changelist"):
+            with self.subTest(name):
+                self.add_subscriptions(2, start=len(name) * 100)
+                with CaptureQueriesContext(connection) as small:
+                    self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+                self.add_subscriptions(15, start=len(name) * 100 + 50)
+                with CaptureQueriesContext(connection) as large:
+                    self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+                self.assertEqual(len(large), len(small))
@@ -1,14 +1,39 @@
+from django.conf import settings
 from django.urls import path
 from billing.views import (
+    AsyncBillingPortalSessionView,
+    AsyncStripeWebhookView,
+    AsyncSubscriptionCheckoutSessionView,
+    AsyncSubscriptionDetailView,
     BillingPortalSessionView,
+    InvoiceListView,
     StripeWebhookView,
     SubscriptionCheckoutSessionView,
     SubscriptionDetailView,
+    SubscriptionEventStreamView,
 )
 
+if settings.ASYNC_VIEWS:
+    checkout_view = AsyncSubscriptionCheckoutSessionView
+    portal_view = AsyncBillingPortalSessionView
+    webhook_view = AsyncStripeWebhookView
+    subscription_view = AsyncSubscriptionDetailView
+else:
+    checkout_view = SubscriptionCheckoutSessionView
+    portal_view = BillingPortalSessionView
+    webhook_view = StripeWebhookView
+    subscription_view = SubscriptionDetailView
+
 urlpatterns = [
-    path("subscriptions/stripe/checkout/", SubscriptionCheckoutSessionView.as_view(), name="subscriptions-stripe-checkout"),
-    path("subscriptions/stripe/portal/", BillingPortalSessionView.as_view(), name="subscriptions-stripe-portal"),
-    path("subscriptions/me/", SubscriptionDetailView.as_view(), name="subscriptions-me"),
-    path("subscriptions/stripe/webhook/", StripeWebhookView.as_view(), name="subscriptions-stripe-webhook"),
+    path("subscriptions/stripe/checkout/", checkout_view.as_view(), name="subscriptions-stripe-checkout"),
+    path("subscriptions/stripe/portal/", portal_view.as_view(), name="subscriptions-stripe-portal"),
+    path("subscriptions/me/", subscription_view.as_view(), name="subscriptions-me"),
+    path("subscriptions/invoices/", InvoiceListView.as_view(), name="subscriptions-invoices"),
+    path("subscriptions/stripe/webhook/", webhook_view.as_view(), name="subscriptions-stripe-webhook"),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Under WSGI the stream would be buffered whole and hold a sync worker past its timeout.
+    urlpatterns.append(
+        path("subscriptions/events/", SubscriptionEventStreamView.as_view(), name="subscriptions-events")
+    )
@@ -1,18 +1,42 @@
+import asyncio
 import stripe
+from asgiref.sync import sync_to_async
 from datetime import datetime, timezone as dt_timezone
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import permissions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.response import Response
-from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from billing.models import Subscription
-from billing.serializers import CheckoutSessionSerializer, SubscriptionSerializer
+from config.async_views import AsyncAPIView
+from config.idempotency import IdempotencyMixin
+from config.metrics import observe_webhook_lag, stripe_timer
+from config.views import APIView, ListAPIView
+from billing.cache import aget_subscription_payload, get_subscription_payload
+from billing.events import (
+    EventStreamRenderer,
+    format_event,
+    get_hub,
+    publish_subscription_event,
+    subscription_snapshot,
+)
+from billing.history import record_transition
+from billing.invoices import INVOICE_EVENTS, upsert_invoice
+from billing.models import Invoice, Subscription
+from billing.pagination import InvoiceCursorPagination
+from billing.plans import get_catalog
+from billing.serializers import CheckoutSessionSerializer, InvoiceSerializer, SubscriptionSerializer
+from users.authentication import RefreshCookieAuthentication
 
 User = get_user_model()
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
 
 
 def get_or_create_subscription(user: User) -> Subscription:
@@ -20,20 +44,74 @@ def get_or_create_subscription(user: User) -> Subscription:
     return subscription
 
 
+async def aget_or_create_subscription(user: User) -> Subscription:
+    subscription, _ = await Subscription.objects.aget_or_create(user=user)
+    return subscription
+
+
+def customer_params(user: User) -> dict:
+    return {
+        "email": user.email,
+        "name": f"{user.first_name} {user.last_name}".strip() or None,
+        "metadata": {"user_id": user.id},
+    }
+
+
 def ensure_customer(subscription: Subscription, user: User) -> str:
     if subscription.stripe_customer_id:
         return subscription.stripe_customer_id
-    customer = stripe.Customer.create(
-        email=user.email,
-        name=f"{user.first_name} {user.last_name}".strip() or None,
-        metadata={"user_id": user.id},
-    )
+    with stripe_timer("Customer.create"):
+        customer = stripe.Customer.create(**customer_params(user))
     subscription.stripe_customer_id = customer["id"]
     subscription.save(update_fields=["stripe_customer_id", "updated_at"])
     return customer["id"]
 
 
-def update_user_plan(subscription: Subscription):
+async def aensure_customer(subscription: Subscription, user: User) -> str:
+    if subscription.stripe_customer_id:
+        return subscription.stripe_customer_id
+    with stripe_timer("Customer.create"):
+        customer = await stripe.Customer.create_async(**customer_params(user))
+    subscription.stripe_customer_id = customer["id"]
+    await subscription.asave(update_fields=["stripe_customer_id", "updated_at"])
+    return customer["id"]
+
+
+def checkout_session_params(customer_id: str, user: User, plan_id: str, price_id: str) -> dict:
+    return {
+        "customer": customer_id,
+        "mode": "subscription",
+        "line_items": [
+            {
+                "price": price_id,
+                "quantity": 1,
+            }
+        ],
+        "success_url": settings.CHECKOUT_SUCCESS_URL,
+        "cancel_url": settings.CHECKOUT_CANCEL_URL,
+        "subscription_data": {"metadata": {"plan_id": plan_id}},
+        "metadata": {"user_id": user.id, "plan_id": plan_id},
+    }
+
+
+CHECKOUT_SESSION_FIELDS = ["stripe_subscription_id", "price_id", "plan_id", "updated_at"]
+
+
+def apply_checkout_session(subscription: Subscription, session, price_id: str) -> bool:
+    if not session.get("subscription"):
+        return False
+    subscription.stripe_subscription_id = session["subscription"]
+    subscription.price_id = price_id
+    subscription.set_plan_from_price(price_id)
+    return True
+
+
+def apply_checkout_completed(subscription: Subscription, data_object: dict):
+    subscription.stripe_customer_id = data_object.get("customer") or subscription.stripe_customer_id
+    subscription.stripe_subscription_id = data_object.get("subscription") or subscription.stripe_subscription_id
+
+
+def update_user_plan(subscription: Subscription) -> bool:
     user = subscription.user
     if subscription.status in (
         Subscription.Status.ACTIVE,
@@ -42,6 +120,7 @@ def update_user_plan(subscription: Subscription):
         if subscription.plan_id and user.user_type != subscription.plan_id:
             user.user_type = subscription.plan_id
             user.save(update_fields=["user_type"])
+            return True
     elif subscription.status in (
         Subscription.Status.CANCELED,
         Subscription.Status.INCOMPLETE,
@@ -51,6 +130,8 @@ def update_user_plan(subscription: Subscription):
         if user.user_type != User.UserType.BASIC:
             user.user_type = User.UserType.BASIC
             user.save(update_fields=["user_type"])
+            return True
+    return False
 
 
 def apply_subscription_data(subscription: Subscription, data: dict):
@@ -67,50 +148,68 @@ def apply_subscription_data(subscription: Subscription, data: dict):
             return None
         return datetime.fromtimestamp(value, tz=dt_timezone.utc)
 
-    subscription.stripe_subscription_id = data.get("id") or subscription.stripe_subscription_id
-    subscription.stripe_customer_id = data.get("customer") or subscription.stripe_customer_id
-    subscription.mark_status(
-        status=status_value,
-        price_id=price_id,
-        cancel_at_period_end=cancel_at_period_end,
-        period_end=parse_timestamp(data.get("current_period_end")),
-        period_start=parse_timestamp(data.get("current_period_start")),
-        trial_end=parse_timestamp(data.get("trial_end")),
-    )
-    update_user_plan(subscription)
+    with transaction.atomic():
+        # Checkout and subscription webhooks for one change arrive together; read the
+        # from-state under the row lock so only the first of them records the transition.
+        if subscription.pk:
+            subscription.refresh_from_db(from_queryset=Subscription.objects.select_for_update())
+        before = subscription_snapshot(subscription)
+        from_status, from_plan_id = subscription.status, subscription.plan_id
+        subscription.stripe_subscription_id = data.get("id") or subscription.stripe_subscription_id
+        subscription.stripe_customer_id = data.get("customer") or subscription.stripe_customer_id
+        subscription.mark_status(
+            status=status_value,
+            price_id=price_id,
+            cancel_at_period_end=cancel_at_period_end,
+            period_end=parse_timestamp(data.get("current_period_end")),
+            period_start=parse_timestamp(data.get("current_period_start")),
+            trial_end=parse_timestamp(data.get("trial_end")),
+        )
+        record_transition(subscription, from_status, from_plan_id)
+        user_type_changed = update_user_plan(subscription)
+    if user_type_changed or subscription_snapshot(subscription) != before:
+        publish_subscription_event(subscription)
+
 
+def checkout_plan(data) -> tuple[str, str]:
+    """Validated plan id and its Stripe price. Both may read the plan catalog from the database."""
+    serializer = CheckoutSessionSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    plan_id = serializer.validated_data["plan_id"]
+    return plan_id, get_catalog().get(plan_id).price_id
 
-class SubscriptionCheckoutSessionView(APIView):
+
+class SubscriptionCheckoutSessionView(IdempotencyMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @extend_schema(request=CheckoutSessionSerializer, responses={200: OpenApiResponse(description="Checkout URL created")})
     def post(self, request):
-        serializer = CheckoutSessionSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        plan_id = serializer.validated_data["plan_id"]
-        price_id = settings.PLAN_PRICE_MAP.get(plan_id)
+        plan_id, price_id = checkout_plan(request.data)
         user = request.user
         subscription = get_or_create_subscription(user)
         customer_id = ensure_customer(subscription, user)
-        session = stripe.checkout.Session.create(
-            customer=customer_id,
-            mode="subscription",
-            line_items=[
-                {
-                    "price": price_id,
-                    "quantity": 1,
-                }
-            ],
-            success_url=settings.CHECKOUT_SUCCESS_URL,
-            cancel_url=settings.CHECKOUT_CANCEL_URL,
-            subscription_data={"metadata": {"plan_id": plan_id}},
-            metadata={"user_id": user.id, "plan_id": plan_id},
-        )
-        if session.get("subscription"):
-            subscription.stripe_subscription_id = session["subscription"]
-            subscription.price_id = price_id
-            subscription.set_plan_from_price(price_id)
-            subscription.save(update_fields=["stripe_subscription_id", "price_id", "plan_id", "updated_at"])
+        with stripe_timer("checkout.Session.create"):
+            session = stripe.checkout.Session.create(**checkout_session_params(customer_id, user, plan_id, price_id))
+        if apply_checkout_session(subscription, session, price_id):
+            subscription.save(update_fields=CHECKOUT_SESSION_FIELDS)
+        return Response({"checkout_url": session.get("url")})
+
+
+class AsyncSubscriptionCheckoutSessionView(IdempotencyMixin, AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=CheckoutSessionSerializer, responses={200: OpenApiResponse(description="Checkout URL created")})
+    async def post(self, request):
+        plan_id, price_id = await sync_to_async(checkout_plan)(request.data)
+        user = request.user
+        subscription = await aget_or_create_subscription(user)
+        customer_id = await aensure_customer(subscription, user)
+        with stripe_timer("checkout.Session.create"):
+            session = await stripe.checkout.Session.create_async(
+                **checkout_session_params(customer_id, user, plan_id, price_id)
+            )
+        if apply_checkout_session(subscription, session, price_id):
+            await subscription.asave(update_fields=CHECKOUT_SESSION_FIELDS)
         return Response({"checkout_url": session.get("url")})
 
 
@@ -122,10 +221,27 @@ class BillingPortalSessionView(APIView):
         user = request.user
         subscription = get_or_create_subscription(user)
         customer_id = ensure_customer(subscription, user)
-        portal_session = stripe.billing_portal.Session.create(
-            customer=customer_id,
-            return_url=settings.PORTAL_RETURN_URL,
-        )
+        with stripe_timer("billing_portal.Session.create"):
+            portal_session = stripe.billing_portal.Session.create(
+                customer=customer_id,
+                return_url=settings.PORTAL_RETURN_URL,
+            )
+        return Response({"portal_url": portal_session.get("url")})
+
+
+class AsyncBillingPortalSessionView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=None, responses={200: OpenApiResponse(description="Portal URL created")})
+    async def post(self, request):
+        user = request.user
+        subscription = await aget_or_create_subscription(user)
+        customer_id = await aensure_customer(subscription, user)
+        with stripe_timer("billing_portal.Session.create"):
+            portal_session = await stripe.billing_portal.Session.create_async(
+                customer=customer_id,
+                return_url=settings.PORTAL_RETURN_URL,
+            )
         return Response({"portal_url": portal_session.get("url")})
 
 
@@ -134,11 +250,92 @@ class SubscriptionDetailView(APIView):
 
     @extend_schema(responses={200: SubscriptionSerializer})
     def get(self, request):
-        subscription = Subscription.objects.filter(user=request.user).first()
-        if not subscription:
-            return Response({"subscription": None})
-        data = SubscriptionSerializer(subscription).data
-        return Response({"subscription": data})
+        return Response(get_subscription_payload(request.user))
+
+
+class AsyncSubscriptionDetailView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(responses={200: SubscriptionSerializer})
+    async def get(self, request):
+        return Response(await aget_subscription_payload(request.user))
+
+
+class InvoiceListView(ListAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = InvoiceSerializer
+    pagination_class = InvoiceCursorPagination
+
+    def get_queryset(self):
+        return Invoice.objects.filter(user=self.request.user)
+
+
+class SubscriptionEventStreamView(AsyncAPIView):
+    authentication_classes = [JWTAuthentication, RefreshCookieAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    @extend_schema(responses={(200, "text/event-stream"): OpenApiResponse(description="Server-Sent Events stream")})
+    async def get(self, request):
+        response = StreamingHttpResponse(self.stream(get_hub(), request.user), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, hub, user):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SUBSCRIPTION_EVENTS_TIMEOUT_SECONDS
+        # Subscribe before reading the initial state so no change falls in between.
+        queue = hub.connect(user.pk)
+        try:
+            initial = {**await aget_subscription_payload(user), "user_type": user.user_type}
+            yield f"retry: {settings.SUBSCRIPTION_EVENTS_RETRY_MS}\n" + format_event("subscription", initial)
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=min(settings.SUBSCRIPTION_EVENTS_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_event("subscription", event)
+            yield format_event("timeout", {})
+        finally:
+            hub.disconnect(user.pk, queue)
+
+
+def construct_webhook_event(request):
+    payload = request.body
+    sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
+    try:
+        event = stripe.Webhook.construct_event(
+            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
+        )
+    except ValueError:
+        return None, Response({"detail": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
+    except stripe.error.SignatureVerificationError:
+        return None, Response({"detail": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST)
+    observe_webhook_lag(event)
+    return event, None
+
+
+def handle_subscription_event(data_object: dict):
+    subscription_id = data_object.get("id")
+    subscription = Subscription.objects.filter(stripe_subscription_id=subscription_id).first()
+    if not subscription:
+        customer_id = data_object.get("customer")
+        subscription = Subscription.objects.filter(stripe_customer_id=customer_id).first()
+    if subscription:
+        apply_subscription_data(subscription, data_object)
+
+
+async def ahandle_subscription_event(data_object: dict):
+    subscription = await Subscription.objects.filter(stripe_subscription_id=data_object.get("id")).afirst()
+    if not subscription:
+        subscription = await Subscription.objects.filter(stripe_customer_id=data_object.get("customer")).afirst()
+    if subscription:
+        # Runs in a transaction, which the async ORM cannot span.
+        await sync_to_async(apply_subscription_data)(subscription, data_object)
 
 
 class StripeWebhookView(APIView):
@@ -147,16 +344,9 @@ class StripeWebhookView(APIView):
 
     @extend_schema(request=None, responses={200: OpenApiResponse(description="Webhook processed")})
     def post(self, request):
-        payload = request.body
-        sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
-        try:
-            event = stripe.Webhook.construct_event(
-                payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
-            )
-        except ValueError:
-            return Response({"detail": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
-        except stripe.error.SignatureVerificationError:
-            return Response({"detail": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST)
+        event, error_response = construct_webhook_event(request)
+        if error_response:
+            return error_response
 
         event_type = event.get("type")
         data_object = event.get("data", {}).get("object", {})
@@ -167,18 +357,46 @@ class StripeWebhookView(APIView):
             if not user:
                 return Response(status=status.HTTP_200_OK)
             subscription = get_or_create_subscription(user)
-            subscription.stripe_customer_id = data_object.get("customer") or subscription.stripe_customer_id
-            subscription.stripe_subscription_id = data_object.get("subscription") or subscription.stripe_subscription_id
+            apply_checkout_completed(subscription, data_object)
             subscription.save(update_fields=["stripe_customer_id", "stripe_subscription_id", "updated_at"])
             if subscription.stripe_subscription_id:
-                sub_data = stripe.Subscription.retrieve(subscription.stripe_subscription_id)
+                with stripe_timer("Subscription.retrieve"):
+                    sub_data = stripe.Subscription.retrieve(subscription.stripe_subscription_id)
                 apply_subscription_data(subscription, sub_data)
         elif event_type.startswith("customer.subscription."):
-            subscription_id = data_object.get("id")
-            subscription = Subscription.objects.filter(stripe_subscription_id=subscription_id).first()
-            if not subscription:
-                customer_id = data_object.get("customer")
-                subscription = Subscription.objects.filter(stripe_customer_id=customer_id).first()
-            if subscription:
-                apply_subscription_data(subscription, data_object)
+            handle_subscription_event(data_object)
+        elif event_type in INVOICE_EVENTS:
+            upsert_invoice(data_object)
+        return Response(status=status.HTTP_200_OK)
+
+
+class AsyncStripeWebhookView(AsyncAPIView):
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(request=None, responses={200: OpenApiResponse(description="Webhook processed")})
+    async def post(self, request):
+        event, error_response = construct_webhook_event(request)
+        if error_response:
+            return error_response
+
+        event_type = event.get("type")
+        data_object = event.get("data", {}).get("object", {})
+
+        if event_type == "checkout.session.completed":
+            user_id = data_object.get("metadata", {}).get("user_id")
+            user = await User.objects.filter(id=user_id).afirst()
+            if not user:
+                return Response(status=status.HTTP_200_OK)
+            subscription = await aget_or_create_subscription(user)
+            apply_checkout_completed(subscription, data_object)
+            await subscription.asave(update_fields=["stripe_customer_id", "stripe_subscription_id", "updated_at"])
+            if subscription.stripe_subscription_id:
+                with stripe_timer("Subscription.retrieve"):
+                    sub_data = await stripe.Subscription.retrieve_async(subscription.stripe_subscription_id)
+                await sync_to_async(apply_subscription_data)(subscription, sub_data)
+        elif event_type.startswith("customer.subscription."):
+            await ahandle_subscription_event(data_object)
+        elif event_type in INVOICE_EVENTS:
+            await sync_to_async(upsert_invoice)(data_object)
         return Response(status=status.HTTP_200_OK)
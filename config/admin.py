@@ -0,0 +1,51 @@
+"""Shared Django admin building blocks for large tables."""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+from config.db import estimated_row_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses planner statistics instead of COUNT(*) for unfiltered changelists above the exact-count threshold."""
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where:
+            estimate = estimated_row_count(qs.model, using=qs.db)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    """Estimated page counts and no second unfiltered COUNT(*) on filtered changelists."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Renders one page of related rows; the page comes from `?<prefix>-page=`."""
+
+    per_page = 20
+    request = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        qs = super().get_queryset()
+        params = self.request.GET if self.request is not None else {}
+        self.page = Paginator(qs, self.per_page).get_page(params.get(f"{self.prefix}-page"))
+        self._queryset = self.page.object_list
+
+
+class PaginatedInlineMixin:
+    formset = PaginatedInlineFormSet
+    template = "admin/edit_inline/paginated_tabular.html"
+    per_page = 20
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        return type(formset.__name__, (formset,), {"request": request, "per_page": self.per_page})
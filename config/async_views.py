@@ -0,0 +1,36 @@
+from asgiref.sync import sync_to_async
+from config.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView with coroutine handlers; the sync DRF auth, permission and throttle checks run via sync_to_async."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+        except Exception as exc:
+            response = await self.ahandle_exception(exc)
+
+        self.response = await self.afinalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    # Async counterparts of handle_exception/finalize_response, for mixins that need I/O there.
+
+    async def ahandle_exception(self, exc):
+        return self.handle_exception(exc)
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        return self.finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,231 @@
+"""Two-tier cache-aside helpers shared by every app.
+
+Reads go through a small per-process LRU (L1) in front of the shared Django
+cache (L2, `CACHES["default"]`). L1 entries live at most
+`CACHE_LOCAL_TIMEOUT` seconds, which bounds how long another worker's write or
+invalidation can go unseen; writes and deletes in this process apply to both
+tiers immediately.
+
+Keys are grouped into namespaces whose version lives in L2, so
+`tiered_cache.invalidate(namespace)` drops every key in it at once.
+`get_or_compute` recomputes a missing value once per key across threads and
+workers (single flight), and refreshes hot keys shortly before they expire
+with probability rising towards expiry (XFetch), so expiries do not stampede
+the database.
+"""
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+MISSING = object()
+
+
+class LocalLRU:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            value, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout: float):
+        if self.max_entries <= 0 or timeout <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache:
+    def __init__(self, alias: str = "default", max_entries: int | None = None):
+        self.alias = alias
+        self.local = LocalLRU(settings.CACHE_LOCAL_MAX_ENTRIES if max_entries is None else max_entries)
+        self._flights: dict[str, threading.Lock] = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @property
+    def is_shared(self) -> bool:
+        """Whether L2 is one store for all workers; `locmem` is a separate store in each process."""
+        return not isinstance(self.shared, LocMemCache)
+
+    # Namespaces
+
+    def version(self, namespace: str) -> int:
+        version_key = f"{namespace}:version"
+        version = self.local.get(version_key)
+        if version is MISSING:
+            version = self.shared.get_or_set(version_key, 1, None)
+            self.local.set(version_key, version, settings.CACHE_LOCAL_TIMEOUT)
+        return version
+
+    def invalidate(self, namespace: str) -> int:
+        version_key = f"{namespace}:version"
+        self.shared.add(version_key, 1, None)
+        try:
+            version = self.shared.incr(version_key)
+        except ValueError:
+            version = 2
+            self.shared.set(version_key, version, None)
+        self.local.set(version_key, version, settings.CACHE_LOCAL_TIMEOUT)
+        return version
+
+    def make_key(self, namespace: str, key) -> str:
+        return f"{namespace}:v{self.version(namespace)}:{key}"
+
+    # Entries are (value, expires_at, compute_seconds) tuples in both tiers.
+
+    def _read(self, full_key, local: bool = True):
+        entry = self.local.get(full_key) if local else MISSING
+        if entry is not MISSING:
+            return entry
+        entry = self.shared.get(full_key, MISSING)
+        if entry is not MISSING and local:
+            self.local.set(full_key, entry, min(settings.CACHE_LOCAL_TIMEOUT, entry[1] - time.time()))
+        return entry
+
+    def _write(self, full_key, value, timeout: float, delta: float = 0.0, local: bool = True):
+        entry = (value, time.time() + timeout, delta)
+        self.shared.set(full_key, entry, timeout)
+        if local:
+            self.local.set(full_key, entry, min(settings.CACHE_LOCAL_TIMEOUT, timeout))
+
+    def get(self, namespace: str, key, default=None):
+        entry = self._read(self.make_key(namespace, key))
+        return default if entry is MISSING else entry[0]
+
+    def set(self, namespace: str, key, value, timeout: float):
+        self._write(self.make_key(namespace, key), value, timeout)
+
+    def delete(self, namespace: str, key):
+        self.delete_many(namespace, [key])
+
+    # Async views: L1 hits never leave the event loop, L2 goes through the backend's async API.
+
+    async def amake_key(self, namespace: str, key) -> str:
+        version = self.local.get(f"{namespace}:version")
+        if version is MISSING:
+            version = await sync_to_async(self.version)(namespace)
+        return f"{namespace}:v{version}:{key}"
+
+    async def aget(self, namespace: str, key, default=None):
+        full_key = await self.amake_key(namespace, key)
+        entry = self.local.get(full_key)
+        if entry is MISSING:
+            entry = await self.shared.aget(full_key, MISSING)
+            if entry is MISSING:
+                return default
+            self.local.set(full_key, entry, min(settings.CACHE_LOCAL_TIMEOUT, entry[1] - time.time()))
+        return entry[0]
+
+    async def aset(self, namespace: str, key, value, timeout: float):
+        full_key = await self.amake_key(namespace, key)
+        entry = (value, time.time() + timeout, 0.0)
+        await self.shared.aset(full_key, entry, timeout)
+        self.local.set(full_key, entry, min(settings.CACHE_LOCAL_TIMEOUT, timeout))
+
+    def delete_many(self, namespace: str, keys):
+        full_keys = [self.make_key(namespace, key) for key in keys]
+        self.shared.delete_many(full_keys)
+        for full_key in full_keys:
+            self.local.delete(full_key)
+
+    # Cache-aside
+
+    @staticmethod
+    def should_recompute(entry, beta: float) -> bool:
+        _, expires_at, delta = entry
+        return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+    def get_or_compute(
+        self, namespace: str, key, compute, timeout: float, beta: float | None = None, local: bool = True
+    ):
+        """Return the cached value for `key`, computing and storing it with `compute()` when needed.
+
+        Pass `local=False` for values whose changes must be seen by every worker
+        at once; they skip L1 and are read from L2 only. That only spans workers
+        when L2 is shared (see `is_shared`): with the default `locmem` backend
+        each process has its own L2.
+        """
+        beta = settings.CACHE_XFETCH_BETA if beta is None else beta
+        full_key = self.make_key(namespace, key)
+        entry = self._read(full_key, local)
+        if entry is not MISSING and not self.should_recompute(entry, beta):
+            return entry[0]
+
+        with self._flights_lock:
+            flight = self._flights.setdefault(full_key, threading.Lock())
+        try:
+            with flight:
+                fresh = self._read(full_key, local)
+                if fresh is not MISSING and (entry is MISSING or fresh[1] != entry[1]):
+                    return fresh[0]
+                return self._compute(full_key, entry, compute, timeout, local)
+        finally:
+            with self._flights_lock:
+                if not flight.locked():
+                    self._flights.pop(full_key, None)
+
+    def _compute(self, full_key, entry, compute, timeout: float, local: bool):
+        lock_key = f"{full_key}:lock"
+        locked = self.shared.add(lock_key, 1, settings.CACHE_LOCK_SECONDS)
+        if not locked:
+            # Another worker is recomputing: serve what we have, or wait for its result.
+            if entry is not MISSING:
+                return entry[0]
+            deadline = time.monotonic() + settings.CACHE_LOCK_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(settings.CACHE_POLL_SECONDS)
+                entry = self._read(full_key, local)
+                if entry is not MISSING:
+                    return entry[0]
+        try:
+            started = time.perf_counter()
+            value = compute()
+            self._write(full_key, value, timeout, time.perf_counter() - started, local)
+            return value
+        finally:
+            # Never release a lock another worker holds, even after giving up waiting on it.
+            if locked:
+                self.shared.delete(lock_key)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+
+tiered_cache = TieredCache()
+
+
+def clear_caches():
+    """Empty both tiers; tests call this where cached state matters."""
+    tiered_cache.clear()
@@ -0,0 +1,63 @@
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+
+
+def estimated_row_count(model, using: str = "default") -> int | None:
+    """Row count from planner statistics, or None when the backend has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+            if connection.vendor == "sqlite":
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+    except DatabaseError:
+        return None
+    return None
+
+
+def connection_stats() -> dict:
+    """Per-alias connection reuse settings, plus psycopg pool statistics where pooling is on."""
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "pooled": False,
+        }
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            entry["pooled"] = True
+            entry["pool"] = pool.get_stats()
+        stats[alias] = entry
+    return stats
+
+
+def attach_execute_wrapper(wrapper, connection=None):
+    """Add `wrapper` to `connection`, or to this thread's open connections, once."""
+    for conn in [connection] if connection is not None else connections.all(initialized_only=True):
+        if wrapper not in conn.execute_wrappers:
+            conn.execute_wrappers.append(wrapper)
+
+
+def add_execute_wrapper(wrapper):
+    """Run `wrapper` around every query, on this thread's open connections and every connection opened later.
+
+    `connection.execute_wrapper()` covers one thread's connection for one block,
+    but async views query from sync_to_async threads. Connections opened in other
+    threads before this call are missed; call `attach_execute_wrapper(wrapper)` from
+    those threads to cover them.
+    """
+    connection_created.connect(
+        lambda sender, connection, **kwargs: attach_execute_wrapper(wrapper, connection),
+        weak=False,
+        dispatch_uid=f"execute_wrapper:{wrapper.__module__}.{wrapper.__qualname__}",
+    )
+    attach_execute_wrapper(wrapper)
@@ -0,0 +1,145 @@
+import hashlib
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyRequestInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still being processed."
+    default_code = "IDEMPOTENCY_IN_PROGRESS"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used for a different request."
+    default_code = "IDEMPOTENCY_KEY_REUSED"
+
+
+class IdempotentReplay(Exception):
+    def __init__(self, response: HttpResponse):
+        self.response = response
+
+
+def _digest(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyRecord:
+    def __init__(self, request, key: str):
+        user = request.user
+        scope = f"user:{user.pk}" if user and user.is_authenticated else f"anon:{BaseThrottle().get_ident(request)}"
+        base = _digest(scope, request.path, key)
+        self.response_key = f"idempotency:response:{base}"
+        self.lock_key = f"idempotency:lock:{base}"
+        self.fingerprint = _digest(request.method, request.path, request._request.body)
+
+    def _replay(self, stored: dict) -> HttpResponse:
+        if stored["fingerprint"] != self.fingerprint:
+            raise IdempotencyKeyReused()
+        response = HttpResponse(stored["content"], status=stored["status"])
+        for header, value in stored["headers"]:
+            response[header] = value
+        response[REPLAYED_HEADER] = "true"
+        return response
+
+    def acquire(self):
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            stored = cache.get(self.response_key)
+            if stored is not None:
+                raise IdempotentReplay(self._replay(stored))
+            if cache.add(self.lock_key, self.fingerprint, settings.IDEMPOTENCY_LOCK_SECONDS):
+                return
+            holder = cache.get(self.lock_key)
+            if holder is not None and holder != self.fingerprint:
+                raise IdempotencyKeyReused()
+            if time.monotonic() >= deadline:
+                raise IdempotencyRequestInProgress()
+            time.sleep(settings.IDEMPOTENCY_POLL_SECONDS)
+
+    def complete(self, response):
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+        if response.status_code < 500 and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+            stored = {
+                "fingerprint": self.fingerprint,
+                "status": response.status_code,
+                "headers": list(response.items()),
+                "content": response.content,
+            }
+            cache.set(self.response_key, stored, settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        self.release()
+
+    def release(self):
+        cache.delete(self.lock_key)
+
+
+class IdempotencyMixin:
+    idempotent_methods = ("POST",)
+
+    def check_throttles(self, request):
+        # Runs after authentication, so the key can be scoped per user, and
+        # before throttling, so a replay never spends the caller's quota.
+        self._idempotency_record = None
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key and request.method in self.idempotent_methods:
+            record = IdempotencyRecord(request, key)
+            record.acquire()
+            self._idempotency_record = record
+        super().check_throttles(request)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def raise_uncaught_exception(self, exc):
+        record = getattr(self, "_idempotency_record", None)
+        if record is not None:
+            self._idempotency_record = None
+            record.release()
+        super().raise_uncaught_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        record = getattr(self, "_idempotency_record", None)
+        if record is not None:
+            self._idempotency_record = None
+            record.complete(response)
+        return response
+
+    # AsyncAPIView: the record's cache I/O (e.g. the db backend) must not run on the event loop.
+
+    async def ahandle_exception(self, exc):
+        record = getattr(self, "_idempotency_record", None)
+        self._idempotency_record = None
+        try:
+            response = await super().ahandle_exception(exc)
+        except BaseException:
+            if record is not None:
+                await sync_to_async(record.release)()
+            raise
+        self._idempotency_record = record
+        return response
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        record = getattr(self, "_idempotency_record", None)
+        self._idempotency_record = None
+        response = await super().afinalize_response(request, response, *args, **kwargs)
+        if record is not None:
+            await sync_to_async(record.complete)(response)
+        return response
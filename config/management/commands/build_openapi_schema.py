@@ -0,0 +1,18 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from config.schema import code_version, generate_schema, write_artefacts
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema for the current code version into OPENAPI_SCHEMA_DIR (run at image build)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", default=None, help="Defaults to OPENAPI_SCHEMA_DIR.")
+
+    def handle(self, *args, **options):
+        directory = Path(options["output_dir"] or settings.OPENAPI_SCHEMA_DIR)
+        version = code_version()
+        for path in write_artefacts(directory, version, generate_schema()):
+            self.stdout.write(f"Wrote {path} ({path.stat().st_size} bytes)")
+        self.stdout.write(self.style.SUCCESS(f"OpenAPI schema built for version {version}."))
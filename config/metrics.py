@@ -0,0 +1,159 @@
+"""Prometheus metrics, served in text format at `/metrics`.
+
+Each gunicorn worker records into its own process. gunicorn.conf.py points
+`PROMETHEUS_MULTIPROC_DIR` at a shared directory and empties it when the
+master starts. prometheus_client then keeps every worker's samples in files
+there, and `/metrics` sums them across workers. Without that variable (runserver,
+tests) the metrics stay in this process.
+
+`MetricsMiddleware` records per-route latency, status codes, throttle rejections
+and queries per request. Routes are URL names (`auth-login`, `app-list`, ...),
+so label values stay bounded. `billing.views` records Stripe call latency and
+webhook lag. `/metrics` answers only to `Authorization: Bearer <METRICS_TOKEN>`,
+and is a 404 while no token is configured.
+"""
+import contextvars
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from config.db import add_execute_wrapper, attach_execute_wrapper
+
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from the metrics middleware receiving a request to it returning the response.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RESPONSES = Counter("http_responses", "Responses by route, method and status code.", ["route", "method", "status"])
+THROTTLED = Counter("http_throttled_requests", "Requests rejected by DRF throttling (429).", ["route"])
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run per request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+STRIPE_LATENCY = Histogram(
+    "stripe_request_duration_seconds",
+    "Stripe API call latency.",
+    ["operation", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+WEBHOOK_LAG = Histogram(
+    "stripe_webhook_lag_seconds",
+    "Seconds between Stripe creating an event and this service accepting its webhook.",
+    ["event_type"],
+    buckets=(1, 5, 15, 30, 60, 300, 900, 3600, 21600, 86400),
+)
+
+query_counter: contextvars.ContextVar = contextvars.ContextVar("request_queries", default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    counter = query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def route_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None and match.view_name else UNMATCHED_ROUTE
+
+
+@contextmanager
+def stripe_timer(operation: str):
+    """Time a Stripe call, e.g. `with stripe_timer("checkout.Session.create"): ...`; works around awaits too."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STRIPE_LATENCY.labels(operation, outcome).observe(time.perf_counter() - started)
+
+
+def observe_webhook_lag(event):
+    created = event.get("created")
+    if created:
+        WEBHOOK_LAG.labels(event.get("type") or "unknown").observe(max(0.0, time.time() - created))
+
+
+class MetricsMiddleware:
+    """Keep right after ProbeMiddleware so probes are not counted and latency covers the rest of the stack."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        add_execute_wrapper(count_queries)
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        attach_execute_wrapper(count_queries)
+        counter = [0]
+        token = query_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            query_counter.reset(token)
+        self.record(request, response, time.perf_counter() - started, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        counter = [0]
+        token = query_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_counter.reset(token)
+        self.record(request, response, time.perf_counter() - started, counter[0])
+        return response
+
+    @staticmethod
+    def record(request, response, elapsed: float, queries: int):
+        route = route_name(request)
+        REQUEST_LATENCY.labels(route, request.method).observe(elapsed)
+        RESPONSES.labels(route, request.method, str(response.status_code)).inc()
+        REQUEST_QUERIES.labels(route).observe(queries)
+        if response.status_code == 429:
+            THROTTLED.labels(route).inc()
+
+
+def metrics_registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class MetricsView(View):
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        token = settings.METRICS_TOKEN
+        if not token:
+            raise Http404
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), token.encode()):
+            response = HttpResponse(status=401)
+            response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+            return response
+        response = HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
+        response["Cache-Control"] = "no-store"
+        return response
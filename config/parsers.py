@@ -0,0 +1,25 @@
+"""orjson-backed JSON parser; falls back to DRF's JSONParser when orjson is not installed."""
+import io
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from config.renderers import ORJSONRenderer, orjson
+
+UTF8_NAMES = {"utf-8", "utf8"}
+
+
+class ORJSONParser(JSONParser):
+    """Drop-in for JSONParser for UTF-8 bodies. Other charsets, and bodies orjson
+    rejects, are parsed by JSONParser, so errors and edge cases match it."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8_NAMES:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,159 @@
+"""Liveness and readiness probes answered at the top of the middleware stack.
+
+`/healthz` says the process is up and serving. `/readyz` checks the database,
+the shared cache and that no migrations are pending. Each check has
+`READINESS_TIMEOUT_SECONDS` to finish, and the result is reused for
+`READINESS_CACHE_SECONDS`. Neither path reaches sessions, CSRF, host
+validation, DRF or its throttles, so load balancer probes are never rejected
+or rate limited.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATH = "/healthz"
+READINESS_PATH = "/readyz"
+LIVENESS_BODY = b'{"status":"ok"}'
+
+
+def check_database():
+    connection.close_if_unusable_or_obsolete()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        # Same lifecycle as a request: pooled connections go back, persistent ones are kept.
+        connection.close_if_unusable_or_obsolete()
+
+
+def check_cache():
+    token = str(time.monotonic_ns())
+    cache.set("probes:readyz", token, 10)
+    if cache.get("probes:readyz") != token:
+        raise RuntimeError("cache read did not return the value just written")
+
+
+def check_migrations():
+    executor = MigrationExecutor(connection)
+    try:
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            raise RuntimeError("unapplied migrations")
+    finally:
+        connection.close_if_unusable_or_obsolete()
+
+
+class Readiness:
+    def __init__(self):
+        self.checks = {"database": check_database, "cache": check_cache, "migrations": check_migrations}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.checks), thread_name_prefix="readyz")
+        self._lock = threading.Lock()
+        self._result: tuple[bool, dict] | None = None
+        self._checked_at = 0.0
+        self._migrated = False
+
+    def cached(self) -> tuple[bool, dict] | None:
+        if self._result is not None and time.monotonic() - self._checked_at < settings.READINESS_CACHE_SECONDS:
+            return self._result
+        return None
+
+    def check(self) -> tuple[bool, dict]:
+        with self._lock:
+            result = self.cached()
+            if result is None:
+                result = self._run()
+                self._result, self._checked_at = result, time.monotonic()
+            return result
+
+    def _run(self) -> tuple[bool, dict]:
+        checks = {name: check for name, check in self.checks.items() if not (name == "migrations" and self._migrated)}
+        futures = {name: self._executor.submit(check) for name, check in checks.items()}
+        deadline = time.monotonic() + settings.READINESS_TIMEOUT_SECONDS
+        results = {}
+        for name, future in futures.items():
+            try:
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+                results[name] = "ok"
+            except FutureTimeoutError:
+                logger.warning("Readiness check %s timed out", name)
+                results[name] = "timeout"
+            except Exception:
+                # Details go to the log only; probe responses are unauthenticated.
+                logger.warning("Readiness check %s failed", name, exc_info=True)
+                results[name] = "error"
+        # Applied migrations are not rolled back under a running process; stop reloading the graph.
+        if results.get("migrations") == "ok":
+            self._migrated = True
+        if self._migrated:
+            results.setdefault("migrations", "ok")
+        return all(value == "ok" for value in results.values()), results
+
+    def reset(self):
+        with self._lock:
+            self._result = None
+            self._migrated = False
+
+
+readiness = Readiness()
+
+
+def probe_response(body: bytes, status: int = 200) -> HttpResponse:
+    response = HttpResponse(body, status=status, content_type="application/json")
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def readiness_response(result: tuple[bool, dict]) -> HttpResponse:
+    ready, checks = result
+    body = json.dumps({"status": "ok" if ready else "unavailable", "checks": checks}).encode()
+    return probe_response(body, 200 if ready else 503)
+
+
+class ProbeMiddleware:
+    """Keep first in MIDDLEWARE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def probe(request) -> str | None:
+        if request.method not in ("GET", "HEAD"):
+            return None
+        path = request.path_info.rstrip("/")
+        if path in (LIVENESS_PATH, READINESS_PATH):
+            return path
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        probe = self.probe(request)
+        if probe == LIVENESS_PATH:
+            return probe_response(LIVENESS_BODY)
+        if probe == READINESS_PATH:
+            return readiness_response(readiness.check())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        probe = self.probe(request)
+        if probe == LIVENESS_PATH:
+            return probe_response(LIVENESS_BODY)
+        if probe == READINESS_PATH:
+            result = readiness.cached() or await sync_to_async(readiness.check, thread_sensitive=False)()
+            return readiness_response(result)
+        return await self.get_response(request)
@@ -0,0 +1,190 @@
+"""Sampled per-request profiling, reported as Server-Timing headers and a log line.
+
+Enabled with `REQUEST_PROFILING=true`; otherwise the middleware removes itself
+at startup (MiddlewareNotUsed). When enabled, a `REQUEST_PROFILING_SAMPLE_RATE`
+share of requests carry a `RequestProfile` in a context variable, which follows
+the request into `sync_to_async` threads. Time is collected by:
+
+- a database execute wrapper (`connection.execute_wrappers`) on every
+  connection: query count and time;
+- `ProfilingMixin`, which the project's base views (`config.views`) carry:
+  authentication, permissions and throttles, the rest of the handler
+  (`view`), and `finalize_response` plus rendering (`render`);
+- `SerializerProfilingMixin`, which the project's base serializers
+  (`config.serializers`) carry: validation and representation (`ser`).
+
+Unsampled requests pay one context variable lookup per hook.
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.response import SimpleTemplateResponse
+from config.db import add_execute_wrapper, attach_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("auth", "perm", "throttle", "ser", "view", "render")
+current_profile: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._depth = dict.fromkeys(PHASES, 0)
+
+    def timed(self, phase: str, func, *args, **kwargs):
+        # Only the outermost call counts, so nested and list serializers are not added twice.
+        self._depth[phase] += 1
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._depth[phase] -= 1
+            if not self._depth[phase]:
+                self.phases[phase] += time.perf_counter() - started
+
+    def server_timing(self, total: float) -> str:
+        metrics = [f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries"']
+        metrics += [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in self.phases.items() if seconds]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def as_log(self, request, response, total: float) -> dict:
+        return {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "queries": self.queries,
+            **{f"{phase}_ms": round(seconds * 1000, 2) for phase, seconds in self.phases.items()},
+        }
+
+
+def profile_queries(execute, sql, params, many, context):
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_seconds += time.perf_counter() - started
+
+
+def timed(phase: str, func, *args, **kwargs):
+    profile = current_profile.get()
+    if profile is None:
+        return func(*args, **kwargs)
+    return profile.timed(phase, func, *args, **kwargs)
+
+
+# The mixins below carry comments rather than docstrings: drf-spectacular uses
+# the first docstring in a view's or serializer's MRO as its API description.
+
+
+class ProfilingMixin:
+    # Time DRF's request phases on sampled requests. Listed first, so the phases include other mixins.
+
+    def perform_authentication(self, request):
+        timed("auth", super().perform_authentication, request)
+
+    def check_permissions(self, request):
+        timed("perm", super().check_permissions, request)
+
+    def check_throttles(self, request):
+        timed("throttle", super().check_throttles, request)
+
+    def initial(self, request, *args, **kwargs):
+        self._profile_view_started = None
+        super().initial(request, *args, **kwargs)
+        profile = current_profile.get()
+        if profile is not None:
+            self._profile_view_started = (time.perf_counter(), profile.phases["ser"])
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return super().finalize_response(request, response, *args, **kwargs)
+        view_started = getattr(self, "_profile_view_started", None)
+        if view_started is not None:
+            started, ser_before = view_started
+            # The handler's serializer time is reported as `ser`, not twice.
+            handler = time.perf_counter() - started
+            profile.phases["view"] += handler - (profile.phases["ser"] - ser_before)
+        return profile.timed("render", self._finalize_and_render, request, response, *args, **kwargs)
+
+    def _finalize_and_render(self, request, response, *args, **kwargs):
+        # Django's handler would render next anyway. IdempotencyMixin renders
+        # after this returns and finds the response already rendered.
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+            response.render()
+        return response
+
+
+class SerializerProfilingMixin:
+    # Time validation and representation as the `ser` phase; list items and nested serializers count once.
+
+    def run_validation(self, *args, **kwargs):
+        return timed("ser", super().run_validation, *args, **kwargs)
+
+    def to_representation(self, instance):
+        return timed("ser", super().to_representation, instance)
+
+
+class ServerTimingMiddleware:
+    """Keep near the top of MIDDLEWARE so `total` covers the rest of the stack."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        add_execute_wrapper(profile_queries)
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        attach_execute_wrapper(profile_queries)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return await self.get_response(request)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.report(request, response, profile)
+
+    @staticmethod
+    def report(request, response, profile: RequestProfile):
+        total = time.perf_counter() - profile.started
+        if settings.REQUEST_PROFILING_HEADERS:
+            response["Server-Timing"] = profile.server_timing(total)
+        logger.info("request profile %s", json.dumps(profile.as_log(request, response, total)))
+        return response
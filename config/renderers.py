@@ -0,0 +1,41 @@
+"""orjson-backed JSON renderer; falls back to DRF's JSONRenderer when orjson is not installed."""
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    # Datetimes go through DRF's encoder too, so output matches JSONRenderer ("Z" suffix etc.).
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in for JSONRenderer with compact UTF-8 output (the DRF defaults).
+
+    Values orjson does not handle natively (datetimes, Decimal, lazy
+    translation strings, querysets) go through DRF's JSONEncoder. Indented
+    output, `UNICODE_JSON=False`, `COMPACT_JSON=False` and values orjson
+    rejects (e.g. integers over 64 bits) are rendered by JSONRenderer. Unlike
+    STRICT_JSON, NaN and infinities render as null instead of raising.
+    """
+
+    default = staticmethod(encoders.JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping as JSONRenderer.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,192 @@
+"""Precomputed OpenAPI schema.
+
+Generating the schema introspects every view and serializer, so it is done
+once per code version: at build time with `manage.py build_openapi_schema`, or
+lazily by the first request. The YAML and JSON renderings are kept in memory and
+in `OPENAPI_SCHEMA_DIR`, with their gzip encodings. They are served with a
+strong ETag and `Cache-Control`.
+
+The code version is `APP_VERSION` when set (e.g. the image's git SHA),
+otherwise a digest of the project's Python sources and the drf-spectacular
+version. Any change to either produces a new schema. It is prefixed with
+`SERVER_MODE`, because the URLconf differs between WSGI and ASGI (some routes
+exist only under ASGI); each mode keeps its own artefacts.
+"""
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+SCHEMA_FORMATS = {
+    "yaml": (OpenApiYamlRenderer, "application/vnd.oai.openapi"),
+    "json": (OpenApiJsonRenderer, "application/vnd.oai.openapi+json"),
+}
+# drf-spectacular's ?format= names, still accepted by the schema view.
+FORMAT_ALIASES = {"openapi": "yaml", "openapi-json": "json"}
+ACCEPTS_GZIP = re.compile(r"\bgzip\b(?!\s*;\s*q=0(\.0*)?\b)")
+
+
+@dataclass(frozen=True)
+class SchemaDocument:
+    body: bytes
+    etag: str
+    gzipped: bytes
+    gzip_etag: str
+    media_type: str
+
+
+def strong_etag(content: bytes) -> str:
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def source_files():
+    roots = {Path(settings.BASE_DIR) / settings.ROOT_URLCONF.split(".")[0]}
+    roots.update(
+        Path(config.path)
+        for config in apps.get_app_configs()
+        if Path(config.path).is_relative_to(settings.BASE_DIR) and "site-packages" not in Path(config.path).parts
+    )
+    for root in sorted(roots):
+        for path in sorted(root.rglob("*.py")):
+            if not {"tests", "migrations"} & set(path.relative_to(root).parts):
+                yield path
+
+
+@lru_cache(maxsize=1)
+def source_version() -> str:
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    for path in source_files():
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def code_version() -> str:
+    return f"{settings.SERVER_MODE}-{settings.APP_VERSION or source_version()}"
+
+
+def generate_schema() -> dict[str, SchemaDocument]:
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    documents = {}
+    for name, (renderer_class, media_type) in SCHEMA_FORMATS.items():
+        body = renderer_class().render(schema, renderer_context={})
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        documents[name] = SchemaDocument(body, strong_etag(body), gzipped, strong_etag(gzipped), media_type)
+    return documents
+
+
+def artefact_path(directory: Path, version: str, name: str) -> Path:
+    return Path(directory) / f"openapi-{version}.{name}"
+
+
+def write_atomic(path: Path, content: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(content)
+    os.replace(tmp, path)
+
+
+def write_artefacts(directory: Path, version: str, documents: dict[str, SchemaDocument]) -> list[Path]:
+    """Write the documents for `version` and delete this server mode's artefacts of other versions."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, document in documents.items():
+        for path, content in (
+            (artefact_path(directory, version, name), document.body),
+            (artefact_path(directory, version, f"{name}.gz"), document.gzipped),
+        ):
+            write_atomic(path, content)
+            written.append(path)
+    for stale in directory.glob(f"openapi-{settings.SERVER_MODE}-*"):
+        if stale not in written:
+            stale.unlink(missing_ok=True)
+    return written
+
+
+def read_artefacts(directory: Path, version: str) -> dict[str, SchemaDocument] | None:
+    documents = {}
+    try:
+        for name, (_, media_type) in SCHEMA_FORMATS.items():
+            body = artefact_path(directory, version, name).read_bytes()
+            gzipped = artefact_path(directory, version, f"{name}.gz").read_bytes()
+            documents[name] = SchemaDocument(body, strong_etag(body), gzipped, strong_etag(gzipped), media_type)
+    except OSError:
+        return None
+    return documents
+
+
+class SchemaStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._documents: dict[str, SchemaDocument] = {}
+
+    def get(self, name: str) -> SchemaDocument:
+        version = code_version()
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._documents = self._load(version)
+                    self._version = version
+        return self._documents[name]
+
+    def _load(self, version: str) -> dict[str, SchemaDocument]:
+        directory = Path(settings.OPENAPI_SCHEMA_DIR)
+        documents = read_artefacts(directory, version)
+        if documents is None:
+            documents = generate_schema()
+            try:
+                write_artefacts(directory, version, documents)
+            except OSError:
+                pass  # Read-only filesystem: keep serving from memory.
+        return documents
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._documents = {}
+
+
+schema_store = SchemaStore()
+
+
+class SchemaView(View):
+    """OpenAPI schema as YAML (default) or JSON via `?format=json` or an Accept header containing `json`."""
+
+    http_method_names = ["get", "head"]
+
+    def get(self, request, *args, **kwargs):
+        name = request.GET.get("format") or ("json" if "json" in request.headers.get("Accept", "") else "yaml")
+        name = FORMAT_ALIASES.get(name, name)
+        if name not in SCHEMA_FORMATS:
+            return HttpResponse(status=404)
+        document = schema_store.get(name)
+        use_gzip = bool(ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")))
+        etag = document.gzip_etag if use_gzip else document.etag
+
+        if etag in {tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")}:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(document.gzipped if use_gzip else document.body, content_type=document.media_type)
+            if use_gzip:
+                response["Content-Encoding"] = "gzip"
+            response["Content-Disposition"] = f'inline; filename="{spectacular_settings.TITLE or "schema"}.{name}"'
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
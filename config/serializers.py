@@ -0,0 +1,16 @@
+"""Project bases for serializers: DRF's classes with `config.profiling.SerializerProfilingMixin`.
+
+Serializers derive from these instead of DRF's, so sampled requests report
+serializer time (`ser`). One that extends a third-party serializer lists the
+mixin first instead.
+"""
+from rest_framework import serializers
+from config.profiling import SerializerProfilingMixin
+
+
+class Serializer(SerializerProfilingMixin, serializers.Serializer):
+    pass
+
+
+class ModelSerializer(SerializerProfilingMixin, serializers.ModelSerializer):
+    pass
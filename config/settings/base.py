@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
+    "config",
     "billing",
     "apps",
     "adminapi",
@@ -38,6 +39,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.probes.ProbeMiddleware",
+    "config.metrics.MetricsMiddleware",
+    "config.profiling.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -68,6 +72,9 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
+SERVER_MODE = os.getenv("DJANGO_SERVER_MODE", "wsgi").lower()
+ASYNC_VIEWS = SERVER_MODE == "asgi"
+
 
 POSTGRES_DB = os.getenv("POSTGRES_DB")
 POSTGRES_USER = os.getenv("POSTGRES_USER")
@@ -75,6 +82,19 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Connection reuse. ASGI defaults to a psycopg pool shared by the worker's
+# threads; sync workers default to one persistent connection per thread.
+# Django's pool requires CONN_MAX_AGE=0, so persistence is off when pooling.
+DB_POOL = os.getenv("DB_POOL", "true" if ASYNC_VIEWS else "false").lower() == "true"
+DB_CONN_MAX_AGE = 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60"))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+DB_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2" if ASYNC_VIEWS else "1")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10" if ASYNC_VIEWS else "4")),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10")),
+    "max_idle": float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300")),
+}
+
 if POSTGRES_DB and POSTGRES_USER and POSTGRES_PASSWORD:
     DATABASES = {
         "default": {
@@ -84,17 +104,59 @@ if POSTGRES_DB and POSTGRES_USER and POSTGRES_PASSWORD:
             "PASSWORD": POSTGRES_PASSWORD,
             "HOST": POSTGRES_HOST,
             "PORT": POSTGRES_PORT,
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+            "OPTIONS": {"pool": DB_POOL_OPTIONS} if DB_POOL else {},
         }
     }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
         }
     }
 
 
+# Shared cache tier: locmem (per process, the default), file or db for local
+# multi-worker setups, redis/memcached or any dotted backend path in production.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").lower()
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "default"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "django_cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://localhost:6379/0"),
+    "memcached": ("django.core.cache.backends.memcached.PyMemcacheCache", "127.0.0.1:11211"),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS.get(CACHE_BACKEND, (CACHE_BACKEND, ""))
+CACHES = {
+    "default": {
+        "BACKEND": _cache_backend,
+        "LOCATION": os.getenv("CACHE_LOCATION", _cache_location),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "api"),
+    }
+}
+# In-process L1 tier in front of it (config.cache).
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024"))
+CACHE_LOCAL_TIMEOUT = float(os.getenv("CACHE_LOCAL_TIMEOUT_SECONDS", "5"))
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))
+CACHE_LOCK_SECONDS = 10
+CACHE_POLL_SECONDS = 0.05
+
+# /readyz (config.probes): per-check timeout and how long a result is reused.
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", "1.0"))
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "1.0"))
+
+# Bearer token for /metrics (config.metrics); the endpoint is a 404 while unset.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Per-request profiling (config.profiling): off unless enabled; the share of requests sampled.
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "false").lower() == "true"
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv("REQUEST_PROFILING_SAMPLE_RATE", "1.0"))
+REQUEST_PROFILING_HEADERS = os.getenv("REQUEST_PROFILING_HEADERS", "true").lower() == "true"
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -132,6 +194,16 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # orjson-backed JSON; both fall back to the stdlib when orjson is not installed.
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "config.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.UserRateThrottle",
         "rest_framework.throttling.AnonRateThrottle",
@@ -146,6 +218,11 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(24 * 60 * 60)))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_POLL_SECONDS = 0.05
+
 ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_LIFETIME_MINUTES", "5"))
 REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_LIFETIME_DAYS", "7"))
 
@@ -171,6 +248,8 @@ REFRESH_TOKEN_MAX_AGE = int(os.getenv("REFRESH_TOKEN_MAX_AGE_SECONDS", REFRESH_T
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
+# Points the Stripe client at stripe-mock or a local stand-in; unset uses the real API.
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")
 
 STRIPE_PRICE_BASIC_ID = os.getenv("STRIPE_PRICE_BASIC_ID", "price_basic_placeholder")
 STRIPE_PRICE_PRO_ID = os.getenv("STRIPE_PRICE_PRO_ID", "price_pro_placeholder")
@@ -180,6 +259,31 @@ PLAN_PRICE_MAP = {
 }
 
 PLAN_LIMITS = {"basic": 3, "pro": 50}
+PLAN_ENTITLEMENTS: dict[str, list[str]] = {"basic": [], "pro": []}
+
+PLAN_CATALOG_DB_OVERRIDES = os.getenv("PLAN_CATALOG_DB_OVERRIDES", "false").lower() == "true"
+PLAN_CATALOG_RELOAD_SECONDS = int(os.getenv("PLAN_CATALOG_RELOAD_SECONDS", "30"))
+
+SUBSCRIPTION_CACHE_TIMEOUT = int(os.getenv("SUBSCRIPTION_CACHE_TIMEOUT_SECONDS", "3600"))
+APP_MEMBERSHIP_CACHE_TIMEOUT = int(os.getenv("APP_MEMBERSHIP_CACHE_TIMEOUT_SECONDS", "600"))
+# Unfiltered admin lists below this size are counted exactly; above it, planner statistics are used.
+ADMIN_EXACT_COUNT_THRESHOLD = int(os.getenv("ADMIN_EXACT_COUNT_THRESHOLD", "10000"))
+ADMIN_SEARCH_MIN_LENGTH = 3
+# Dashboard metrics are fresh for FRESH seconds, then served stale (and refreshed) until STALE.
+ADMIN_METRICS_FRESH_SECONDS = int(os.getenv("ADMIN_METRICS_FRESH_SECONDS", "60"))
+ADMIN_METRICS_STALE_SECONDS = int(os.getenv("ADMIN_METRICS_STALE_SECONDS", "3600"))
+ADMIN_METRICS_LOCK_SECONDS = 30
+# Audit events are buffered per process and written in batches.
+ADMIN_AUDIT_BUFFER_SIZE = int(os.getenv("ADMIN_AUDIT_BUFFER_SIZE", "100"))
+ADMIN_AUDIT_FLUSH_SECONDS = float(os.getenv("ADMIN_AUDIT_FLUSH_SECONDS", "5"))
+ADMIN_EXPORT_CHUNK_SIZE = int(os.getenv("ADMIN_EXPORT_CHUNK_SIZE", "2000"))
+ADMIN_EXPORT_BUFFER_BYTES = 64 * 1024
+
+SUBSCRIPTION_EVENTS_CHANNEL = os.getenv("SUBSCRIPTION_EVENTS_CHANNEL", "billing.events.LocalChannel")
+SUBSCRIPTION_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("SUBSCRIPTION_EVENTS_HEARTBEAT_SECONDS", "15"))
+SUBSCRIPTION_EVENTS_TIMEOUT_SECONDS = float(os.getenv("SUBSCRIPTION_EVENTS_TIMEOUT_SECONDS", "300"))
+SUBSCRIPTION_EVENTS_RETRY_MS = int(os.getenv("SUBSCRIPTION_EVENTS_RETRY_MS", "3000"))
+SUBSCRIPTION_EVENTS_QUEUE_SIZE = 16
 
 CHECKOUT_SUCCESS_URL = os.getenv("CHECKOUT_SUCCESS_URL", f"{FRONTEND_URL}/billing/success")
 CHECKOUT_CANCEL_URL = os.getenv("CHECKOUT_CANCEL_URL", f"{FRONTEND_URL}/billing/cancel")
@@ -190,4 +294,13 @@ SPECTACULAR_SETTINGS = {
     "DESCRIPTION": "API for auth, subscriptions, app limits, and admin operations.",
     "VERSION": "0.1.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    # Several models have a `status` field; name their enums instead of hashing them.
+    "ENUM_NAME_OVERRIDES": {
+        "SubscriptionStatusEnum": "billing.models.Subscription.Status",
+        "InvoiceStatusEnum": "billing.models.Invoice.Status",
+    },
 }
+# Precomputed schema (config.schema): regenerated when APP_VERSION (or, unset, the source digest) changes.
+APP_VERSION = os.getenv("APP_VERSION", "")
+OPENAPI_SCHEMA_DIR = Path(os.getenv("OPENAPI_SCHEMA_DIR", BASE_DIR / "build" / "openapi"))
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv("OPENAPI_SCHEMA_MAX_AGE_SECONDS", "300"))
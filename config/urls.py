@@ -14,12 +14,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.response import Response
-from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
+from config.async_views import AsyncAPIView
+from config.metrics import MetricsView
+from config.schema import SchemaView
+from config.views import APIView
 
 
 class HealthView(APIView):
@@ -30,13 +34,26 @@ class HealthView(APIView):
     def get(self, request):
         return Response({"status": "ok"})
 
+
+class AsyncHealthView(AsyncAPIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @extend_schema(responses={200: None})
+    async def get(self, request):
+        return Response({"status": "ok"})
+
+
+health_view = AsyncHealthView if settings.ASYNC_VIEWS else HealthView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("users.urls")),
     path("api/v1/", include("billing.urls")),
     path("api/v1/", include("apps.urls")),
     path("api/v1/", include("adminapi.urls")),
-    path("api/v1/health/", HealthView.as_view(), name="health"),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/v1/health/", health_view.as_view(), name="health"),
+    path("api/schema/", SchemaView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
@@ -0,0 +1,20 @@
+"""Project bases for API views: DRF's classes with `config.profiling.ProfilingMixin`.
+
+API views derive from these instead of DRF's, so every sampled request reports
+its DRF phases. A view that extends a third-party view lists `ProfilingMixin`
+first instead.
+"""
+from rest_framework import generics, views, viewsets
+from config.profiling import ProfilingMixin
+
+
+class APIView(ProfilingMixin, views.APIView):
+    pass
+
+
+class ListAPIView(ProfilingMixin, generics.ListAPIView):
+    pass
+
+
+class ModelViewSet(ProfilingMixin, viewsets.ModelViewSet):
+    pass
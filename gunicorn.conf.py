@@ -0,0 +1,40 @@
+# Loaded automatically by gunicorn from the working directory.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# DJANGO_SERVER_MODE=asgi serves config.asgi on uvicorn workers (one event loop
+# per process, so fewer processes); anything else serves config.wsgi on sync workers.
+SERVER_MODE = os.getenv("DJANGO_SERVER_MODE", "wsgi").lower()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Workers write metrics here and /metrics sums them (config.metrics). Must be set
+# before prometheus_client is imported, hence here rather than in settings.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "api-metrics"))
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+else:
+    wsgi_app = "config.wsgi:application"
+    workers = int(os.getenv("WEB_CONCURRENCY", 2 * multiprocessing.cpu_count() + 1))
+    threads = int(os.getenv("GUNICORN_THREADS", "1"))
+
+
+def on_starting(server):
+    # Samples from a previous master would be summed with this one's.
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def worker_exit(server, worker):
+    from adminapi.audit import flush_audit_log
+
+    flush_audit_log()
@@ -0,0 +1,92 @@
+import threading
+import time
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from config.cache import LocalLRU, TieredCache, clear_caches
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_evicts_least_recently_used_and_expires(self):
+        lru = LocalLRU(max_entries=2)
+        lru.set("a", 1, 60)
+        lru.set("b", 2, 60)
+        lru.get("a")
+        lru.set("c", 3, 60)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIs(lru.get("b"), lru.get("missing"))
+        with mock.patch("config.cache.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIs(lru.get("c"), lru.get("missing"))
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        clear_caches()
+        self.cache = TieredCache()
+
+    def test_invalidate_moves_namespace_to_a_new_version(self):
+        self.cache.set("ns", "k", "old", 60)
+        self.assertEqual(self.cache.get("ns", "k"), "old")
+        self.cache.invalidate("ns")
+        self.assertIsNone(self.cache.get("ns", "k"))
+
+    def test_local_tier_serves_reads_until_its_timeout(self):
+        self.cache.set("ns", "k", "v", 60)
+        with mock.patch.object(self.cache.shared, "get", side_effect=AssertionError("L2 read")):
+            self.assertEqual(self.cache.get("ns", "k"), "v")
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get("ns", "k"), "v")
+
+    def test_shared_only_values_skip_the_local_tier(self):
+        self.cache.get_or_compute("ns", "k", lambda: "v", 60, local=False)
+        self.assertIs(self.cache.local.get(self.cache.make_key("ns", "k")), self.cache.local.get("missing"))
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "v"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_compute("ns", "k", compute, 60)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["v"] * 8)
+
+    @override_settings(CACHE_POLL_SECONDS=0.01)
+    def test_loser_of_shared_lock_waits_for_winner(self):
+        full_key = self.cache.make_key("ns", "k")
+        self.cache.shared.add(f"{full_key}:lock", 1, 10)
+        other = TieredCache()
+        threading.Timer(0.05, lambda: other.set("ns", "k", "from-winner", 60)).start()
+        value = self.cache.get_or_compute("ns", "k", lambda: self.fail("computed while locked"), 60)
+        self.assertEqual(value, "from-winner")
+
+    @override_settings(CACHE_POLL_SECONDS=0.01, CACHE_LOCK_SECONDS=0.05)
+    def test_waiter_that_gives_up_keeps_the_other_workers_lock(self):
+        full_key = self.cache.make_key("ns", "k")
+        self.cache.shared.add(f"{full_key}:lock", "other-worker", 10)
+        self.assertEqual(self.cache.get_or_compute("ns", "k", lambda: "computed", 60), "computed")
+        self.assertEqual(self.cache.shared.get(f"{full_key}:lock"), "other-worker")
+
+    def test_xfetch_recomputes_early_only_near_expiry(self):
+        now = time.time()
+        self.assertFalse(TieredCache.should_recompute(("v", now + 60, 0.01), beta=1.0))
+        self.assertTrue(TieredCache.should_recompute(("v", now - 1, 0.01), beta=1.0))
+        with mock.patch("config.cache.random.random", return_value=0.999999):
+            self.assertTrue(TieredCache.should_recompute(("v", now + 0.05, 0.01), beta=1.0))
+
+    def test_early_refresh_replaces_value_before_expiry(self):
+        self.cache.get_or_compute("ns", "k", lambda: "old", 60)
+        with mock.patch.object(TieredCache, "should_recompute", return_value=True):
+            self.assertEqual(self.cache.get_or_compute("ns", "k", lambda: "new", 60), "new")
+        self.assertEqual(self.cache.get("ns", "k"), "new")
@@ -1,6 +1,23 @@
+import gzip
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from config.probes import readiness
+from config.schema import code_version, generate_schema, schema_store
+from config.urls import AsyncHealthView
 
 
 class HealthAndSchemaTests(APITestCase):
@@ -9,7 +26,132 @@ class HealthAndSchemaTests(APITestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data.get("status"), "ok")
 
+
+class SchemaTests(SimpleTestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        schema_store.clear()
+        self.addCleanup(schema_store.clear)
+
     def test_schema_available(self):
-        resp = self.client.get(reverse("schema"))
+        resp = self.client.get(reverse("schema"), {"format": "json"})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertIn("openapi", resp.data)
+        self.assertEqual(resp["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertIn("openapi", json.loads(resp.content))
+        self.assertTrue(self.client.get(reverse("schema")).content.startswith(b"openapi:"))
+
+    def test_status_enums_have_stable_names(self):
+        schemas = json.loads(self.client.get(reverse("schema"), {"format": "json"}).content)["components"]["schemas"]
+        self.assertTrue({"SubscriptionStatusEnum", "InvoiceStatusEnum"} <= schemas.keys())
+        self.assertFalse([name for name in schemas if re.fullmatch(r"Status[0-9A-F]{3}Enum", name)])
+
+    def test_schema_is_generated_once_and_revalidated_by_etag(self):
+        with mock.patch("config.schema.generate_schema", wraps=generate_schema) as generate:
+            first = self.client.get(reverse("schema"))
+            second = self.client.get(reverse("schema"))
+            not_modified = self.client.get(reverse("schema"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], first["ETag"])
+        self.assertIn("max-age=", first["Cache-Control"])
+
+    def test_schema_is_served_gzip_precompressed(self):
+        plain = self.client.get(reverse("schema"))
+        gzipped = self.client.get(reverse("schema"), HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        self.assertNotEqual(gzipped["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", gzipped["Vary"])
+
+    def test_build_command_writes_artefacts_served_without_generation(self):
+        call_command("build_openapi_schema", stdout=io.StringIO())
+        self.assertEqual(len(list(Path(self.schema_dir.name).glob(f"openapi-{code_version()}.*"))), 4)
+        with mock.patch("config.schema.generate_schema") as generate:
+            resp = self.client.get(reverse("schema"), HTTP_ACCEPT="application/json")
+        generate.assert_not_called()
+        self.assertIn("openapi", json.loads(resp.content))
+
+    def test_new_code_version_regenerates(self):
+        self.client.get(reverse("schema"))
+        with mock.patch("config.schema.code_version", return_value="next"), mock.patch(
+            "config.schema.generate_schema", wraps=generate_schema
+        ) as generate:
+            self.client.get(reverse("schema"))
+        generate.assert_called_once()
+        self.assertEqual([path.name for path in Path(self.schema_dir.name).glob("openapi-*.json")], ["openapi-next.json"])
+
+    def test_code_version_includes_server_mode(self):
+        wsgi = code_version()
+        with override_settings(SERVER_MODE="asgi"):
+            self.assertEqual(code_version(), wsgi.replace("wsgi-", "asgi-", 1))
+        with override_settings(APP_VERSION="abc123"):
+            self.assertEqual(code_version(), "wsgi-abc123")
+            with override_settings(SERVER_MODE="asgi"):
+                self.assertEqual(code_version(), "asgi-abc123")
+
+    def test_each_server_mode_builds_its_own_schema(self):
+        # The URLconf is chosen at import, so each mode is built in its own process, as in the Dockerfile.
+        paths = {}
+        for mode in ("wsgi", "asgi"):
+            subprocess.run(
+                [sys.executable, "manage.py", "build_openapi_schema", "--output-dir", self.schema_dir.name],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "DJANGO_SERVER_MODE": mode, "APP_VERSION": "build"},
+                check=True,
+                capture_output=True,
+            )
+            schema = json.loads((Path(self.schema_dir.name) / f"openapi-{mode}-build.json").read_bytes())
+            paths[mode] = schema["paths"].keys()
+        self.assertIn("/api/v1/subscriptions/events/", paths["asgi"])
+        self.assertNotIn("/api/v1/subscriptions/events/", paths["wsgi"])
+
+
+class AsyncHealthTests(SimpleTestCase):
+    async def test_async_health_endpoint(self):
+        response = await AsyncHealthView.as_view()(AsyncRequestFactory().get("/api/v1/health/"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"status": "ok"})
+
+
+class ProbeTests(TestCase):
+    def setUp(self):
+        readiness.reset()
+
+    def test_liveness_skips_database_host_check_and_throttles(self):
+        with self.assertNumQueries(0):
+            for _ in range(150):
+                resp = self.client.get("/healthz", HTTP_HOST="10.0.0.7")
+                self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json(), {"status": "ok"})
+        self.assertEqual(resp["Cache-Control"], "no-store")
+
+    def test_readiness_reports_each_check(self):
+        resp = self.client.get("/readyz/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json(), {"status": "ok", "checks": {"database": "ok", "cache": "ok", "migrations": "ok"}})
+
+    def test_readiness_fails_and_caches_result(self):
+        failing = mock.Mock(side_effect=RuntimeError("db down"))
+        with mock.patch.dict(readiness.checks, {"database": failing}), self.assertLogs("config.probes", "WARNING"):
+            first = self.client.get("/readyz")
+            second = self.client.get("/readyz")
+        self.assertEqual(first.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(first.json()["checks"]["database"], "error")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(failing.call_count, 1)
+
+    @override_settings(READINESS_TIMEOUT_SECONDS=0.05)
+    def test_readiness_times_out_slow_checks(self):
+        with mock.patch.dict(readiness.checks, {"cache": lambda: time.sleep(0.3)}), self.assertLogs("config.probes"):
+            resp = self.client.get("/readyz")
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(resp.json()["checks"]["cache"], "timeout")
+
+    def test_other_methods_and_paths_pass_through(self):
+        self.assertEqual(self.client.post("/healthz").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get("/healthzz").status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,69 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework.utils.serializer_helpers import ReturnDict
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+
+User = get_user_model()
+
+PAYLOAD = {
+    "aware": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "naive": datetime(2024, 5, 1, 12, 30),
+    "day": date(2024, 5, 1),
+    "clock": time(8, 15),
+    "duration": timedelta(minutes=90),
+    "price": Decimal("19.99"),
+    "label": gettext_lazy("Active"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "nested": ReturnDict({"items": [1, 2.5, None, True, "é"]}, serializer=None),
+    1: "int key",
+    "separator": "line\u2028break\u2029",
+}
+
+
+class ORJSONRendererTests(APITestCase):
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_indent_and_oversized_ints_fall_back(self):
+        for data, media_type in ((PAYLOAD, "application/json; indent=4"), ({"big": 2**70}, None)):
+            self.assertEqual(ORJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch("config.renderers.orjson", None):
+            self.assertEqual(ORJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_api_responses_use_it(self):
+        user = User.objects.create_user(email="json@example.com", password="Pass1234", is_active=True)
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse("app-list"))
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+
+
+class ORJSONParserTests(APITestCase):
+    def parse(self, parser, body: bytes, encoding="utf-8"):
+        return parser.parse(io.BytesIO(body), "application/json", {"encoding": encoding})
+
+    def test_parses_like_json_parser(self):
+        for body in (b'{"a": [1, 2.5, null, true], "b": "\\u00e9"}', b'{"big": 1180591620717411303424}'):
+            self.assertEqual(self.parse(ORJSONParser(), body), self.parse(JSONParser(), body))
+
+    def test_other_charsets_and_missing_orjson_fall_back(self):
+        self.assertEqual(self.parse(ORJSONParser(), '{"name": "é"}'.encode("latin-1"), "latin-1"), {"name": "é"})
+        with mock.patch("config.parsers.orjson", None):
+            self.assertEqual(self.parse(ORJSONParser(), b'{"a": 1}'), {"a": 1})
+
+    def test_invalid_json_raises_parse_error(self):
+        for body in (b"{not json", b'{"a": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(ORJSONParser(), body)
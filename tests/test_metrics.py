@@ -0,0 +1,77 @@
+import time
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from apps.models import App, AppUser
+from config.cache import clear_caches
+from config.metrics import MetricsMiddleware, observe_webhook_lag, stripe_timer
+
+User = get_user_model()
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@override_settings(METRICS_TOKEN="metrics-secret")
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="Pass1234", is_active=True)
+        app = App.objects.create(name="App", owner=self.user)
+        AppUser.objects.create(app=app, user=self.user, role=AppUser.Role.OWNER)
+        self.client = APIClient()
+        clear_caches()
+
+    def scrape(self, token="metrics-secret"):
+        return self.client.get(reverse("metrics"), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_records_requests_per_route(self):
+        before = sample("http_responses_total", route="app-list", method="GET", status="200")
+        latency_before = sample("http_request_duration_seconds_count", route="app-list", method="GET")
+        queries_before = sample("http_request_db_queries_sum", route="app-list")
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(reverse("app-list")).status_code, 200)
+
+        self.assertEqual(sample("http_responses_total", route="app-list", method="GET", status="200"), before + 1)
+        self.assertEqual(sample("http_request_duration_seconds_count", route="app-list", method="GET"), latency_before + 1)
+        self.assertGreater(sample("http_request_db_queries_sum", route="app-list"), queries_before)
+
+    def test_unresolved_paths_share_one_route(self):
+        before = sample("http_responses_total", route="unmatched", method="GET", status="404")
+        self.client.get("/no-such-page/")
+        self.assertEqual(sample("http_responses_total", route="unmatched", method="GET", status="404"), before + 1)
+
+    def test_counts_throttle_rejections(self):
+        def get_response(request):
+            request.resolver_match = resolve(reverse("auth-login"))
+            return HttpResponse(status=429)
+
+        before = sample("http_throttled_requests_total", route="auth-login")
+        MetricsMiddleware(get_response)(RequestFactory().post(reverse("auth-login")))
+        self.assertEqual(sample("http_throttled_requests_total", route="auth-login"), before + 1)
+
+    def test_stripe_and_webhook_metrics(self):
+        before = sample("stripe_request_duration_seconds_count", operation="Customer.create", outcome="error")
+        with self.assertRaises(RuntimeError), stripe_timer("Customer.create"):
+            raise RuntimeError("stripe down")
+        self.assertEqual(
+            sample("stripe_request_duration_seconds_count", operation="Customer.create", outcome="error"), before + 1
+        )
+
+        lag_before = sample("stripe_webhook_lag_seconds_sum", event_type="invoice.paid")
+        observe_webhook_lag({"type": "invoice.paid", "created": int(time.time()) - 30})
+        self.assertGreaterEqual(sample("stripe_webhook_lag_seconds_sum", event_type="invoice.paid") - lag_before, 29)
+
+    def test_endpoint_requires_token(self):
+        self.assertEqual(self.scrape("wrong").status_code, 401)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.scrape("").status_code, 404)
+
+        resp = self.scrape()
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"# TYPE http_request_duration_seconds histogram", resp.content)
@@ -0,0 +1,151 @@
+import json
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework.views import APIView as DRFAPIView
+from apps.models import App, AppUser
+from config.cache import clear_caches
+from config.profiling import (
+    ProfilingMixin,
+    RequestProfile,
+    SerializerProfilingMixin,
+    ServerTimingMiddleware,
+    current_profile,
+)
+from config.serializers import Serializer
+
+User = get_user_model()
+
+PROJECT_PACKAGES = {"adminapi", "apps", "billing", "config", "users"}
+
+
+def timings(response) -> dict:
+    metrics = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=1.0)
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="Pass1234", is_active=True)
+        for index in range(3):
+            app = App.objects.create(name=f"App {index}", owner=self.user)
+            AppUser.objects.create(app=app, user=self.user, role=AppUser.Role.OWNER)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        clear_caches()
+
+    def test_reports_phases_as_server_timing_and_log_line(self):
+        with CaptureQueriesContext(connection) as queries, self.assertLogs("config.profiling", "INFO") as logs:
+            resp = self.client.get(reverse("app-list"))
+        self.assertEqual(resp.status_code, 200)
+        metrics = timings(resp)
+        self.assertEqual(metrics["db"]["desc"], f'"{len(queries)} queries"')
+        self.assertTrue({"auth", "perm", "throttle", "ser", "view", "render", "total"} <= metrics.keys())
+
+        profile = json.loads(logs.records[0].getMessage().split(" ", 2)[2])
+        self.assertEqual(profile["queries"], len(queries))
+        self.assertEqual((profile["method"], profile["path"], profile["status"]), ("GET", "/api/v1/apps/", 200))
+        self.assertGreaterEqual(profile["total_ms"], profile["db_ms"])
+
+    def test_drf_classes_are_left_alone(self):
+        self.client.get(reverse("app-list"))
+        self.assertEqual(DRFAPIView.check_permissions.__module__, "rest_framework.views")
+        self.assertEqual(Response.rendered_content.fget.__module__, "rest_framework.response")
+        self.assertEqual(serializers.Serializer.to_representation.__module__, "rest_framework.serializers")
+
+    def test_nested_serializer_time_is_counted_once(self):
+        class Owner(Serializer):
+            email = serializers.EmailField()
+
+        class Row(Serializer):
+            name = serializers.CharField()
+            owner = Owner()
+
+        class Phases(dict):
+            def __setitem__(self, phase, seconds):
+                added.append(phase)
+                super().__setitem__(phase, seconds)
+
+        added = []
+        profile = RequestProfile()
+        profile.phases = Phases(profile.phases)
+        token = current_profile.set(profile)
+        try:
+            Row(App.objects.select_related("owner")[:2], many=True).data
+        finally:
+            current_profile.reset(token)
+        # One addition per row; the nested owner is inside its row's time.
+        self.assertEqual(added, ["ser", "ser"])
+
+    def test_headers_can_be_disabled(self):
+        with override_settings(REQUEST_PROFILING_HEADERS=False), self.assertLogs("config.profiling", "INFO"):
+            resp = self.client.get(reverse("app-list"))
+        self.assertNotIn("Server-Timing", resp)
+
+    def test_unsampled_requests_are_not_profiled(self):
+        with override_settings(REQUEST_PROFILING_SAMPLE_RATE=0.0), self.assertNoLogs("config.profiling"):
+            resp = self.client.get(reverse("app-list"))
+        self.assertNotIn("Server-Timing", resp)
+
+    async def test_async_stack(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = ServerTimingMiddleware(get_response)
+        with self.assertLogs("config.profiling", "INFO"):
+            resp = await middleware(AsyncRequestFactory().get("/api/v1/health/"))
+        self.assertEqual(timings(resp)["db"]["desc"], '"0 queries"')
+        self.assertIn("total", timings(resp))
+
+
+class ProfilingCoverageTests(SimpleTestCase):
+    """Views and serializers that skip the project bases would report no phases."""
+
+    def test_routed_project_views_are_profiled(self):
+        def views(patterns):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    yield from views(pattern.url_patterns)
+                elif isinstance(getattr(pattern.callback, "cls", None), type):
+                    yield pattern.callback.cls
+
+        project_views = [
+            view for view in views(get_resolver().url_patterns)
+            if issubclass(view, DRFAPIView) and view.__module__.split(".")[0] in PROJECT_PACKAGES
+        ]
+        self.assertGreater(len(project_views), 10)
+        self.assertEqual([view for view in project_views if not issubclass(view, ProfilingMixin)], [])
+
+    def test_project_serializers_are_profiled(self):
+        def subclasses(cls):
+            for subclass in cls.__subclasses__():
+                yield subclass
+                yield from subclasses(subclass)
+
+        project_serializers = {
+            serializer for serializer in subclasses(serializers.BaseSerializer)
+            if serializer.__module__.split(".")[0] in PROJECT_PACKAGES and "tests" not in serializer.__module__
+        }
+        self.assertGreater(len(project_serializers), 10)
+        self.assertEqual(
+            [serializer for serializer in project_serializers if not issubclass(serializer, SerializerProfilingMixin)], []
+        )
+
+
+class ProfilingDisabledTests(TestCase):
+    def test_middleware_removes_itself(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: HttpResponse())
+        self.assertNotIn("Server-Timing", self.client.get(reverse("health")))
@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
+from config.admin import LargeTableAdminMixin
 from users.models import User
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdminMixin, BaseUserAdmin):
     ordering = ("email",)
     list_display = ("email", "user_type", "is_active", "is_staff", "is_disabled_by_admin")
     list_filter = ("is_active", "is_staff", "user_type", "is_disabled_by_admin")
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+
+
+User = get_user_model()
+
+
+class RefreshCookieAuthentication(BaseAuthentication):
+    """Authenticates from the HttpOnly refresh cookie.
+
+    Meant for endpoints a browser opens without custom headers, such as
+    EventSource streams; everything else keeps using Bearer access tokens.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.COOKIES.get(settings.REFRESH_COOKIE_NAME)
+        if not raw_token:
+            return None
+        try:
+            token = RefreshToken(raw_token)
+        except TokenError:
+            raise exceptions.AuthenticationFailed("Invalid refresh token.")
+        user = User.objects.filter(pk=token.get(jwt_settings.USER_ID_CLAIM)).first()
+        if not user or not user.is_active or user.is_disabled_by_admin:
+            raise exceptions.AuthenticationFailed("User is inactive or disabled.")
+        return user, token
+
+
+class RefreshCookieAuthenticationScheme(OpenApiAuthenticationExtension):
+    target_class = RefreshCookieAuthentication
+    name = "refreshCookie"
+
+    def get_security_definition(self, auto_schema):
+        return {"type": "apiKey", "in": "cookie", "name": settings.REFRESH_COOKIE_NAME}
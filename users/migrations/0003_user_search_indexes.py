@@ -0,0 +1,75 @@
+from django.db import DatabaseError, migrations
+
+SEARCH_COLUMNS = ("email", "first_name", "last_name")
+
+POSTGRES_FORWARD = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS users_user_{column}_trgm ON users_user USING gin (UPPER({column}) gin_trgm_ops)"
+    for column in SEARCH_COLUMNS
+]
+POSTGRES_REVERSE = [f"DROP INDEX CONCURRENTLY IF EXISTS users_user_{column}_trgm" for column in SEARCH_COLUMNS]
+
+# Frozen copy of the DDL in users.search; later edits there must not change this migration.
+SQLITE_CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_user_search USING fts5("
+    "email, first_name, last_name, content='users_user', content_rowid='id', tokenize='trigram')"
+)
+SQLITE_TRIGGERS = {
+    "ai": """
+        CREATE TRIGGER IF NOT EXISTS users_user_search_ai AFTER INSERT ON users_user BEGIN
+            INSERT INTO users_user_search(rowid, email, first_name, last_name)
+            VALUES (new.id, new.email, new.first_name, new.last_name);
+        END""",
+    "ad": """
+        CREATE TRIGGER IF NOT EXISTS users_user_search_ad AFTER DELETE ON users_user BEGIN
+            INSERT INTO users_user_search(users_user_search, rowid, email, first_name, last_name)
+            VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+        END""",
+    "au": """
+        CREATE TRIGGER IF NOT EXISTS users_user_search_au AFTER UPDATE OF email, first_name, last_name
+        ON users_user BEGIN
+            INSERT INTO users_user_search(users_user_search, rowid, email, first_name, last_name)
+            VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+            INSERT INTO users_user_search(rowid, email, first_name, last_name)
+            VALUES (new.id, new.email, new.first_name, new.last_name);
+        END""",
+}
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(SQLITE_CREATE_TABLE)
+            except DatabaseError:
+                return  # No FTS5 trigram tokenizer: search falls back to icontains.
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            cursor.execute("INSERT INTO users_user_search(users_user_search) VALUES ('rebuild')")
+
+
+def backwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for sql in POSTGRES_REVERSE:
+            schema_editor.execute(sql)
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for suffix in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS users_user_search_{suffix}")
+            cursor.execute("DROP TABLE IF EXISTS users_user_search")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0002_user_joined_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type', '-date_joined', '-id'], name='users_user_type_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_disabled_by_admin', True)), fields=['-date_joined', '-id'], name='users_user_disabled_joined_idx'),
+        ),
+    ]
@@ -59,5 +59,18 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS: list[str] = []
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-date_joined", "-id"], name="users_user_joined_id_idx"),
+            # Admin list filters, each followed by the list ordering so a filtered page is an index range scan.
+            models.Index(fields=["user_type", "-date_joined", "-id"], name="users_user_type_joined_idx"),
+            # Disabled accounts are rare: a partial index keeps that filter small and ordered.
+            models.Index(
+                fields=["-date_joined", "-id"],
+                condition=models.Q(is_disabled_by_admin=True),
+                name="users_user_disabled_joined_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.email
@@ -0,0 +1,100 @@
+"""Indexed user search for the admin API.
+
+PostgreSQL uses pg_trgm GIN indexes on UPPER(email|first_name|last_name), which
+serve the same `icontains` lookups, ranked by word similarity. SQLite finds
+matches in an FTS5 trigram table kept in sync by triggers. There, and on other
+backends (unindexed `icontains`), prefix matches come first.
+"""
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import DatabaseError, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+SEARCH_FIELDS = ("email", "first_name", "last_name")
+SQLITE_SEARCH_TABLE = "users_user_search"
+
+SQLITE_SEARCH_TRIGGERS = {
+    "ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_ai AFTER INSERT ON users_user BEGIN
+            INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, email, first_name, last_name)
+            VALUES (new.id, new.email, new.first_name, new.last_name);
+        END""",
+    "ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_ad AFTER DELETE ON users_user BEGIN
+            INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, email, first_name, last_name)
+            VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+        END""",
+    "au": f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_au AFTER UPDATE OF email, first_name, last_name
+        ON users_user BEGIN
+            INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, email, first_name, last_name)
+            VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+            INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, email, first_name, last_name)
+            VALUES (new.id, new.email, new.first_name, new.last_name);
+        END""",
+}
+
+
+def install_sqlite_search(connection) -> bool:
+    """Create (or repair) the FTS5 table and its triggers, then rebuild it from users_user.
+
+    Returns False when this SQLite build lacks the FTS5 trigram tokenizer.
+    """
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5("
+                "email, first_name, last_name, content='users_user', content_rowid='id', tokenize='trigram')"
+            )
+        except DatabaseError:
+            return False
+        for sql in SQLITE_SEARCH_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def has_sqlite_search(connection) -> bool:
+    return SQLITE_SEARCH_TABLE in connection.introspection.table_names()
+
+
+def substring_filter(term: str) -> Q:
+    query = Q()
+    for field in SEARCH_FIELDS:
+        query |= Q(**{f"{field}__icontains": term})
+    return query
+
+
+def fts5_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search_users(queryset, term: str):
+    """Filter `queryset` to users matching `term` in any search field, best matches first."""
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        rank = Greatest(*(TrigramWordSimilarity(Value(term), field) for field in SEARCH_FIELDS))
+        return queryset.filter(substring_filter(term)).annotate(search_rank=rank).order_by(
+            "-search_rank", "-date_joined", "-id"
+        )
+    if connection.vendor == "sqlite" and has_sqlite_search(connection):
+        # Uncorrelated, so FTS5 runs the MATCH once; bm25() per row would re-run it for every match.
+        matches = RawSQL(
+            f"SELECT rowid FROM {SQLITE_SEARCH_TABLE} WHERE {SQLITE_SEARCH_TABLE} MATCH %s", (fts5_phrase(term),)
+        )
+        return prefix_first(queryset.filter(pk__in=matches), term)
+    return rank_by_prefix(queryset, term)
+
+
+def rank_by_prefix(queryset, term: str):
+    """Unindexed fallback: `icontains` on every search field, prefix matches first."""
+    return prefix_first(queryset.filter(substring_filter(term)), term)
+
+
+def prefix_first(queryset, term: str):
+    prefix = Q()
+    for field in SEARCH_FIELDS:
+        prefix |= Q(**{f"{field}__istartswith": term})
+    rank = Case(When(prefix, then=Value(1)), default=Value(0), output_field=IntegerField())
+    return queryset.annotate(search_rank=rank).order_by("-search_rank", "-date_joined", "-id")
@@ -2,13 +2,15 @@ from django.contrib.auth import authenticate, get_user_model
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from config.profiling import SerializerProfilingMixin
+from config.serializers import ModelSerializer, Serializer
 from users.tokens import email_verification_token
 
 
 User = get_user_model()
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
 
     class Meta:
@@ -21,7 +23,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class VerifyEmailSerializer(serializers.Serializer):
+class VerifyEmailSerializer(Serializer):
     uid = serializers.IntegerField()
     token = serializers.CharField()
 
@@ -41,7 +43,7 @@ class VerifyEmailSerializer(serializers.Serializer):
         return attrs
 
 
-class LoginSerializer(TokenObtainPairSerializer):
+class LoginSerializer(SerializerProfilingMixin, TokenObtainPairSerializer):
     username_field = User.EMAIL_FIELD
 
     def validate(self, attrs):
@@ -66,7 +68,7 @@ class LoginSerializer(TokenObtainPairSerializer):
         return {"refresh": str(refresh), "access": str(refresh.access_token)}
 
 
-class PasswordResetRequestSerializer(serializers.Serializer):
+class PasswordResetRequestSerializer(Serializer):
     email = serializers.EmailField()
 
     def validate_email(self, value):
@@ -80,7 +82,7 @@ class PasswordResetRequestSerializer(serializers.Serializer):
         return value
 
 
-class PasswordResetConfirmSerializer(serializers.Serializer):
+class PasswordResetConfirmSerializer(Serializer):
     uid = serializers.IntegerField()
     token = serializers.CharField()
     new_password = serializers.CharField(write_only=True, min_length=8)
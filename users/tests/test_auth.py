@@ -1,17 +1,27 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
+from config.cache import clear_caches
+from config.idempotency import REPLAYED_HEADER
 from users.tokens import email_verification_token
+from users.views import AsyncPasswordResetRequestView, AsyncRegisterView
 
 
 User = get_user_model()
+DATABASE_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "idempotency_cache"}
+}
 
 
 class AuthFlowTests(APITestCase):
     def setUp(self):
         self.client = APIClient()
+        clear_caches()
 
     def test_register_creates_inactive_basic_user_and_sends_email(self):
         payload = {
@@ -29,6 +39,17 @@ class AuthFlowTests(APITestCase):
         self.assertEqual(user.user_type, User.UserType.BASIC)
         self.assertEqual(len(mail.outbox), 1)
 
+    def test_register_retry_with_idempotency_key_sends_one_email(self):
+        payload = {"email": "retry@example.com", "password": "StrongPass123"}
+        url = reverse("auth-register")
+        first = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="register-1")
+        retry = self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="register-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(len(mail.outbox), 1)
+
     def test_verify_email_activates_user(self):
         user = User.objects.create_user(email="verifyme@example.com", password="Pass1234")
         token = email_verification_token.make_token(user)
@@ -133,3 +154,57 @@ class AuthFlowTests(APITestCase):
             format="json",
         )
         self.assertEqual(login_resp.status_code, status.HTTP_200_OK)
+
+
+class AsyncAuthViewTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.factory = AsyncRequestFactory()
+
+    async def test_async_register_creates_user_and_sends_email(self):
+        request = self.factory.post(
+            "/api/v1/auth/register/",
+            data={"email": "async-new@example.com", "password": "StrongPass123"},
+            content_type="application/json",
+        )
+        response = await AsyncRegisterView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = await User.objects.aget(email="async-new@example.com")
+        self.assertFalse(user.is_active)
+        self.assertEqual(len(mail.outbox), 1)
+
+    async def test_async_register_idempotency_with_database_cache(self):
+        await sync_to_async(call_command)("createcachetable", "idempotency_cache", verbosity=0)
+        request_kwargs = {
+            "data": {"email": "async-idem@example.com", "password": "StrongPass123"},
+            "content_type": "application/json",
+            "headers": {"Idempotency-Key": "register-once"},
+        }
+        with override_settings(CACHES=DATABASE_CACHES):
+            first = await AsyncRegisterView.as_view()(self.factory.post("/api/v1/auth/register/", **request_kwargs))
+            replay = await AsyncRegisterView.as_view()(self.factory.post("/api/v1/auth/register/", **request_kwargs))
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay[REPLAYED_HEADER], "true")
+        self.assertEqual(await User.objects.filter(email="async-idem@example.com").acount(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    async def test_async_register_rejects_invalid_payload(self):
+        request = self.factory.post(
+            "/api/v1/auth/register/", data={"email": "not-an-email"}, content_type="application/json"
+        )
+        response = await AsyncRegisterView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(mail.outbox), 0)
+
+    async def test_async_password_reset_request(self):
+        await User.objects.acreate(email="async-reset@example.com", is_active=True)
+        for email, sent in (("async-reset@example.com", 1), ("nobody@example.com", 1)):
+            request = self.factory.post(
+                "/api/v1/auth/forgot-password/", data={"email": email}, content_type="application/json"
+            )
+            response = await AsyncPasswordResetRequestView.as_view()(request)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(mail.outbox), sent)
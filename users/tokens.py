@@ -1,4 +1,7 @@
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import connections
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 
 
 class EmailVerificationTokenGenerator(PasswordResetTokenGenerator):
@@ -6,3 +9,30 @@ class EmailVerificationTokenGenerator(PasswordResetTokenGenerator):
 
 
 email_verification_token = EmailVerificationTokenGenerator()
+
+
+def revoke_refresh_tokens(users) -> int:
+    """Blacklist every unexpired outstanding refresh token of `users` in one INSERT ... SELECT.
+
+    `users` is a queryset of users; it is embedded as a subquery, so the set is
+    never loaded into Python. Already blacklisted tokens are skipped. Returns the
+    number of tokens blacklisted.
+    """
+    outstanding = OutstandingToken._meta
+    blacklisted = BlacklistedToken._meta
+    user_sql, user_params = users.order_by().values("pk").query.sql_with_params()
+    connection = connections[users.db]
+    qn = connection.ops.quote_name
+    now = timezone.now()
+    sql = (
+        f"INSERT INTO {qn(blacklisted.db_table)} ({qn(blacklisted.get_field('token').column)}, "
+        f"{qn(blacklisted.get_field('blacklisted_at').column)}) "
+        f"SELECT o.{qn(outstanding.pk.column)}, %s FROM {qn(outstanding.db_table)} o "
+        f"WHERE o.{qn(outstanding.get_field('user').column)} IN ({user_sql}) "
+        f"AND o.{qn(outstanding.get_field('expires_at').column)} > %s "
+        f"AND NOT EXISTS (SELECT 1 FROM {qn(blacklisted.db_table)} b "
+        f"WHERE b.{qn(blacklisted.get_field('token').column)} = o.{qn(outstanding.pk.column)})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [now, *user_params, now])
+        return cursor.rowcount
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.urls import path
 from users.views import (
+    AsyncPasswordResetRequestView,
+    AsyncRegisterView,
     LoginView,
     LogoutView,
     PasswordResetConfirmView,
@@ -9,13 +12,19 @@ from users.views import (
     VerifyEmailView,
 )
 
+if settings.ASYNC_VIEWS:
+    register_view = AsyncRegisterView
+    password_reset_view = AsyncPasswordResetRequestView
+else:
+    register_view = RegisterView
+    password_reset_view = PasswordResetRequestView
 
 urlpatterns = [
-    path("auth/register/", RegisterView.as_view(), name="auth-register"),
+    path("auth/register/", register_view.as_view(), name="auth-register"),
     path("auth/verify-email/", VerifyEmailView.as_view(), name="auth-verify-email"),
     path("auth/login/", LoginView.as_view(), name="auth-login"),
     path("auth/token/refresh/", RefreshView.as_view(), name="auth-refresh"),
     path("auth/logout/", LogoutView.as_view(), name="auth-logout"),
-    path("auth/forgot-password/", PasswordResetRequestView.as_view(), name="auth-forgot-password"),
+    path("auth/forgot-password/", password_reset_view.as_view(), name="auth-forgot-password"),
     path("auth/reset-password/", PasswordResetConfirmView.as_view(), name="auth-reset-password"),
 ]
@@ -1,12 +1,16 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import permissions, status
 from rest_framework.response import Response
-from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
+from config.async_views import AsyncAPIView
+from config.idempotency import IdempotencyMixin
+from config.profiling import ProfilingMixin
+from config.views import APIView
 from users.emails import send_password_reset_email, send_verification_email
 from users.serializers import (
     LoginSerializer,
@@ -21,7 +25,7 @@ from users.throttles import LoginRateThrottle, PasswordResetRateThrottle, Regist
 User = get_user_model()
 
 
-class RegisterView(APIView):
+class RegisterView(IdempotencyMixin, APIView):
     permission_classes = [permissions.AllowAny]
     throttle_classes = [RegisterRateThrottle]
     serializer_class = RegisterSerializer
@@ -35,6 +39,21 @@ class RegisterView(APIView):
         return Response({"detail": "Verification email sent."}, status=status.HTTP_201_CREATED)
 
 
+class AsyncRegisterView(IdempotencyMixin, AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterRateThrottle]
+    serializer_class = RegisterSerializer
+
+    @extend_schema(request=RegisterSerializer, responses={201: OpenApiResponse(description="Verification email sent")})
+    async def post(self, request):
+        serializer = RegisterSerializer(data=request.data)
+        # Validation queries and password hashing stay in the sync thread; SMTP gets its own thread.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        user = await sync_to_async(serializer.save)()
+        await sync_to_async(send_verification_email, thread_sensitive=False)(user, request=request)
+        return Response({"detail": "Verification email sent."}, status=status.HTTP_201_CREATED)
+
+
 class VerifyEmailView(APIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = VerifyEmailSerializer
@@ -50,7 +69,7 @@ class VerifyEmailView(APIView):
         return Response({"detail": "Email verified."})
 
 
-class LoginView(TokenObtainPairView):
+class LoginView(ProfilingMixin, TokenObtainPairView):
     serializer_class = LoginSerializer
     permission_classes = [permissions.AllowAny]
     throttle_classes = [LoginRateThrottle]
@@ -76,7 +95,7 @@ class LoginView(TokenObtainPairView):
         return response
 
 
-class RefreshView(TokenRefreshView):
+class RefreshView(ProfilingMixin, TokenRefreshView):
     permission_classes = [permissions.AllowAny]
 
     def _set_refresh_cookie(self, response, refresh_token: str):
@@ -142,6 +161,21 @@ class PasswordResetRequestView(APIView):
         return Response({"detail": "If the account exists, an email has been sent."})
 
 
+class AsyncPasswordResetRequestView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [PasswordResetRateThrottle]
+    serializer_class = PasswordResetRequestSerializer
+
+    @extend_schema(request=PasswordResetRequestSerializer, responses={200: OpenApiResponse(description="Email sent if exists")})
+    async def post(self, request):
+        serializer = PasswordResetRequestSerializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        user = serializer.context.get("user")
+        if user:
+            await sync_to_async(send_password_reset_email, thread_sensitive=False)(user)
+        return Response({"detail": "If the account exists, an email has been sent."})
+
+
 class PasswordResetConfirmView(APIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = PasswordResetConfirmSerializer